@@ -0,0 +1,215 @@
+"""Times every stage of the prediction and training paths on synthetic data.
+
+    python -m benchmarks.bench_stages                         # run, write benchmarks/results.json
+    python -m benchmarks.bench_stages --save-baseline         # also store the run as the baseline
+    python -m benchmarks.bench_stages --baseline benchmarks/baseline.json --threshold 0.25
+
+Serving stages use the trained artifacts (``artifacts/model.pkl`` and
+``artifacts/x_transformer.pkl``) on synthetic ``InputData`` records at several
+batch sizes. Training stages fit a fresh preprocessor and every candidate
+model family on synthetic rows. When a baseline is given, any stage whose
+median time grew by more than ``--threshold`` is reported as a regression
+and the command exits with status 1.
+"""
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import contextlib
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from src.pipelines.artifact_cache import ArtifactCache, ArtifactCacheConfig
+from src.pipelines.predict_pipeline import PredictPipeline, PredictPipelineConfig, CustomData, records_to_df
+from src.pipelines.synthetic_data import make_synthetic_records
+from src.utils import load_object
+from src.components.data_transformation import DataTransformation, native_categorical_features
+from src.components.model_trainer import get_models, NATIVE_CATEGORICAL_MODELS
+
+DEFAULT_BATCH_SIZES = [1, 16, 256, 4096]
+DEFAULT_OUTPUT = os.path.join("benchmarks", "results.json")
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+
+
+def measure(fn, repeats=5, min_seconds=0.05):
+    """Median/min seconds per call of ``fn``; calls are looped until one repeat takes ``min_seconds``."""
+    fn()  # warm-up, also pays lazy imports and caches
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds or number >= 1 << 16:
+            break
+        number *= 2
+
+    timings = [elapsed / number]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) / number)
+    return {"median_seconds": statistics.median(timings), "min_seconds": min(timings),
+            "repeats": repeats, "number": number}
+
+
+def _quiet(fn):
+    # PredictPipeline.predict prints the frame it scores; keep that out of the benchmark output
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return run
+
+
+def bench_serving(artifact_cache_config, batch_sizes, repeats):
+    artifact_cache = ArtifactCache(artifact_cache_config)
+    artifacts = artifact_cache.load()
+    pipeline = PredictPipeline(artifact_cache, PredictPipelineConfig(max_batch_size=sys.maxsize))
+    # serving may have skipped the sklearn preprocessor for its compiled export; the benchmark times both
+    preprocessor = artifacts.preprocessor or load_object(artifact_cache_config.preprocessor_path)
+    results = {}
+
+    for n in batch_sizes:
+        records = make_synthetic_records(n, seed=n)
+        if n == 1:
+            custom_data = CustomData(**records[0])
+            to_df = custom_data.to_df
+            end_to_end = _quiet(lambda: pipeline.predict(custom_data.to_df()))
+        else:
+            to_df = lambda: records_to_df(records)
+            end_to_end = lambda: pipeline.predict_batch(records)
+        df = to_df()
+        X = preprocessor.transform(df)
+
+        stages = {
+            "to_df": to_df,
+            "transform": lambda: preprocessor.transform(df),
+            "predict": lambda: artifacts.model.predict(X),
+            "end_to_end": end_to_end,
+        }
+        if artifacts.compiled_preprocessor is not None:
+            stages["transform_compiled"] = lambda: artifacts.compiled_preprocessor.transform(records)
+        if hasattr(artifacts.model, "predict_proba"):
+            stages["predict_proba"] = lambda: artifacts.model.predict_proba(X)
+
+        for stage, fn in stages.items():
+            result = measure(fn, repeats=repeats)
+            result["rows"] = n
+            results[f"serving/{stage}/batch={n}"] = result
+    return results, type(artifacts.model).__name__
+
+
+def bench_training(n_rows, candidate_models, repeats):
+    records = make_synthetic_records(n_rows, seed=1)
+    df = pd.DataFrame.from_records(records)
+    # a learnable label so boosting and trees do realistic amounts of work
+    score = df["Delay_from_due_date"] / 60 + df["Outstanding_Debt"] / 5000 - (df["Credit_Mix"] == "Good")
+    y = np.digitize(score, np.quantile(score, [1 / 3, 2 / 3])).astype(float)
+
+    X_preprocessor, _ = DataTransformation().get_data_transformer_object()
+    results = {"training/preprocessor_fit": {**measure(lambda: X_preprocessor.fit_transform(df), repeats=repeats,
+                                                       min_seconds=0), "rows": n_rows}}
+    X_onehot = X_preprocessor.fit_transform(df)
+    # the histogram booster is fitted on ordinal codes, as in training
+    X_native = DataTransformation().get_native_categorical_transformer_object().fit_transform(df)
+
+    for family, model in get_models(candidate_models, categorical_features=native_categorical_features()).items():
+        X = X_native if family in NATIVE_CATEGORICAL_MODELS else X_onehot
+        fitted = model.fit(X, y)
+        fit = measure(lambda: model.fit(X, y), repeats=repeats, min_seconds=0)
+        predict = measure(lambda: fitted.predict(X), repeats=repeats, min_seconds=0)
+        results[f"training/fit/{family}"] = {**fit, "rows": n_rows}
+        results[f"training/predict/{family}"] = {**predict, "rows": n_rows}
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Rows of (name, baseline_seconds, current_seconds, ratio, regressed) for stages present in both runs."""
+    rows = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        ratio = result["median_seconds"] / base["median_seconds"] if base["median_seconds"] else float("inf")
+        rows.append((name, base["median_seconds"], result["median_seconds"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the prediction and training stages")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--training-rows", type=int, default=5000)
+    parser.add_argument("--training-repeats", type=int, default=1)
+    parser.add_argument("--models", nargs="+", default=None, help="subset of model families to train")
+    parser.add_argument("--skip-serving", action="store_true")
+    parser.add_argument("--skip-training", action="store_true")
+    parser.add_argument("--model-path", default=ArtifactCacheConfig.model_path)
+    parser.add_argument("--preprocessor-path", default=ArtifactCacheConfig.preprocessor_path)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="compared against when the file exists")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run to --baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative slowdown of a stage's median before it counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = {}
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "cpu_count": os.cpu_count(),
+    }
+    if not args.skip_serving:
+        serving, meta["model"] = bench_serving(
+            ArtifactCacheConfig(model_path=args.model_path, preprocessor_path=args.preprocessor_path),
+            args.batch_sizes, args.repeats)
+        results.update(serving)
+    if not args.skip_training:
+        results.update(bench_training(args.training_rows, args.models, args.training_repeats))
+
+    for name, result in results.items():
+        per_row = result["median_seconds"] / result["rows"] * 1e6
+        print(f"{name:55s} {result['median_seconds'] * 1e3:12.3f} ms  {per_row:12.2f} us/row")
+
+    report = {"meta": meta, "results": results}
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nComparison against {args.baseline} (threshold +{args.threshold:.0%}):")
+        for name, base, current, ratio, regressed in compare(results, baseline, args.threshold):
+            flag = "REGRESSION" if regressed else ""
+            print(f"{name:55s} {base * 1e3:10.3f} -> {current * 1e3:10.3f} ms  x{ratio:5.2f} {flag}")
+            if regressed:
+                regressions.append(name)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) regressed beyond the threshold")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,124 @@
-import uvicorn
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-import uvicorn
-import pandas as pd
-from src.utils import load_object
-from src.pipelines.predict_pipeline import PredictPipeline,CustomData
-from src.logger import logging
+from fastapi import FastAPI, HTTPException, Request
+from starlette.requests import ClientDisconnect
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing import Dict, List, Optional
+from src.pipelines.predict_pipeline import CustomData,PredictPipelineConfig,FEATURE_COLUMNS
+from src.logger import logging, sample_request_log
+from src.pipelines.artifact_cache import get_artifact_cache
+from src.pipelines.micro_batcher import MicroBatcher, MicroBatcherConfig
+from src.pipelines.inference_executor import (InferenceExecutor, InferenceQueueFullError,
+                                              predict_custom_data, predict_records)
+from src.pipelines.metrics import REGISTRY, MetricsMiddleware, observe_validation, render_gauges
+from src.pipelines.prediction_cache import PredictionCache, PredictionCacheConfig
+from src.pipelines.prefork_server import ServerConfig, serve
+from src.pipelines.synthetic_data import make_synthetic_records
+from src.pipelines.streaming import (StreamingConfig, ArrowStreamDecoder, ArrowStreamEncoder,
+                                     NDJSON_MEDIA_TYPE, ARROW_STREAM_MEDIA_TYPE, ndjson_blocks,
+                                     ndjson_error, score_ndjson, score_record_batch, scored_in_order)
+from src.pipelines.model_registry import ModelRegistry, ModelRegistryConfig, RegistryFollower
+from src.pipelines.shadow import ShadowScorer, ShadowConfig
+from contextlib import asynccontextmanager
+import asyncio
+import time
+
+
+@asynccontextmanager
+async def lifespan(app:FastAPI):
+    # load the model and run a few predictions before taking traffic; when started by the
+    # pre-fork server the artifacts are already loaded in the parent and only the warm-up runs
+    app.state.ready = False
+    warmed_up = False
+    try:
+        warm_up(ServerConfig().warmup_requests)
+        warmed_up = True
+    except Exception as e:
+        logging.error(f"Warm-up failed, artifacts will be loaded lazily: {e}")
+
+    app.state.inference_executor = InferenceExecutor()
+    app.state.inference_executor.start()
+    REGISTRY.start_multiprocess_export()
+
+    app.state.micro_batcher = None
+    micro_batcher_config = MicroBatcherConfig()
+    if micro_batcher_config.enabled:
+        app.state.micro_batcher = MicroBatcher(predict_records, config=micro_batcher_config,
+                                               executor=app.state.inference_executor)
+        await app.state.micro_batcher.start()
+
+    app.state.prediction_cache = None
+    prediction_cache_config = PredictionCacheConfig()
+    if prediction_cache_config.enabled:
+        app.state.prediction_cache = PredictionCache(prediction_cache_config,
+                                                     version_fn=get_artifact_cache().version)
+
+    app.state.shadow = None
+    shadow_config = ShadowConfig()
+    if shadow_config.enabled:
+        app.state.shadow = ShadowScorer(shadow_config)
+        try:
+            app.state.shadow.sync()
+        except Exception as e:
+            logging.error(f"Shadow version could not be loaded: {e}")
+
+    registry_watcher = None
+    registry_config = ModelRegistryConfig()
+    if registry_config.enabled:
+        registry_watcher = asyncio.create_task(_watch_registry(app, registry_config.poll_seconds))
+
+    app.state.ready = warmed_up
+    # without this a failed warm-up would keep /ready at 503 even once the artifacts can be loaded
+    warm_up_retry = None if warmed_up else asyncio.create_task(_retry_warm_up(app))
+    yield
+    app.state.ready = False
+
+    if warm_up_retry is not None:
+        warm_up_retry.cancel()
+    if registry_watcher is not None:
+        registry_watcher.cancel()
+    if app.state.shadow is not None:
+        app.state.shadow.shutdown()
+    if app.state.micro_batcher is not None:
+        await app.state.micro_batcher.stop()
+    app.state.inference_executor.shutdown()
+
+
+async def _retry_warm_up(app, max_delay=30.0):
+    # runs on the default thread pool, backing off from 1s, until a warm-up succeeds
+    loop = asyncio.get_running_loop()
+    delay = 1.0
+    while True:
+        await asyncio.sleep(delay)
+        try:
+            await loop.run_in_executor(None, warm_up, ServerConfig().warmup_requests)
+        except Exception as e:
+            logging.error(f"Warm-up retry failed: {e}")
+            delay = min(2 * delay, max_delay)
+            continue
+        logging.info("Warm-up retry succeeded, ready for traffic")
+        app.state.ready = True
+        return
+
+
+async def _watch_registry(app, poll_seconds):
+    # new production/shadow versions are loaded on the default thread pool, next to the ones
+    # serving traffic, and swapped in once ready; in-flight requests finish on the old version
+    loop = asyncio.get_running_loop()
+    follower = get_registry_follower()
+    while True:
+        await asyncio.sleep(poll_seconds)
+        try:
+            await loop.run_in_executor(None, follower.sync)
+            if app.state.shadow is not None:
+                await loop.run_in_executor(None, app.state.shadow.sync)
+        except Exception as e:
+            logging.error(f"Model registry sync failed: {e}")
+
 
 app = FastAPI(title="Credit Card Default Prediction API",
-              description="API for Credit Card Default Prediction")
+              description="API for Credit Card Default Prediction",
+              lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 class InputData(BaseModel):
     Delay_from_due_date:int 
@@ -33,48 +143,315 @@ class InputData(BaseModel):
     Total_EMI_per_month:float
 
 
+class BatchInputData(BaseModel):
+    # either a list of records or a columnar payload {feature: [values, ...]}
+    records:Optional[List[InputData]] = None
+    columns:Optional[Dict[str,list]] = None
+
+
+# one validator per feature, with the same types and coercion as InputData's fields
+_COLUMN_ADAPTERS = {name: TypeAdapter(List[field.annotation]) for name, field in InputData.model_fields.items()}
+
+
+def validate_columns(columns):
+    """Checks a columnar payload against ``InputData``'s fields; returns the feature columns, coerced."""
+    missing = [c for c in FEATURE_COLUMNS if c not in columns]
+    if missing:
+        raise ValueError(f"Missing feature columns: {missing}")
+    validated = {}
+    for name in FEATURE_COLUMNS:
+        try:
+            validated[name] = _COLUMN_ADAPTERS[name].validate_python(columns[name])
+        except ValidationError as e:
+            error = e.errors()[0]
+            raise ValueError(f"Column {name}, row {error['loc'][0]}: {error['msg']}")
+    return validated
+
+
+_registry_follower = None
+
+
+def get_registry_follower():
+    # one follower per process (inherited by pre-fork workers), so a version rejected during
+    # warm-up is not loaded again by the watcher
+    global _registry_follower
+    if _registry_follower is None:
+        _registry_follower = RegistryFollower(get_artifact_cache())
+    return _registry_follower
+
+
+def warm_up(n_requests=8):
+    start = time.perf_counter()
+    if ModelRegistryConfig().enabled:
+        # start on the registry's production version when there is one, else on artifacts/;
+        # a version that fails to load is rejected and the current artifacts keep serving
+        try:
+            get_registry_follower().sync()
+        except Exception as e:
+            logging.error(f"Production model version not loaded, warming up on the current artifacts: {e}")
+    artifacts = get_artifact_cache().get()
+    records = make_synthetic_records(max(n_requests,1))
+    for record in records:
+        predict_custom_data(CustomData(**InputData(**record).model_dump()))
+    predict_records(records)
+    logging.info(f"Warm-up with {len(records)} synthetic requests finished in {time.perf_counter() - start:.3f}s "
+                 f"(artifacts: {artifacts.info()})")
+
+
+async def _predict_one(data:InputData):
+    if app.state.micro_batcher is not None:
+        prediction, _ = await app.state.micro_batcher.submit(data.model_dump())
+        return float(prediction)
+
+    custom_data = CustomData(
+        Delay_from_due_date=  data.Delay_from_due_date,
+        Num_of_Delayed_Payment=data.Num_of_Delayed_Payment,
+        Num_Credit_Inquiries=data.Num_Credit_Inquiries,
+        Credit_Utilization_Ratio=data.Credit_Utilization_Ratio,
+        Credit_History_Age=data.Credit_History_Age,
+        Payment_of_Min_Amount=data.Payment_of_Min_Amount,
+        Amount_invested_monthly=data.Amount_invested_monthly,
+        Monthly_Balance=data.Monthly_Balance,
+        Credit_Mix=data.Credit_Mix,
+        Payment_Behaviour=data.Payment_Behaviour,
+        Age=data.Age,
+        Annual_Income=data.Annual_Income,
+        Num_Bank_Accounts=data.Num_Bank_Accounts,
+        Num_Credit_Card=data.Num_Credit_Card,
+        Interest_Rate=data.Interest_Rate,
+        Num_of_Loan=data.Num_of_Loan,
+        Monthly_Inhand_Salary=data.Monthly_Inhand_Salary,
+        Changed_Credit_Limit=data.Changed_Credit_Limit,
+        Outstanding_Debt=data.Outstanding_Debt,
+        Total_EMI_per_month=data.Total_EMI_per_month
+    )
+
+    results = await app.state.inference_executor.run(predict_custom_data, custom_data)
+    return float(results[0])
+
+
 @app.post('/predict')
-async def predict(data:InputData):
+async def predict(data:InputData, request:Request):
+    observe_validation(request)
+    # one sampling decision per request so its start and completion lines are kept together
+    log_request = sample_request_log()
     try:
-        logging.info("Starting the prediction pipeline")
-        custom_data = CustomData(
-            Delay_from_due_date=  data.Delay_from_due_date,
-            Num_of_Delayed_Payment=data.Num_of_Delayed_Payment,
-            Num_Credit_Inquiries=data.Num_Credit_Inquiries,
-            Credit_Utilization_Ratio=data.Credit_Utilization_Ratio,
-            Credit_History_Age=data.Credit_History_Age,
-            Payment_of_Min_Amount=data.Payment_of_Min_Amount,
-            Amount_invested_monthly=data.Amount_invested_monthly,
-            Monthly_Balance=data.Monthly_Balance,
-            Credit_Mix=data.Credit_Mix,
-            Payment_Behaviour=data.Payment_Behaviour,
-            Age=data.Age,
-            Annual_Income=data.Annual_Income,
-            Num_Bank_Accounts=data.Num_Bank_Accounts,
-            Num_Credit_Card=data.Num_Credit_Card,
-            Interest_Rate=data.Interest_Rate,
-            Num_of_Loan=data.Num_of_Loan,
-            Monthly_Inhand_Salary=data.Monthly_Inhand_Salary,
-            Changed_Credit_Limit=data.Changed_Credit_Limit,
-            Outstanding_Debt=data.Outstanding_Debt,
-            Total_EMI_per_month=data.Total_EMI_per_month
-        )
-
-        pred_df = custom_data.to_df()
-
-        predict_pipeline = PredictPipeline()
-        results = predict_pipeline.predict(pred_df)
-        logging.info(f"Prediction completed {results}")
+        if log_request:
+            logging.info("Starting the prediction pipeline")
+        if app.state.prediction_cache is not None:
+            prediction = await app.state.prediction_cache.get_or_compute(data.model_dump(),
+                                                                         lambda: _predict_one(data))
+        else:
+            prediction = await _predict_one(data)
+        if log_request:
+            logging.info(f"Prediction completed {prediction}")
+        if app.state.shadow is not None:
+            app.state.shadow.observe([data.model_dump()], [prediction])
 
         return {
-            "prediction:":float(results[0])
+            "prediction:":prediction
         }
         
 
+    except InferenceQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post('/predict/batch')
+async def predict_batch(data:BatchInputData, request:Request):
+    observe_validation(request)
+    if (data.records is None) == (data.columns is None):
+        raise HTTPException(status_code=422, detail="Provide exactly one of 'records' or 'columns'")
+
+    if data.records is not None:
+        payload = [record.model_dump() for record in data.records]
+        batch_size = len(payload)
+    else:
+        try:
+            payload = validate_columns(data.columns)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        lengths = {len(values) for values in payload.values()}
+        if len(lengths) > 1:
+            raise HTTPException(status_code=422, detail="All columns must have the same length")
+        batch_size = lengths.pop()
+
+    max_batch_size = PredictPipelineConfig().max_batch_size
+    if batch_size > max_batch_size:
+        raise HTTPException(status_code=413, detail=f"Batch size {batch_size} exceeds limit of {max_batch_size}")
+
+    try:
+        preds, probabilities, classes = await app.state.inference_executor.run(predict_records, payload, True)
+        if sample_request_log():
+            logging.info(f"Batch prediction completed for {batch_size} records")
+        if app.state.shadow is not None:
+            app.state.shadow.observe(payload, preds)
+
+        response = {"predictions": preds.astype(float).tolist()}
+        if probabilities is not None:
+            response["classes"] = classes.astype(float).tolist()
+            response["probabilities"] = probabilities.tolist()
+        return response
+
+    except InferenceQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class BodyStreamingResponse(StreamingResponse):
+    # StreamingResponse normally reads ``receive`` itself to notice disconnects, which would swallow
+    # the request body the streaming endpoints are still reading; a disconnect shows up there instead
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+
+@app.post('/predict/stream')
+async def predict_stream(request:Request):
+    # NDJSON in, NDJSON out: blocks of whole lines are parsed into columns and scored while the
+    # rest of the body is still arriving, and each block's results are sent as soon as they are ready
+    config = StreamingConfig()
+    blocks = ndjson_blocks(request.stream(), config.chunk_bytes, config.max_line_bytes)
+
+    async def results():
+        rows_scored = 0
+        try:
+            async for n_rows, lines in scored_in_order(blocks, app.state.inference_executor.run,
+                                                       score_ndjson, config.max_in_flight):
+                rows_scored += n_rows
+                yield lines
+            if sample_request_log():
+                logging.info(f"Streaming prediction completed for {rows_scored} records")
+        except Exception as e:
+            # the status line is already sent, so the failure is reported as the last line of the body
+            logging.error(f"Streaming prediction failed after {rows_scored} records: {e}")
+            yield ndjson_error(e, rows_scored)
+
+    return BodyStreamingResponse(results(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@app.post('/predict/arrow')
+async def predict_arrow(request:Request):
+    # Arrow IPC stream in and out; record batches are scored as they are decoded, no per-row objects
+    config = StreamingConfig()
+    try:
+        decoder = ArrowStreamDecoder()
+    except ImportError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    # read up to the schema first so a wrong payload still gets a proper status code
+    body = request.stream().__aiter__()
+    pending = []
+    try:
+        while decoder.schema is None and not decoder.finished:
+            pending += decoder.feed(await body.__anext__())
+    except StopAsyncIteration:
+        pass
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if decoder.schema is None:
+        raise HTTPException(status_code=422, detail="Empty Arrow IPC stream")
+    missing = [c for c in FEATURE_COLUMNS if c not in decoder.schema.names]
+    if missing:
+        raise HTTPException(status_code=422, detail=f"Missing feature columns: {missing}")
+
+    async def batches():
+        received = pending
+        while True:
+            for batch in received:
+                for offset in range(0, batch.num_rows, config.chunk_rows):
+                    yield batch.slice(offset, config.chunk_rows)
+            if decoder.finished:
+                break
+            try:
+                received = decoder.feed(await body.__anext__())
+            except StopAsyncIteration:
+                decoder.close()
+                break
+
+    async def results():
+        encoder = ArrowStreamEncoder()
+        rows_scored = 0
+        try:
+            async for result in scored_in_order(batches(), app.state.inference_executor.run,
+                                                score_record_batch, config.max_in_flight):
+                rows_scored += len(result)
+                yield encoder.encode(result)
+            yield encoder.close()
+            if sample_request_log():
+                logging.info(f"Arrow streaming prediction completed for {rows_scored} records")
+        except Exception as e:
+            # no end-of-stream marker is written, so readers see a truncated stream instead of a short result
+            logging.error(f"Arrow streaming prediction failed after {rows_scored} records: {e}")
+            raise
+
+    return BodyStreamingResponse(results(), media_type=ARROW_STREAM_MEDIA_TYPE)
+
+
+@app.get('/metrics', response_class=PlainTextResponse)
+async def metrics():
+    extra_lines = render_gauges("inference_queue", {"pending": app.state.inference_executor.pending})
+    if app.state.micro_batcher is not None:
+        extra_lines += render_gauges("micro_batcher", app.state.micro_batcher.metrics.snapshot())
+    if app.state.prediction_cache is not None:
+        extra_lines += render_gauges("prediction_cache", app.state.prediction_cache.snapshot())
+    if app.state.shadow is not None:
+        extra_lines += render_gauges("shadow", app.state.shadow.snapshot())
+    return PlainTextResponse(REGISTRY.render(extra_lines), media_type="text/plain; version=0.0.4")
+
+
+@app.get('/metrics/micro_batching')
+async def micro_batching_metrics():
+    if app.state.micro_batcher is None:
+        return {"enabled":False}
+    return {"enabled":True, **app.state.micro_batcher.metrics.snapshot()}
+
+
+@app.get('/metrics/prediction_cache')
+async def prediction_cache_metrics():
+    if app.state.prediction_cache is None:
+        return {"enabled":False}
+    return {"enabled":True, **app.state.prediction_cache.snapshot()}
+
+
+@app.get('/metrics/shadow')
+async def shadow_metrics():
+    if app.state.shadow is None:
+        return {"enabled":False}
+    return {"enabled":True, **app.state.shadow.snapshot()}
+
+
+@app.get('/ready')
+async def ready():
+    if not getattr(app.state,'ready',False):
+        raise HTTPException(status_code=503, detail="Warming up")
+    return {"ready":True}
+
+
+@app.get('/model/info')
+async def model_info():
+    artifact_cache = get_artifact_cache()
+    if not artifact_cache.is_loaded:
+        return {"loaded":False}
+    return {"loaded":True, **artifact_cache.get().info()}
+
+
+@app.get('/model/versions')
+async def model_versions():
+    registry = ModelRegistry()
+    artifact_cache = get_artifact_cache()
+    return {
+        "serving":artifact_cache.config.model_version,
+        "aliases":registry.aliases(),
+        "versions":registry.list_versions(),
+    }
+
+
 if __name__ == "__main__":
-    uvicorn.run(app , host='127.0.0.1',port = 8000)
-    
\ No newline at end of file
+    serve(app , warm_up , ServerConfig())
+    
@@ -0,0 +1,31 @@
+import sys
+import streamlit as st
+from src.pipelines.artifact_cache import ArtifactCacheConfig
+from src.pipelines.predict_pipeline import PredictPipeline, PredictPipelineConfig
+from src.pipelines.model_registry import get_followed_artifact_cache
+
+SCORE_LABELS = {0: "Poor", 1: "Standard", 2: "Good"}
+
+
+@st.cache_resource(show_spinner="Loading the model...")
+def get_predict_pipeline():
+    """One loaded ``PredictPipeline`` per Streamlit server process, shared by every session and page.
+
+    Like the API it serves the registry's production version and follows promotions and rollbacks.
+    """
+    pipeline = PredictPipeline(artifact_cache=get_followed_artifact_cache(),
+                               config=PredictPipelineConfig(max_batch_size=sys.maxsize))
+    pipeline.artifact_cache.get()
+    return pipeline
+
+
+@st.cache_resource(show_spinner="Loading the model for bulk scoring...")
+def get_bulk_predict_pipeline():
+    """``PredictPipeline`` on ``model.pkl`` itself, which scores large uploads faster than the compiled export.
+
+    Loaded the first time the bulk scoring page is opened, so the main page keeps its lighter start-up.
+    """
+    artifact_cache = get_followed_artifact_cache(ArtifactCacheConfig(use_compiled_model=False))
+    pipeline = PredictPipeline(artifact_cache=artifact_cache, config=PredictPipelineConfig(max_batch_size=sys.maxsize))
+    pipeline.artifact_cache.get()
+    return pipeline
@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from src.pipelines.predict_pipeline import PredictPipeline, CustomData
+from src.pipelines.predict_pipeline import CustomData
 from src.logger import logging
+from src.pipelines.synthetic_data import NUMERIC_RANGES, CATEGORY_VALUES
+from src.pipelines.what_if import score_sweep
+from frontend_common import get_predict_pipeline, SCORE_LABELS
 import plotly.graph_objects as go
 
 # Page configuration
@@ -230,6 +233,8 @@ with st.sidebar:
     2. Submit for analysis
     3. Get instant credit score prediction
     4. View detailed risk assessment
+    
+    To score a whole CSV of customers, open **Bulk Scoring** above.
     """)
     
     st.markdown("### 💡 Tips")
@@ -339,8 +344,8 @@ if submit_button:
             # Convert to dataframe
             pred_df = custom_data.to_df()
             
-            # Make prediction
-            predict_pipeline = PredictPipeline()
+            # Make prediction with the model loaded once for the whole server
+            predict_pipeline = get_predict_pipeline()
             results = predict_pipeline.predict(pred_df)
             prediction = int(results[0])
             
@@ -438,6 +443,115 @@ if submit_button:
             st.error(f"❌ Prediction Error: {str(e)}")
             logging.error(f"Prediction error: {str(e)}")
 
+# What-if analysis: sweep one or two features around the customer in the form
+st.markdown("<div class='section-header'>🔬 What-if Analysis</div>", unsafe_allow_html=True)
+with st.expander("How would the predicted class change if one or two of these values changed?"):
+    base_record = {
+        "Delay_from_due_date": delay_from_due_date,
+        "Num_of_Delayed_Payment": num_of_delayed_payment,
+        "Num_Credit_Inquiries": num_credit_inquiries,
+        "Credit_Utilization_Ratio": credit_utilization_ratio,
+        "Credit_History_Age": credit_history_age,
+        "Payment_of_Min_Amount": payment_of_min_amount,
+        "Amount_invested_monthly": amount_invested_monthly,
+        "Monthly_Balance": monthly_balance,
+        "Credit_Mix": credit_mix,
+        "Payment_Behaviour": payment_behaviour,
+        "Age": age,
+        "Annual_Income": annual_income,
+        "Num_Bank_Accounts": num_bank_accounts,
+        "Num_Credit_Card": num_credit_card,
+        "Interest_Rate": interest_rate,
+        "Num_of_Loan": num_of_loan,
+        "Monthly_Inhand_Salary": monthly_inhand_salary,
+        "Changed_Credit_Limit": changed_credit_limit,
+        "Outstanding_Debt": outstanding_debt,
+        "Total_EMI_per_month": total_emi_per_month
+    }
+    sweep_features = list(NUMERIC_RANGES) + list(CATEGORY_VALUES)
+
+    def sweep_axis(feature, n_points, key):
+        if feature in CATEGORY_VALUES:
+            return CATEGORY_VALUES[feature]
+        low, high, is_integer = NUMERIC_RANGES[feature]
+        # keep the customer's own value inside the swept range
+        low, high = min(low, base_record[feature]), max(high, base_record[feature])
+        if is_integer:
+            # counts are only swept over whole numbers; fewer points than requested when the range is narrow
+            low, high = st.slider(f"{feature} range", min_value=int(low), max_value=int(np.ceil(high)),
+                                  value=(int(low), int(np.ceil(high))), key=key)
+            return np.unique(np.round(np.linspace(low, high, n_points))).astype(np.float64)
+        low, high = st.slider(f"{feature} range", min_value=float(low), max_value=float(high),
+                              value=(float(low), float(high)), key=key)
+        return np.linspace(low, high, n_points)
+
+    col_x, col_y, col_n = st.columns(3)
+    with col_x:
+        feature_x = st.selectbox("Feature to sweep", sweep_features, index=sweep_features.index("Outstanding_Debt"))
+    with col_y:
+        second_features = [f for f in sweep_features if f != feature_x]
+        default_y = "Num_of_Delayed_Payment"
+        feature_y = st.selectbox("Second feature (optional)", ["(none)"] + second_features,
+                                 index=1 + second_features.index(default_y) if default_y in second_features else 0)
+    with col_n:
+        n_points = st.slider("Points per feature", min_value=10, max_value=1000 if feature_y == "(none)" else 150,
+                             value=200 if feature_y == "(none)" else 60)
+
+    axes = {feature_x: sweep_axis(feature_x, n_points, "sweep_x")}
+    if feature_y != "(none)":
+        axes[feature_y] = sweep_axis(feature_y, n_points, "sweep_y")
+
+    try:
+        sweep = score_sweep(get_predict_pipeline(), base_record, axes)
+        st.caption(f"Scored {sweep.n_points:,} points in one batched call: {sweep.seconds * 1e3:.1f} ms")
+        class_labels = [SCORE_LABELS.get(int(c), str(c)) for c in sweep.classes]
+        class_colors = {"Poor": "#ef4444", "Standard": "#f59e0b", "Good": "#10b981"}
+
+        if len(axes) == 1:
+            x = axes[feature_x]
+            fig = go.Figure()
+            if sweep.probabilities is not None:
+                for i, label in enumerate(class_labels):
+                    fig.add_trace(go.Scatter(x=x, y=sweep.probabilities[:, i], mode="lines", name=f"P({label})",
+                                             line={"color": class_colors.get(label)}))
+            fig.add_trace(go.Scatter(x=x, y=[SCORE_LABELS.get(int(p), str(p)) for p in sweep.predictions],
+                                     mode="markers", name="Predicted class", yaxis="y2",
+                                     marker={"color": [class_colors.get(SCORE_LABELS.get(int(p))) for p in sweep.predictions], "size": 5}))
+            if feature_x in NUMERIC_RANGES:
+                fig.add_vline(x=float(base_record[feature_x]), line_dash="dash", annotation_text="current")
+            fig.update_layout(height=420, xaxis_title=feature_x, yaxis={"title": "Probability", "range": [0, 1]},
+                              yaxis2={"overlaying": "y", "side": "right", "type": "category",
+                                      "categoryorder": "array", "categoryarray": class_labels},
+                              paper_bgcolor="rgba(0,0,0,0)", font={'family': "Inter"})
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            x, y = axes[feature_x], axes[feature_y]
+            col_class, col_proba = st.columns(2)
+            with col_class:
+                n_classes = len(class_labels)
+                codes = np.searchsorted(sweep.classes, sweep.predictions)
+                colorscale = []
+                for i, label in enumerate(class_labels):
+                    colorscale += [[i / n_classes, class_colors.get(label, "#667eea")], [(i + 1) / n_classes, class_colors.get(label, "#667eea")]]
+                fig = go.Figure(go.Heatmap(z=codes.T, x=x, y=y, zmin=-0.5, zmax=n_classes - 0.5, colorscale=colorscale,
+                                           colorbar={"tickvals": list(range(n_classes)), "ticktext": class_labels}))
+                fig.update_layout(title="Predicted class", height=420, xaxis_title=feature_x, yaxis_title=feature_y,
+                                  paper_bgcolor="rgba(0,0,0,0)", font={'family': "Inter"})
+                st.plotly_chart(fig, use_container_width=True)
+            with col_proba:
+                if sweep.probabilities is not None:
+                    surface_class = st.selectbox("Probability of", class_labels, index=len(class_labels) - 1)
+                    z = sweep.probabilities[..., class_labels.index(surface_class)]
+                    fig = go.Figure(go.Heatmap(z=z.T, x=x, y=y, zmin=0, zmax=1, colorscale="Viridis"))
+                    fig.update_layout(title=f"P({surface_class})", height=420, xaxis_title=feature_x, yaxis_title=feature_y,
+                                      paper_bgcolor="rgba(0,0,0,0)", font={'family': "Inter"})
+                    st.plotly_chart(fig, use_container_width=True)
+                else:
+                    st.info("The current model does not output class probabilities.")
+    except Exception as e:
+        st.error(f"❌ What-if Error: {str(e)}")
+        logging.error(f"What-if error: {str(e)}")
+
 # Footer
 st.markdown("<br><br>", unsafe_allow_html=True)
 st.markdown("""
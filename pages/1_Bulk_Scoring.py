@@ -0,0 +1,88 @@
+import time
+import streamlit as st
+import pandas as pd
+from src.pipelines.predict_pipeline import FEATURE_COLUMNS
+from src.pipelines.batch_scoring import score_chunk
+from src.logger import logging
+from frontend_common import get_bulk_predict_pipeline, SCORE_LABELS
+
+st.set_page_config(
+    page_title="Bulk Credit Scoring",
+    page_icon="📂",
+    layout="wide"
+)
+
+st.title("📂 Bulk Credit Scoring")
+st.markdown("Upload a CSV of customers with the same 20 feature columns as the single-customer form. "
+            "The file is read and scored in chunks, one vectorized model call per chunk.")
+
+uploaded_file = st.file_uploader("Customer CSV", type=["csv"])
+chunksize = st.number_input("Rows per chunk", min_value=1000, max_value=200000, value=20000, step=1000,
+                            help="Larger chunks score faster, smaller ones update the progress more often")
+
+if uploaded_file is not None:
+    header = pd.read_csv(uploaded_file, nrows=0).columns.tolist()
+    uploaded_file.seek(0)
+    missing = [c for c in FEATURE_COLUMNS if c not in header]
+    st.caption(f"Upload size: {uploaded_file.size / 2**20:.2f} MiB, {len(header)} columns")
+
+    if missing:
+        st.error(f"❌ Missing feature columns: {', '.join(missing)}")
+    else:
+        id_options = ["(none)"] + [c for c in header if c not in FEATURE_COLUMNS]
+        id_column = st.selectbox("ID column copied next to each prediction", id_options)
+        id_column = None if id_column == "(none)" else id_column
+
+        if st.button("🔮 Score file"):
+            pipeline = get_bulk_predict_pipeline()
+            progress = st.progress(0.0, text="Starting...")
+            status = st.empty()
+            preview = st.empty()
+            results = []
+            class_counts = pd.Series(0, index=list(SCORE_LABELS.values()))
+            rows_done = 0
+            start = time.perf_counter()
+            try:
+                usecols = FEATURE_COLUMNS + ([id_column] if id_column else [])
+                for chunk in pd.read_csv(uploaded_file, chunksize=int(chunksize), usecols=usecols):
+                    result = score_chunk(chunk, id_column, pipeline)
+                    result.insert(1 if id_column else 0, "Credit_Score", result["prediction"].astype(int).map(SCORE_LABELS))
+                    results.append(result)
+                    rows_done += len(result)
+                    class_counts = class_counts.add(result["Credit_Score"].value_counts(), fill_value=0)
+
+                    elapsed = time.perf_counter() - start
+                    # the CSV reader's position in the upload is the only progress measure without a row count
+                    progress.progress(min(uploaded_file.tell() / max(uploaded_file.size, 1), 1.0),
+                                      text=f"{rows_done:,} rows scored")
+                    status.markdown(f"**{rows_done:,}** rows in {elapsed:.2f}s, **{rows_done / max(elapsed, 1e-9):,.0f}** rows/sec "
+                                    f"| " + " | ".join(f"{label}: {int(count):,}" for label, count in class_counts.items()))
+                    preview.dataframe(result.head(200), use_container_width=True)
+
+                elapsed = time.perf_counter() - start
+                progress.progress(1.0, text=f"Done: {rows_done:,} rows")
+                st.session_state["bulk_results"] = {
+                    "name": uploaded_file.name,
+                    "data": pd.concat(results, ignore_index=True) if results else pd.DataFrame(),
+                    "rows_per_sec": rows_done / max(elapsed, 1e-9),
+                    "seconds": elapsed,
+                    "upload_bytes": uploaded_file.size,
+                }
+                logging.info(f"Bulk scoring of {uploaded_file.name}: {rows_done} rows in {elapsed:.2f}s")
+            except Exception as e:
+                st.error(f"❌ Scoring Error: {str(e)}")
+                logging.error(f"Bulk scoring error: {str(e)}")
+
+# results are kept in the session so the download button's rerun does not throw them away
+bulk_results = st.session_state.get("bulk_results")
+if bulk_results is not None and uploaded_file is not None and bulk_results["name"] == uploaded_file.name:
+    scored = bulk_results["data"]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Rows scored", f"{len(scored):,}")
+    col2.metric("Upload size", f"{bulk_results['upload_bytes'] / 2**20:.2f} MiB")
+    col3.metric("Scoring time", f"{bulk_results['seconds']:.2f} s")
+    col4.metric("Throughput", f"{bulk_results['rows_per_sec']:,.0f} rows/s")
+    if not scored.empty:
+        st.bar_chart(scored["Credit_Score"].value_counts().reindex(list(SCORE_LABELS.values()), fill_value=0))
+        st.download_button("⬇️ Download predictions", scored.to_csv(index=False).encode(),
+                           file_name=f"scored_{bulk_results['name']}", mime="text/csv")
@@ -23,6 +23,8 @@ setup(
     author='Vasu',
     author_email = 'Vasunavadiya933@gmail.com',
     packages = find_packages(),
-    install_requires = get_requirements('requirements.txt')
+    install_requires = get_requirements('requirements.txt'),
+    ## optional: Parquet data/scoring (DATA_FORMAT=parquet) and the /predict/arrow stream
+    extras_require = {'arrow': ['pyarrow']}
 
 )
\ No newline at end of file
@@ -0,0 +1,81 @@
+from src.exceptions import CustomException
+from src.logger import logging
+
+from src.exceptions import CustomException
+import sys
+import os
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass
+from src.utils import read_table, write_table
+
+
+@dataclass
+class DataIngestionConfig:
+    train_data_path: str=os.path.join('artifacts',"train.csv")
+    test_data_path: str=os.path.join('artifacts',"test.csv")
+    raw_data_path: str=os.path.join('artifacts',"data.csv")
+    source_data_path: str=os.path.join('notebooks','data','data_no_outliers.csv')
+    test_size: float=0.2
+    random_state: int=42
+    data_format: str=os.getenv('DATA_FORMAT','csv')
+
+    def __post_init__(self):
+        if self.data_format not in ('csv','parquet'):
+            raise ValueError(f"Unsupported data_format {self.data_format!r}, expected 'csv' or 'parquet'")
+        if self.data_format == 'parquet':
+            for name in ('train_data_path','test_data_path','raw_data_path'):
+                path = getattr(self,name)
+                if path.endswith('.csv'):
+                    setattr(self,name,path[:-len('.csv')] + '.parquet')
+
+class DataIngestion:
+    def __init__(self,data_ingestion_config:DataIngestionConfig = None):
+        self.data_ingestion_config = data_ingestion_config or DataIngestionConfig()
+
+    def initiate_data_ingestion(self):
+        logging.info("Data Ingestion started")
+        try:
+            df = read_table(self.data_ingestion_config.source_data_path)
+            logging.info("data reading using pandas")
+
+
+            os.makedirs(os.path.dirname(self.data_ingestion_config.train_data_path),exist_ok = True)
+
+            write_table(df,self.data_ingestion_config.raw_data_path)
+            logging.info("raw data saved")
+
+            train_df,test_df = train_test_split(df,test_size = self.data_ingestion_config.test_size,
+                                               random_state = self.data_ingestion_config.random_state)
+            write_table(train_df,self.data_ingestion_config.train_data_path)
+            write_table(test_df,self.data_ingestion_config.test_data_path)
+            logging.info("train test split and saved")
+            return (
+                self.data_ingestion_config.train_data_path,
+                self.data_ingestion_config.test_data_path
+            )
+        except Exception as e:
+            raise CustomException(e,sys)
+
+if __name__ == "__main__":
+    # imported here so that importing DataIngestion does not load every candidate estimator
+    from src.components.data_transformation import DataTransformation
+    from src.components.model_trainer import ModelTrainer
+
+    obj = DataIngestion()
+    train_data,test_data = obj.initiate_data_ingestion()
+
+    print(f"Training data path is : {train_data}")
+    print(f"testing data path is :{test_data}")
+
+    data_transformation = DataTransformation()
+    train_arr,test_arr,_,_ = data_transformation.initiate_data_transformation(train_data,test_data)
+
+    model_trainer = ModelTrainer()
+    native_train_arr,native_test_arr = data_transformation.native_sets or (None,None)
+    model_accuracy = model_trainer.initiate_model_trainer(train_arr,test_arr,native_train_arr,native_test_arr)
+    print(model_accuracy)
+
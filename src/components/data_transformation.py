@@ -0,0 +1,230 @@
+from src.exceptions import CustomException
+from src.logger import logging
+
+import sys
+import os
+import pandas as pd
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+from sklearn.preprocessing import OneHotEncoder
+from sklearn.preprocessing import OrdinalEncoder
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.compose import ColumnTransformer
+
+from dataclasses import dataclass
+from src.utils import save_object, read_table, save_matrix, load_matrix
+
+NUMERICAL_COLUMNS = ['Delay_from_due_date', 'Num_of_Delayed_Payment', 'Num_Credit_Inquiries', 'Credit_Utilization_Ratio', 
+            'Credit_History_Age', 'Amount_invested_monthly', 
+            'Monthly_Balance', 'Age', 'Annual_Income', 'Num_Bank_Accounts', 'Num_Credit_Card', 'Interest_Rate', 'Num_of_Loan', 'Monthly_Inhand_Salary', 
+            'Changed_Credit_Limit', 'Outstanding_Debt', 'Total_EMI_per_month']
+
+X_CAT_COLUMNS = ['Payment_of_Min_Amount', 'Credit_Mix', 'Payment_Behaviour']
+
+
+def native_categorical_features():
+    """Positions of the categorical columns in the output of the native-categorical preprocessor."""
+    return list(range(len(NUMERICAL_COLUMNS),len(NUMERICAL_COLUMNS) + len(X_CAT_COLUMNS)))
+
+
+@dataclass 
+class DataTransformationConfig:
+    X_data_transformation_path:str =os.path.join('artifacts','x_transformer.pkl')
+    Y_data_transformation_path:str =os.path.join('artifacts','y_transformer.pkl')
+    # second preprocessor for models that split on category codes themselves (HistGradientBoostingClassifier)
+    native_categorical:bool = os.getenv('NATIVE_CATEGORICAL','1') == '1'
+    X_native_transformation_path:str = os.path.join('artifacts','x_transformer_native.pkl')
+    native_train_array_path:str = os.path.join('artifacts','X_train_native.npy')
+    native_test_array_path:str = os.path.join('artifacts','X_test_native.npy')
+    array_format:str = os.getenv('ARRAY_FORMAT','memory')
+    train_array_path:str = os.path.join('artifacts','X_train.npy')
+    test_array_path:str = os.path.join('artifacts','X_test.npy')
+    train_target_path:str = os.path.join('artifacts','y_train.npy')
+    test_target_path:str = os.path.join('artifacts','y_test.npy')
+    serialization_backend:str = os.getenv('SERIALIZATION_BACKEND','pickle')
+    # float32 halves the feature matrices; sparse keeps the one-hot columns as CSR instead of densifying them
+    dtype:str = os.getenv('TRAINING_DTYPE','float64')
+    matrix_format:str = os.getenv('TRAINING_MATRIX_FORMAT','dense')
+
+    def __post_init__(self):
+        if self.dtype not in ('float64','float32'):
+            raise ValueError(f"Unknown dtype {self.dtype!r}, expected 'float64' or 'float32'")
+        if self.matrix_format not in ('dense','sparse'):
+            raise ValueError(f"Unknown matrix_format {self.matrix_format!r}, expected 'dense' or 'sparse'")
+
+
+class DataTransformation:
+    def __init__(self,data_transformation_config:DataTransformationConfig = None):
+        self.data_transformation_config = data_transformation_config or DataTransformationConfig()
+        self.array_paths = None
+        self.native_sets = None
+
+
+    def get_data_transformer_object(self):
+        try:
+            logging.info("Data Transformer object started fot training data")
+            numerical_columns = NUMERICAL_COLUMNS
+
+            X_cat_columns = X_CAT_COLUMNS
+            target_column = ['Credit_Score']
+
+
+            num_pipeline = Pipeline(
+
+                steps = [
+                    
+                    ('imputer',SimpleImputer(strategy = 'median')),
+                    ('scaler',StandardScaler())
+                ]
+            )
+
+            X_cat_pipeline = Pipeline(
+                steps=[
+                    ('imputer',SimpleImputer(strategy = 'most_frequent')),
+                    ('onehot',OneHotEncoder(handle_unknown='ignore')),
+                    ("standard_scaler" , StandardScaler(with_mean = False)) 
+                ]
+            )
+
+            
+            X_preprocessor = ColumnTransformer(
+                transformers=[
+                            ("numerical_pipeline",num_pipeline,numerical_columns),
+                            ("X_categorical_pipeline",X_cat_pipeline,X_cat_columns)
+                ],remainder='drop'
+                            )
+            Y_preprocessor = Pipeline(
+                steps=[
+                    ('imputer', SimpleImputer(strategy='most_frequent')),
+                    ('ordinal', OrdinalEncoder(categories=[['Poor','Standard','Good']]))
+                ]   
+            )
+
+                
+                            
+            return X_preprocessor,Y_preprocessor
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def get_native_categorical_transformer_object(self):
+        """Numeric columns untouched and categories as ordinal codes, for models with native categorical splits.
+
+        Trees need neither scaling nor one-hot columns, and missing or unseen
+        values are left as NaN for the model's own missing-value handling.
+        """
+        try:
+            X_cat_pipeline = Pipeline(
+                steps=[
+                    ('ordinal',OrdinalEncoder(handle_unknown='use_encoded_value',unknown_value=np.nan,
+                                              encoded_missing_value=np.nan))
+                ]
+            )
+            return ColumnTransformer(
+                transformers=[
+                            ("numerical_pipeline",'passthrough',NUMERICAL_COLUMNS),
+                            ("X_categorical_pipeline",X_cat_pipeline,X_CAT_COLUMNS)
+                ],remainder='drop'
+                            )
+        except Exception as e:
+            raise CustomException(e,sys)
+
+
+    def save_arrays(self,train_set,test_set):
+        try:
+            config = self.data_transformation_config
+            self.array_paths = {
+                "X_train":save_matrix(config.train_array_path,train_set[0]),
+                "y_train":save_matrix(config.train_target_path,train_set[1]),
+                "X_test":save_matrix(config.test_array_path,test_set[0]),
+                "y_test":save_matrix(config.test_target_path,test_set[1]),
+            }
+            logging.info(f"transformed arrays saved to {self.array_paths}")
+            X_train,y_train,X_test,y_test = [load_matrix(path) for path in self.array_paths.values()]
+            if self.native_sets is not None:
+                self.array_paths["X_train_native"] = save_matrix(config.native_train_array_path,self.native_sets[0][0])
+                self.array_paths["X_test_native"] = save_matrix(config.native_test_array_path,self.native_sets[1][0])
+                self.native_sets = ((load_matrix(self.array_paths["X_train_native"]),y_train),
+                                    (load_matrix(self.array_paths["X_test_native"]),y_test))
+            return (X_train,y_train),(X_test,y_test)
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def initiate_data_transformation(self,train_path,test_path):
+        try:
+            logging.info("data Transformation initiated")
+
+            train_df = read_table(train_path)
+            test_df =  read_table(test_path)
+
+
+            
+            logging.info("read Train and test data comleted")
+
+            logging.info("obtaining a preprocessing obj")
+
+            X_preprocessing_obj,Y_preprocessing_obj = self.get_data_transformer_object()
+            if self.data_transformation_config.matrix_format == 'sparse':
+                # otherwise ColumnTransformer densifies, since most of each row is numeric
+                X_preprocessing_obj.set_params(sparse_threshold=1.0)
+
+            target_column_name = 'Credit_Score'
+
+            input_feature_train_df = train_df.drop(columns = [target_column_name])
+            target_feature_train_df  = train_df[[target_column_name]]
+
+            input_feature_test_df = test_df.drop(columns = [target_column_name])
+            target_feature_test_df  = test_df[[target_column_name]]
+
+
+            logging.info("Appling Preprocessing obh=ject ")
+
+
+            dtype = self.data_transformation_config.dtype
+            input_feature_train_arr  = X_preprocessing_obj.fit_transform(input_feature_train_df).astype(dtype,copy=False)
+            input_feature_test_arr  = X_preprocessing_obj.transform(input_feature_test_df).astype(dtype,copy=False)
+
+
+            target_feature_train_arr = Y_preprocessing_obj.fit_transform(target_feature_train_df)
+            target_feature_test_arr = Y_preprocessing_obj.transform(target_feature_test_df)
+
+            y_feature_train_arr = target_feature_train_arr.ravel()
+            y_feature_test_arr = target_feature_test_arr.ravel()
+
+            # features and target stay separate; stacking them with np.c_ forced a dense float64 copy
+            train_set = (input_feature_train_arr,y_feature_train_arr)
+            test_set = (input_feature_test_arr,y_feature_test_arr)
+
+            os.makedirs(os.path.dirname(self.data_transformation_config.X_data_transformation_path), exist_ok=True)
+            os.makedirs(os.path.dirname(self.data_transformation_config.Y_data_transformation_path), exist_ok=True)
+
+
+            backend = self.data_transformation_config.serialization_backend
+            save_object(file_path=self.data_transformation_config.X_data_transformation_path , obj = X_preprocessing_obj , backend = backend)
+            save_object(file_path=self.data_transformation_config.Y_data_transformation_path , obj = Y_preprocessing_obj , backend = backend)
+
+            if self.data_transformation_config.native_categorical:
+                X_native_obj = self.get_native_categorical_transformer_object()
+                native_train_arr = X_native_obj.fit_transform(input_feature_train_df).astype(dtype,copy=False)
+                native_test_arr = X_native_obj.transform(input_feature_test_df).astype(dtype,copy=False)
+                self.native_sets = ((native_train_arr,y_feature_train_arr),(native_test_arr,y_feature_test_arr))
+                save_object(file_path=self.data_transformation_config.X_native_transformation_path , obj = X_native_obj , backend = backend)
+
+            if self.data_transformation_config.array_format == 'npy':
+                # hand the arrays on memory-mapped so later stages page them in instead of holding copies
+                train_set,test_set = self.save_arrays(train_set,test_set)
+
+            return(
+                train_set,
+                test_set,
+                self.data_transformation_config.X_data_transformation_path,
+                self.data_transformation_config.Y_data_transformation_path
+            )
+        except Exception as e:
+            raise CustomException(e,sys)
+
+            
+
+ 
+
+
@@ -0,0 +1,196 @@
+import sys
+import os
+import json
+import math
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from scipy.stats import loguniform, randint, uniform
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import ParameterSampler, cross_val_score, train_test_split
+
+from src.exceptions import CustomException
+from src.logger import logging
+
+
+PARAM_SPACES = {
+    "LogisticRegression": {
+        "C": loguniform(1e-3, 1e2),
+        "max_iter": [200, 500],
+    },
+    "AdaBoostClassifier": {
+        "n_estimators": randint(25, 300),
+        "learning_rate": loguniform(1e-2, 2.0),
+    },
+    "GradientBoostingClassifier": {
+        "n_estimators": randint(50, 300),
+        "learning_rate": loguniform(1e-2, 0.3),
+        "max_depth": randint(2, 6),
+        "subsample": uniform(0.6, 0.4),
+    },
+    "RandomForestClassifier": {
+        "n_estimators": randint(50, 400),
+        "max_depth": [None, 8, 16, 32],
+        "min_samples_leaf": randint(1, 10),
+        "max_features": ["sqrt", "log2", None],
+    },
+    "KNeigboursClassifier": {
+        "n_neighbors": randint(3, 50),
+        "weights": ["uniform", "distance"],
+    },
+    "DecisionTreeClassifier": {
+        "max_depth": [None, 4, 8, 16, 32],
+        "min_samples_leaf": randint(1, 20),
+        "criterion": ["gini", "entropy"],
+    },
+    "HistGradientBoostingClassifier": {
+        "max_iter": randint(50, 400),
+        "learning_rate": loguniform(1e-2, 0.3),
+        "max_leaf_nodes": randint(15, 128),
+        "min_samples_leaf": randint(5, 100),
+        "l2_regularization": loguniform(1e-6, 1.0),
+    },
+}
+
+
+@dataclass
+class HyperparameterSearchConfig:
+    n_candidates_per_family: int = 8
+    min_resources: int = 500
+    factor: int = 3
+    cv: int = 5
+    max_fits: int = int(os.getenv('SEARCH_MAX_FITS')) if os.getenv('SEARCH_MAX_FITS') else None
+    max_seconds: float = float(os.getenv('SEARCH_MAX_SECONDS')) if os.getenv('SEARCH_MAX_SECONDS') else None
+    n_jobs: int = 1
+    random_state: int = 42
+    results_path: str = os.path.join('artifacts', 'search_results.json')
+
+
+class SuccessiveHalvingSearch:
+    """Races sampled configurations of every model family against each other.
+
+    Each rung fits the surviving configurations on a growing subset of the
+    training data (``min_resources * factor ** rung`` rows), scores them on a
+    fixed validation split and keeps the best ``1 / factor``. Once at most
+    ``factor`` configurations are left, or the subset reaches the full fitting
+    pool, the survivors get ``cv``-fold cross-validation on the full training
+    set. ``max_fits`` (a CV run costs ``cv`` fits) and ``max_seconds`` stop
+    the race early; the best configuration seen so far then wins.
+    """
+
+    def __init__(self, models, param_spaces=None, config: HyperparameterSearchConfig = None):
+        self.models = models
+        self.param_spaces = PARAM_SPACES if param_spaces is None else param_spaces
+        self.config = config or HyperparameterSearchConfig()
+        self.trace = []
+        self.fits_used = 0
+        self._deadline = None
+
+    def _budget_allows(self, cost):
+        if self.config.max_fits is not None and self.fits_used + cost > self.config.max_fits:
+            return False
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            return False
+        return True
+
+    def _sample_candidates(self):
+        candidates = []
+        for family, model in self.models.items():
+            space = self.param_spaces.get(family)
+            if space:
+                sampled = ParameterSampler(space, n_iter=self.config.n_candidates_per_family,
+                                           random_state=self.config.random_state)
+            else:
+                sampled = [{}]
+            for params in sampled:
+                candidates.append({"id": len(candidates), "family": family,
+                                   "params": {k: (v.item() if isinstance(v, np.generic) else v) for k, v in params.items()},
+                                   "rung": -1, "score": None})
+        return candidates
+
+    def _estimator(self, candidate):
+        return clone(self.models[candidate["family"]]).set_params(**candidate["params"])
+
+    def _record(self, candidate, rung, n_samples, score, fit_time, stage):
+        candidate["rung"] = rung
+        candidate["score"] = score
+        self.trace.append({"id": candidate["id"], "family": candidate["family"], "params": candidate["params"],
+                           "stage": stage, "rung": rung, "n_samples": n_samples,
+                           "score": score, "seconds": round(fit_time, 4)})
+
+    def search(self, X, y):
+        try:
+            start = time.perf_counter()
+            if self.config.max_seconds is not None:
+                self._deadline = start + self.config.max_seconds
+
+            candidates = self._sample_candidates()
+            logging.info(f"Hyperparameter search over {len(candidates)} configurations from {len(self.models)} families")
+
+            X_fit, X_val, y_fit, y_val = train_test_split(X, y, test_size=0.2, stratify=y,
+                                                          random_state=self.config.random_state)
+            order = np.random.default_rng(self.config.random_state).permutation(len(y_fit))
+
+            survivors = candidates
+            rung = 0
+            n_samples = self.config.min_resources
+            while len(survivors) > self.config.factor and n_samples < len(y_fit):
+                rows = order[:n_samples]
+                scored = []
+                for candidate in survivors:
+                    if not self._budget_allows(1):
+                        break
+                    fit_start = time.perf_counter()
+                    estimator = self._estimator(candidate).fit(X_fit[rows], y_fit[rows])
+                    score = accuracy_score(y_val, estimator.predict(X_val))
+                    self.fits_used += 1
+                    self._record(candidate, rung, n_samples, score, time.perf_counter() - fit_start, "halving")
+                    scored.append(candidate)
+
+                if not scored:
+                    break
+                scored.sort(key=lambda c: c["score"], reverse=True)
+                survivors = scored[:max(1, math.ceil(len(scored) / self.config.factor))]
+                logging.info(f"Rung {rung} on {n_samples} rows: kept {len(survivors)} of {len(scored)} "
+                             f"(best {survivors[0]['family']} {survivors[0]['score']:.4f})")
+                rung += 1
+                n_samples *= self.config.factor
+
+            for candidate in survivors:
+                if not self._budget_allows(self.config.cv):
+                    break
+                fit_start = time.perf_counter()
+                scores = cross_val_score(self._estimator(candidate), X, y, cv=self.config.cv,
+                                         scoring='accuracy', n_jobs=self.config.n_jobs)
+                self.fits_used += self.config.cv
+                self._record(candidate, rung, len(y), float(np.mean(scores)), time.perf_counter() - fit_start, "cv")
+
+            evaluated = [c for c in candidates if c["score"] is not None]
+            if not evaluated:
+                raise ValueError("Search budget was exhausted before any configuration was evaluated")
+            best = max(evaluated, key=lambda c: (c["rung"], c["score"]))
+
+            elapsed = time.perf_counter() - start
+            logging.info(f"Hyperparameter search finished in {elapsed:.1f}s after {self.fits_used} fits: "
+                         f"{best['family']} {best['params']} ({best['score']:.4f})")
+            self.results = {
+                "best_family": best["family"],
+                "best_params": best["params"],
+                "best_score": best["score"],
+                "best_stage": [t for t in self.trace if t["id"] == best["id"]][-1]["stage"],
+                "fits_used": self.fits_used,
+                "seconds": round(elapsed, 3),
+                "config": {k: v for k, v in vars(self.config).items() if k != 'results_path'},
+                "trace": self.trace,
+            }
+            return best["family"], best["params"]
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def save_results(self):
+        os.makedirs(os.path.dirname(self.config.results_path), exist_ok=True)
+        with open(self.config.results_path, 'w') as f:
+            json.dump(self.results, f, indent=2, default=str)
+        return self.config.results_path
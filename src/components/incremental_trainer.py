@@ -0,0 +1,280 @@
+import sys
+import os
+import json
+import time
+import argparse
+from collections import Counter
+from dataclasses import dataclass, asdict
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier, Perceptron
+from sklearn.naive_bayes import GaussianNB
+from sklearn.preprocessing import StandardScaler
+
+from src.exceptions import CustomException
+from src.logger import logging
+from src.components.data_transformation import DataTransformation
+from src.utils import save_object, read_table_chunks
+from src.pipelines.model_registry import register_artifacts
+
+TARGET_COLUMN = 'Credit_Score'
+
+
+def get_incremental_models(random_state=42):
+    """Classifiers with ``partial_fit``; SGD uses log loss so the API can return probabilities."""
+    return {
+        "SGDClassifier":SGDClassifier(loss='log_loss',random_state=random_state),
+        "Perceptron":Perceptron(random_state=random_state),
+        "GaussianNB":GaussianNB(),
+    }
+
+
+@dataclass
+class IncrementalTrainerConfig:
+    source_data_path:str = os.path.join('notebooks','data','data_no_outliers.csv')
+    chunksize:int = int(os.getenv('INCREMENTAL_CHUNKSIZE',50000))
+    model_name:str = os.getenv('INCREMENTAL_MODEL','SGDClassifier')
+    n_epochs:int = int(os.getenv('INCREMENTAL_EPOCHS',1))
+    holdout_fraction:float = 0.2
+    median_sample_size:int = 100000
+    random_state:int = 42
+    trainer_model_path:str = os.path.join('artifacts','model.pkl')
+    X_data_transformation_path:str = os.path.join('artifacts','x_transformer.pkl')
+    Y_data_transformation_path:str = os.path.join('artifacts','y_transformer.pkl')
+    report_path:str = os.path.join('artifacts','incremental_training.json')
+    serialization_backend:str = os.getenv('SERIALIZATION_BACKEND','pickle')
+
+
+class _Reservoir:
+    """Uniform sample of at most ``size`` values: keeps the values with the smallest random keys."""
+
+    def __init__(self,size,rng):
+        self.size = size
+        self.rng = rng
+        self.keys = np.empty(0)
+        self.values = np.empty(0)
+
+    def add(self,values):
+        keys = np.concatenate([self.keys,self.rng.random(len(values))])
+        values = np.concatenate([self.values,values])
+        if len(keys) > self.size:
+            keep = np.argpartition(keys,self.size)[:self.size]
+            keys,values = keys[keep],values[keep]
+        self.keys,self.values = keys,values
+
+
+class _StreamingStats:
+    """Everything the preprocessors need, accumulated one chunk at a time."""
+
+    def __init__(self,numerical_columns,categorical_columns,median_sample_size,rng):
+        self.numerical_columns = numerical_columns
+        self.categorical_columns = categorical_columns
+        self.n_rows = 0
+        # StandardScaler.partial_fit skips NaNs, so this holds the statistics of the observed values
+        self.scaler = StandardScaler()
+        self.numerical_missing = np.zeros(len(numerical_columns),dtype=np.int64)
+        self.reservoirs = [_Reservoir(median_sample_size,rng) for _ in numerical_columns]
+        self.category_counts = {column:Counter() for column in categorical_columns}
+        self.category_missing = {column:0 for column in categorical_columns}
+        self.target_counts = Counter()
+        self.target_missing = 0
+
+    def update(self,chunk):
+        self.n_rows += len(chunk)
+
+        numerical = chunk[self.numerical_columns].to_numpy(dtype=np.float64)
+        observed = ~np.isnan(numerical)
+        self.scaler.partial_fit(numerical)
+        self.numerical_missing += (~observed).sum(axis=0)
+        for j,reservoir in enumerate(self.reservoirs):
+            reservoir.add(numerical[observed[:,j],j])
+
+        for column in self.categorical_columns:
+            values = chunk[column]
+            self.category_missing[column] += int(values.isna().sum())
+            self.category_counts[column].update(values.dropna().tolist())
+
+        target = chunk[TARGET_COLUMN]
+        self.target_missing += int(target.isna().sum())
+        self.target_counts.update(target.dropna().tolist())
+
+    def medians(self):
+        return np.array([np.median(r.values) if len(r.values) else 0.0 for r in self.reservoirs])
+
+    def most_frequent(self,column):
+        counts = self.category_counts[column]
+        if not counts:
+            raise ValueError(f"Column {column} has no non-missing values")
+        # SimpleImputer(most_frequent) breaks ties with the smallest value
+        best = max(counts.values())
+        return min(value for value,count in counts.items() if count == best)
+
+
+class IncrementalTrainer:
+    """Trains the preprocessor and a ``partial_fit`` classifier without loading the source at once.
+
+    The first pass over the source accumulates the numeric scaling statistics
+    (``StandardScaler.partial_fit``), a reservoir sample per numeric column for
+    the median imputer and the running vocabulary and counts of every
+    categorical column. These are written into the same ``ColumnTransformer``
+    ``DataTransformation`` builds, so ``x_transformer.pkl`` stays a drop-in
+    for ``PredictPipeline``. Each epoch then streams the chunks again, fitting
+    the classifier chunk by chunk and scoring it on a holdout of rows that are
+    never trained on. Only one chunk is in memory at a time.
+    """
+
+    def __init__(self,config:IncrementalTrainerConfig = None):
+        self.config = config or IncrementalTrainerConfig()
+        self.report = None
+        self.model_version = None
+
+    def _chunks(self):
+        return read_table_chunks(self.config.source_data_path,self.config.chunksize)
+
+    def _holdout_mask(self,chunk_index,n_rows):
+        # chunk boundaries are identical on every pass, so each row lands on the same side every time
+        rng = np.random.default_rng([self.config.random_state,chunk_index])
+        return rng.random(n_rows) < self.config.holdout_fraction
+
+    def _fit_preprocessors(self,stats,X_preprocessor,Y_preprocessor):
+        numerical_columns,categorical_columns = stats.numerical_columns,stats.categorical_columns
+        vocabularies = {column:sorted(stats.category_counts[column]) for column in categorical_columns}
+        target_values = sorted(stats.target_counts)
+
+        # fit on a small frame holding every category once, then overwrite the learned statistics
+        n_rows = max([len(v) for v in vocabularies.values()] + [len(target_values),2])
+        medians = stats.medians()
+        prototype = pd.DataFrame({column:np.full(n_rows,medians[j]) for j,column in enumerate(numerical_columns)})
+        for column,vocabulary in vocabularies.items():
+            prototype[column] = np.resize(np.array(vocabulary,dtype=object),n_rows)
+        X_preprocessor.fit(prototype)
+        Y_preprocessor.fit(pd.DataFrame({TARGET_COLUMN:np.resize(np.array(target_values,dtype=object),n_rows)}))
+
+        numerical_pipeline = X_preprocessor.named_transformers_['numerical_pipeline']
+        numerical_pipeline.named_steps['imputer'].statistics_ = medians
+
+        # merge the observed values with the missing ones, which the imputer turns into the median
+        scaler = numerical_pipeline.named_steps['scaler']
+        n_observed = np.broadcast_to(stats.scaler.n_samples_seen_,medians.shape).astype(np.float64)
+        n_total = n_observed + stats.numerical_missing
+        mean = (n_observed * stats.scaler.mean_ + stats.numerical_missing * medians) / n_total
+        m2 = (stats.scaler.var_ * n_observed
+              + n_observed * stats.numerical_missing / n_total * (stats.scaler.mean_ - medians) ** 2)
+        scaler.mean_ = mean
+        scaler.var_ = m2 / n_total
+        scaler.scale_ = np.where(scaler.var_ > 0,np.sqrt(scaler.var_),1.0)
+        scaler.n_samples_seen_ = stats.n_rows
+
+        categorical_pipeline = X_preprocessor.named_transformers_['X_categorical_pipeline']
+        fill_values = [stats.most_frequent(column) for column in categorical_columns]
+        categorical_pipeline.named_steps['imputer'].statistics_ = np.array(fill_values,dtype=object)
+
+        # one-hot column variance is p * (1 - p) with the missing rows counted under the fill value
+        frequencies = []
+        for column,fill_value in zip(categorical_columns,fill_values):
+            counts = stats.category_counts[column].copy()
+            counts[fill_value] += stats.category_missing[column]
+            frequencies += [counts[value] / stats.n_rows for value in vocabularies[column]]
+        frequencies = np.array(frequencies)
+        one_hot_scaler = categorical_pipeline.named_steps['standard_scaler']
+        one_hot_scaler.var_ = frequencies * (1 - frequencies)
+        one_hot_scaler.scale_ = np.where(one_hot_scaler.var_ > 0,np.sqrt(one_hot_scaler.var_),1.0)
+        one_hot_scaler.n_samples_seen_ = stats.n_rows
+
+        best_target = max(stats.target_counts.values())
+        Y_preprocessor.named_steps['imputer'].statistics_ = np.array(
+            [min(v for v,c in stats.target_counts.items() if c == best_target)],dtype=object)
+
+    def _evaluate(self,model,X_preprocessor,Y_preprocessor):
+        correct = total = 0
+        for chunk_index,chunk in enumerate(self._chunks()):
+            holdout = chunk[self._holdout_mask(chunk_index,len(chunk))]
+            if holdout.empty:
+                continue
+            X = X_preprocessor.transform(holdout)
+            y = Y_preprocessor.transform(holdout[[TARGET_COLUMN]]).ravel()
+            correct += int((model.predict(X) == y).sum())
+            total += len(y)
+        return correct / total if total else None
+
+    def initiate_incremental_training(self):
+        try:
+            start = time.perf_counter()
+            config = self.config
+            models = get_incremental_models(config.random_state)
+            if config.model_name not in models:
+                raise ValueError(f"Unknown incremental model {config.model_name!r}, expected one of {list(models)}")
+            model = models[config.model_name]
+
+            X_preprocessor,Y_preprocessor = DataTransformation().get_data_transformer_object()
+            columns = {name:list(cols) for name,_,cols in X_preprocessor.transformers}
+            stats = _StreamingStats(columns['numerical_pipeline'],columns['X_categorical_pipeline'],
+                                    config.median_sample_size,np.random.default_rng(config.random_state))
+
+            logging.info(f"Incremental training: statistics pass over {config.source_data_path}")
+            for chunk_index,chunk in enumerate(self._chunks()):
+                stats.update(chunk[~self._holdout_mask(chunk_index,len(chunk))])
+            self._fit_preprocessors(stats,X_preprocessor,Y_preprocessor)
+            logging.info(f"Preprocessors fitted from {stats.n_rows} training rows")
+
+            classes = np.arange(len(Y_preprocessor.named_steps['ordinal'].categories_[0]),dtype=np.float64)
+            history = []
+            for epoch in range(config.n_epochs):
+                for chunk_index,chunk in enumerate(self._chunks()):
+                    train = chunk[~self._holdout_mask(chunk_index,len(chunk))]
+                    if train.empty:
+                        continue
+                    # chunks of a sorted extract would otherwise feed SGD long runs of similar rows
+                    order = np.random.default_rng([config.random_state,epoch,chunk_index]).permutation(len(train))
+                    train = train.iloc[order]
+                    X = X_preprocessor.transform(train)
+                    y = Y_preprocessor.transform(train[[TARGET_COLUMN]]).ravel()
+                    model.partial_fit(X,y,classes=classes)
+
+                accuracy = self._evaluate(model,X_preprocessor,Y_preprocessor)
+                history.append(accuracy)
+                logging.info(f"Epoch {epoch + 1}/{config.n_epochs}: holdout accuracy {accuracy}")
+
+            backend = config.serialization_backend
+            save_object(file_path=config.X_data_transformation_path,obj=X_preprocessor,backend=backend)
+            save_object(file_path=config.Y_data_transformation_path,obj=Y_preprocessor,backend=backend)
+            save_object(file_path=config.trainer_model_path,obj=model,backend=backend)
+
+            self.report = {
+                "model_name":config.model_name,
+                "train_rows":stats.n_rows,
+                "holdout_accuracy":history[-1] if history else None,
+                "holdout_accuracy_per_epoch":history,
+                "seconds":round(time.perf_counter() - start,3),
+                "config":asdict(config),
+            }
+            with open(config.report_path,'w') as f:
+                json.dump(self.report,f,indent=2)
+            logging.info(f"Incremental training finished: {self.report}")
+
+            # the API follows the registry once a production version exists, so register this model like ModelTrainer's
+            self.model_version = register_artifacts(
+                {"model":config.trainer_model_path,
+                 "preprocessor":config.X_data_transformation_path,
+                 "model_report":config.report_path},
+                metrics = {"best_model":config.model_name,"accuracy":self.report["holdout_accuracy"],
+                           "fit_seconds":self.report["seconds"]},
+                source = "IncrementalTrainer"
+            )
+            return self.report["holdout_accuracy"]
+        except Exception as e:
+            raise CustomException(e,sys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the preprocessor and a partial_fit model chunk by chunk")
+    parser.add_argument("--source",default=IncrementalTrainerConfig.source_data_path)
+    parser.add_argument("--chunksize",type=int,default=IncrementalTrainerConfig.chunksize)
+    parser.add_argument("--epochs",type=int,default=IncrementalTrainerConfig.n_epochs)
+    parser.add_argument("--model",default=IncrementalTrainerConfig.model_name,choices=list(get_incremental_models()))
+    args = parser.parse_args()
+
+    trainer = IncrementalTrainer(IncrementalTrainerConfig(source_data_path=args.source,chunksize=args.chunksize,
+                                                          n_epochs=args.epochs,model_name=args.model))
+    print(trainer.initiate_incremental_training())
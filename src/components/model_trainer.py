@@ -0,0 +1,244 @@
+import sys
+import os
+import json
+import time
+from dataclasses import dataclass, field
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.svm import SVC
+from sklearn.ensemble import (
+
+    AdaBoostClassifier,
+    GradientBoostingClassifier,
+    HistGradientBoostingClassifier,
+    RandomForestClassifier
+)
+from sklearn.metrics import r2_score
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.ensemble import GradientBoostingClassifier
+
+from src.utils import evaluate_model_groups
+from src.components.data_transformation import native_categorical_features
+from src.components.hyperparameter_search import HyperparameterSearchConfig, SuccessiveHalvingSearch
+from src.exceptions import CustomException
+from src.logger import logging
+from sklearn.metrics import accuracy_score
+from src.utils import save_object , load_object , copy_file
+from src.pipelines.compiled_model import export_compiled_model
+from src.pipelines.compiled_transformer import export_compiled_transformer
+from src.pipelines.model_registry import register_trained_model
+
+CANDIDATE_MODELS = [
+    "LogisticRegression",
+    "AdaBoostClassifier",
+    "GradientBoostingClassifier",
+    "RandomForestClassifier",
+    "KNeigboursClassifier",
+    "DecisionTreeClassifier",
+    "HistGradientBoostingClassifier"
+]
+
+# fitted on the ordinal-coded features of x_transformer_native.pkl instead of the one-hot ones
+NATIVE_CATEGORICAL_MODELS = ["HistGradientBoostingClassifier"]
+
+def get_models(candidate_models=None,categorical_features=None):
+    """Fresh, unfitted instances of the candidate model families, keyed by name.
+
+    ``categorical_features`` are the column positions the histogram booster
+    treats as categories; leave it ``None`` when fitting it on one-hot features.
+    """
+    models = {
+        "LogisticRegression":LogisticRegression(),
+        "AdaBoostClassifier":AdaBoostClassifier(),
+        "GradientBoostingClassifier":GradientBoostingClassifier(),
+        "RandomForestClassifier":RandomForestClassifier(),
+        "KNeigboursClassifier":KNeighborsClassifier(),
+        "DecisionTreeClassifier":DecisionTreeClassifier(),
+        "HistGradientBoostingClassifier":HistGradientBoostingClassifier(categorical_features=categorical_features)
+    }
+    if candidate_models is None:
+        return models
+    return {name:model for name,model in models.items() if name in candidate_models}
+
+
+def split_features_target(data):
+    """Accepts ``(X, y)`` as returned by ``DataTransformation`` or an older array with the target as last column."""
+    if isinstance(data,tuple):
+        return data
+    return data[:,:-1],data[:,-1]
+
+
+@dataclass
+class ModelTrainerConfig:
+    trainer_model_path:str = os.path.join('artifacts','model.pkl')
+    n_jobs:int = int(os.getenv('TRAINING_N_JOBS', os.cpu_count() or 1))
+    model_timeout_seconds:float = float(os.getenv('TRAINING_MODEL_TIMEOUT')) if os.getenv('TRAINING_MODEL_TIMEOUT') else None
+    hyperparameter_search:bool = os.getenv('HYPERPARAMETER_SEARCH','0') == '1'
+    search_results_path:str = os.path.join('artifacts','search_results.json')
+    native_search_results_path:str = os.path.join('artifacts','search_results_native.json')
+    candidate_models:list = field(default_factory=lambda: list(CANDIDATE_MODELS))
+    serialization_backend:str = os.getenv('SERIALIZATION_BACKEND','pickle')
+    # the preprocessor serving uses; replaced by the native one when a native-categorical model wins
+    preprocessor_path:str = os.path.join('artifacts','x_transformer.pkl')
+    native_preprocessor_path:str = os.path.join('artifacts','x_transformer_native.pkl')
+    model_report_path:str = os.path.join('artifacts','model_report.json')
+    # tree winners are also exported as flat node arrays for serving
+    compiled_model_path:str = os.path.join('artifacts','model_compiled.pkl')
+    compiled_model_dtype:str = os.getenv('COMPILED_MODEL_DTYPE','float64')
+    compiled_model_check_rows:int = 20000
+    compiled_preprocessor_path:str = os.path.join('artifacts','x_transformer_compiled.pkl')
+
+
+class ModelTrainer:
+    def __init__(self,model_trainer_config:ModelTrainerConfig = None):
+        self.model_trainer_config = model_trainer_config or ModelTrainerConfig()
+        self.model_report = None
+        self.model_version = None
+
+    def search_best_model(self,models,X_train,y_train,X_test,y_test,results_path=None):
+        search_config = HyperparameterSearchConfig(
+            n_jobs = self.model_trainer_config.n_jobs,
+            results_path = results_path or self.model_trainer_config.search_results_path
+        )
+        search = SuccessiveHalvingSearch(models,config = search_config)
+        best_model_name,best_params = search.search(X_train,y_train)
+
+        best_model = models[best_model_name].set_params(**best_params)
+        start = time.perf_counter()
+        best_model.fit(X_train,y_train)
+        fit_time = time.perf_counter() - start
+        best_model_score = accuracy_score(y_test,best_model.predict(X_test))
+
+        search.results["test_accuracy"] = best_model_score
+        results_path = search.save_results()
+        logging.info(f"Search results for {best_model_name} {best_params} saved to {results_path}")
+        return best_model_name,best_model,best_model_score,fit_time
+
+    def feature_sets(self,train_arr,test_arr,native_train_arr=None,native_test_arr=None):
+        """Groups the candidate models by the features they are fitted on.
+
+        Returns ``[(features, models, (X_train, y_train), (X_test, y_test))]``.
+        Without native arrays every model, the histogram booster included, is
+        fitted on the one-hot features, except that the booster is left out when
+        those are sparse, since it only accepts dense input.
+        """
+        candidate_models = self.model_trainer_config.candidate_models
+        train_set = split_features_target(train_arr)
+        test_set = split_features_target(test_arr)
+        if native_train_arr is None or native_test_arr is None:
+            models = get_models(candidate_models)
+            if hasattr(train_set[0],"toarray"):
+                for name in NATIVE_CATEGORICAL_MODELS:
+                    if models.pop(name,None) is not None:
+                        logging.warning(f"{name} skipped: it cannot be fitted on the sparse one-hot features, "
+                                        "use NATIVE_CATEGORICAL=1 or TRAINING_MATRIX_FORMAT=dense to include it")
+            return [("onehot",models,train_set,test_set)]
+
+        models = get_models(candidate_models,categorical_features=native_categorical_features())
+        groups = []
+        onehot_models = {name:model for name,model in models.items() if name not in NATIVE_CATEGORICAL_MODELS}
+        if onehot_models:
+            groups.append(("onehot",onehot_models,train_set,test_set))
+        native_models = {name:model for name,model in models.items() if name in NATIVE_CATEGORICAL_MODELS}
+        if native_models:
+            groups.append(("native",native_models,split_features_target(native_train_arr),
+                           split_features_target(native_test_arr)))
+        return groups
+
+    def save_model_report(self,report,best_model_name):
+        self.model_report = {"best_model":best_model_name,"models":report}
+        os.makedirs(os.path.dirname(self.model_trainer_config.model_report_path),exist_ok=True)
+        with open(self.model_trainer_config.model_report_path,'w') as f:
+            json.dump(self.model_report,f,indent=2)
+
+        for name,entry in sorted(report.items(),key=lambda item: -item[1]["accuracy"]):
+            logging.info(f"{name:32s} accuracy {entry['accuracy']:.4f}  fit {entry['fit_seconds']:8.2f}s  ({entry['features']} features)")
+        return self.model_trainer_config.model_report_path
+
+    def initiate_model_trainer(self,train_arr,test_arr,native_train_arr=None,native_test_arr=None):
+        try:
+            logging.info("initiate model Trainer")
+
+            groups = self.feature_sets(train_arr,test_arr,native_train_arr,native_test_arr)
+            if not any(models for _,models,_,_ in groups):
+                raise CustomException(f"No known models in candidate_models {self.model_trainer_config.candidate_models}",sys)
+
+            model_report = {}
+            fitted = {}
+            if self.model_trainer_config.hyperparameter_search:
+                for features,models,(X_train,y_train),(X_test,y_test) in groups:
+                    results_path = (self.model_trainer_config.search_results_path if features == "onehot"
+                                    else self.model_trainer_config.native_search_results_path)
+                    name,model,score,fit_time = self.search_best_model(models,X_train,y_train,X_test,y_test,results_path)
+                    model_report[name] = {"accuracy":score,"fit_seconds":round(fit_time,4),"features":features}
+                    fitted[name] = (model,(X_test,y_test))
+            else:
+                # one-hot and native models share the CPU budget and are fitted side by side
+                fit_times = {}
+                scores = evaluate_model_groups([(models,train_set,test_set) for _,models,train_set,test_set in groups],
+                                               n_jobs = self.model_trainer_config.n_jobs,
+                                               timeout = self.model_trainer_config.model_timeout_seconds,
+                                               fit_times = fit_times)
+                for features,models,_,test_set in groups:
+                    for name in models:
+                        if name in scores:
+                            model_report[name] = {"accuracy":scores[name],"fit_seconds":round(fit_times[name],4),
+                                                  "features":features}
+                            fitted[name] = (models[name],test_set)
+
+            if not model_report:
+                raise CustomException("No model finished training within the time limit",sys)
+
+            ## To get best model Score from report
+            best_model_name = max(model_report,key=lambda name: model_report[name]["accuracy"])
+            best_model_score = model_report[best_model_name]["accuracy"]
+            best_model,(X_test,y_test) = fitted[best_model_name]
+
+            if best_model_score < 0.6:
+                raise CustomException("No model found with accuracy at least 60%")
+
+            logging.info(f"Best model found with accuracy: {best_model_name}  : {best_model_score}")
+            report_path = self.save_model_report(model_report,best_model_name)
+            logging.info(f"Fit time and accuracy of every candidate saved to {report_path}")
+
+            
+            save_object(
+                file_path  = self.model_trainer_config.trainer_model_path,
+                obj  = best_model,
+                backend = self.model_trainer_config.serialization_backend
+
+            )
+            export_compiled_model(
+                best_model,
+                model_path = self.model_trainer_config.trainer_model_path,
+                output_path = self.model_trainer_config.compiled_model_path,
+                X_check = X_test[:self.model_trainer_config.compiled_model_check_rows],
+                dtype = self.model_trainer_config.compiled_model_dtype,
+                backend = self.model_trainer_config.serialization_backend
+            )
+            if model_report[best_model_name]["features"] == "native":
+                # serving must encode requests the way the winner was trained
+                copy_file(self.model_trainer_config.native_preprocessor_path,self.model_trainer_config.preprocessor_path)
+                logging.info(f"{self.model_trainer_config.native_preprocessor_path} copied to {self.model_trainer_config.preprocessor_path}")
+            export_compiled_transformer(
+                load_object(self.model_trainer_config.preprocessor_path),
+                preprocessor_path = self.model_trainer_config.preprocessor_path,
+                output_path = self.model_trainer_config.compiled_preprocessor_path
+            )
+            # artifacts/ is overwritten by every run; the registry keeps each version and is what serving follows
+            self.model_version = register_trained_model(
+                self.model_trainer_config,
+                metrics = {"best_model":best_model_name,"accuracy":best_model_score,
+                           "fit_seconds":model_report[best_model_name]["fit_seconds"]}
+            )
+
+            predicted = best_model.predict(X_test)
+            accuracy = accuracy_score(y_test,predicted)
+
+            logging.info("Best model found with accuracy: {best_model_name}  : {accuracy}")
+            return accuracy
+
+        except Exception as e:
+            raise CustomException(e,sys)
@@ -1,20 +1,144 @@
 import os
+import json
+import queue
+import atexit
+import random
 import logging
+import logging.handlers
 
-from datetime import datetime
+from datetime import datetime, timezone
 
 LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
 
 logs_path = os.path.join(os.getcwd(),'logs',LOG_FILE)
-os.makedirs(logs_path,exist_ok=True)
 
 LOG_FILE_PATH = os.path.join(logs_path, LOG_FILE)
 
-logging.basicConfig(
-        filename =  LOG_FILE_PATH,
-        format="[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s",
-        level = logging.INFO
-)
+# LOG_MODE=sync writes from the calling thread (the original behaviour); async hands records to a
+# background thread through a bounded queue so file I/O stays off the request path
+LOG_MODE = os.getenv("LOG_MODE", "sync")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 1.0))
+
+TEXT_FORMAT = "[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s"
+
+# attributes every LogRecord has; anything else was passed through ``extra=`` and goes into the JSON
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the standard fields plus any ``extra=`` values."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "lineno": record.lineno,
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class BackgroundQueueHandler(logging.handlers.QueueHandler):
+    """Queues records for a ``QueueListener`` in this process.
+
+    Only the message arguments are merged on the calling thread; formatting
+    and writing happen on the listener thread. When the queue is full the
+    record is dropped and counted instead of blocking the caller.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class DeferredFileHandler(logging.FileHandler):
+    """``FileHandler`` that creates the log directory and opens the file on the first record.
+
+    Importing the logger therefore touches no files; a process that never logs
+    (a CLI's ``--help``, an import-time profile) leaves no empty log behind.
+    """
+
+    def __init__(self, filename):
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+def sample_request_log():
+    """True for ``LOG_SAMPLE_RATE`` of calls; guard per-request log lines with it."""
+    return LOG_SAMPLE_RATE >= 1.0 or random.random() < LOG_SAMPLE_RATE
+
+
+def _build_file_handler():
+    handler = DeferredFileHandler(LOG_FILE_PATH)
+    if LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    elif LOG_FORMAT == "text":
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    else:
+        raise ValueError(f"Unknown LOG_FORMAT {LOG_FORMAT!r}, expected 'text' or 'json'")
+    return handler
+
+
+_listener = None
+_queue_handler = None
+
+
+def _start_listener(handlers):
+    global _listener
+    _queue_handler.queue = queue.Queue(LOG_QUEUE_SIZE)
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _restart_listener_in_child():
+    # the listener thread does not survive fork (pre-fork server, process pools), so start a new one
+    if _listener is not None:
+        _start_listener(_listener.handlers)
+
+
+def stop_listener():
+    """Flushes queued records; registered with ``atexit`` in async mode."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+if LOG_MODE == "async":
+    _queue_handler = BackgroundQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    logging.basicConfig(handlers=[_queue_handler], level=logging.INFO)
+    _start_listener([_build_file_handler()])
+    atexit.register(stop_listener)
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
+elif LOG_MODE == "sync":
+    logging.basicConfig(handlers=[_build_file_handler()], level=logging.INFO)
+else:
+    raise ValueError(f"Unknown LOG_MODE {LOG_MODE!r}, expected 'sync' or 'async'")
 
 
 # if __name__== "__main__":
@@ -0,0 +1,212 @@
+import sys
+import os
+import time
+import threading
+import pandas as pd
+from dataclasses import dataclass
+
+from src.exceptions import CustomException
+from src.logger import logging
+from src.utils import load_object, file_digest
+from src.pipelines.compiled_transformer import CompiledTransformer
+
+
+@dataclass
+class ArtifactCacheConfig:
+    model_path: str = os.path.join("artifacts", "model.pkl")
+    preprocessor_path: str = os.path.join("artifacts", "x_transformer.pkl")
+    compile_preprocessor: bool = os.getenv("COMPILED_TRANSFORMER", "1") == "1"
+    # compiled copy of the preprocessor written at training time; serving it avoids importing sklearn
+    compiled_preprocessor_path: str = os.path.join("artifacts", "x_transformer_compiled.pkl")
+    # flat node-array export of a tree model, written by ModelTrainer next to model.pkl
+    compiled_model_path: str = os.path.join("artifacts", "model_compiled.pkl")
+    # chosen once per cache: the export wins on online-sized batches, model.pkl on bulk scoring
+    use_compiled_model: bool = os.getenv("COMPILED_MODEL", "1") == "1"
+    # registry version the paths belong to, None for the plain artifacts/ files
+    model_version: str = None
+
+
+@dataclass
+class LoadedArtifacts:
+    model: object
+    preprocessor: object
+    load_time_seconds: float
+    model_size_bytes: int
+    preprocessor_size_bytes: int
+    compiled_preprocessor: object = None
+    compiled_model: bool = False
+    model_version: str = None
+
+    def info(self):
+        return {
+            "model_version": self.model_version,
+            "load_time_seconds": round(self.load_time_seconds, 4),
+            "model_size_bytes": self.model_size_bytes,
+            "preprocessor_size_bytes": self.preprocessor_size_bytes,
+            "compiled_preprocessor": self.compiled_preprocessor is not None,
+            "compiled_model": self.compiled_model,
+        }
+
+    def transform(self, data):
+        if self.compiled_preprocessor is not None:
+            return self.compiled_preprocessor.transform(data)
+        if not isinstance(data, pd.DataFrame):
+            data = pd.DataFrame(data) if isinstance(data, dict) else pd.DataFrame.from_records(list(data))
+        return self.preprocessor.transform(data)
+
+
+class ArtifactCache:
+    """Loads the model and preprocessor once and hands the same objects to every caller.
+
+    Loading is lazy (first call to ``get``) unless ``load`` is called eagerly,
+    e.g. from the FastAPI startup hook. The lock only guards the first load;
+    afterwards ``get`` is a plain attribute read. When ``compiled_model_path``
+    holds the flat-array export of the current ``model.pkl`` it is served in
+    its place and the pickle is never loaded; likewise an export of the current
+    ``x_transformer.pkl`` at ``compiled_preprocessor_path`` replaces the sklearn
+    preprocessor, which then stays ``None``.
+    """
+
+    def __init__(self, config: ArtifactCacheConfig = None):
+        self.config = config or ArtifactCacheConfig()
+        self._lock = threading.Lock()
+        self._artifacts = None
+
+    @property
+    def is_loaded(self):
+        return self._artifacts is not None
+
+    def get(self):
+        artifacts = self._artifacts
+        if artifacts is not None:
+            return artifacts
+
+        with self._lock:
+            if self._artifacts is None:
+                self._artifacts = self._load()
+            return self._artifacts
+
+    def load(self):
+        with self._lock:
+            self._artifacts = self._load()
+            return self._artifacts
+
+    def swap(self, config: ArtifactCacheConfig, check=None):
+        """Loads the artifacts described by ``config`` and then serves them instead of the current ones.
+
+        The new artifacts are fully loaded (and passed to ``check``, which may
+        raise to reject them) before a single reference assignment publishes
+        them, so ``get`` never sees a partial load. Callers that already hold
+        the previous ``LoadedArtifacts`` finish their request with it.
+        """
+        artifacts = ArtifactCache(config)._load()
+        if check is not None:
+            check(artifacts)
+        with self._lock:
+            self.config = config
+            self._artifacts = artifacts
+        return artifacts
+
+    def clear(self):
+        with self._lock:
+            self._artifacts = None
+
+    def version(self):
+        """Cheap token that changes whenever the artifact files on disk, or the loaded objects, change."""
+        stats = []
+        for path in (self.config.model_path, self.config.preprocessor_path, self.config.compiled_model_path,
+                     self.config.compiled_preprocessor_path):
+            try:
+                stat = os.stat(path)
+                stats.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stats.append(None)
+        return tuple(stats), id(self._artifacts)
+
+    def _load(self):
+        try:
+            start = time.perf_counter()
+            model = self._load_compiled_model()
+            model_file = self.config.compiled_model_path
+            if model is None:
+                model = load_object(self.config.model_path)
+                model_file = self.config.model_path
+            preprocessor = None
+            preprocessor_file = self.config.compiled_preprocessor_path
+            compiled_preprocessor = self._load_compiled_preprocessor()
+            if compiled_preprocessor is None:
+                preprocessor = load_object(self.config.preprocessor_path)
+                preprocessor_file = self.config.preprocessor_path
+                compiled_preprocessor = self._compile(preprocessor)
+            load_time = time.perf_counter() - start
+
+            artifacts = LoadedArtifacts(
+                model=model,
+                preprocessor=preprocessor,
+                load_time_seconds=load_time,
+                model_size_bytes=os.path.getsize(model_file),
+                preprocessor_size_bytes=os.path.getsize(preprocessor_file),
+                compiled_preprocessor=compiled_preprocessor,
+                compiled_model=model_file == self.config.compiled_model_path,
+                model_version=self.config.model_version,
+            )
+            logging.info(f"Artifacts loaded from {self.config.model_path} and "
+                         f"{self.config.preprocessor_path}: {artifacts.info()}")
+            return artifacts
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _load_compiled_model(self):
+        if not self.config.use_compiled_model or not os.path.exists(self.config.compiled_model_path):
+            return None
+        try:
+            compiled = load_object(self.config.compiled_model_path)
+            # the export is only valid for the exact model.pkl it was made from
+            if compiled.source_digest != file_digest(self.config.model_path):
+                logging.warning(f"{self.config.compiled_model_path} was exported from another model, using {self.config.model_path}")
+                return None
+            return compiled
+        except Exception as e:
+            logging.warning(f"Compiled model could not be loaded, using {self.config.model_path}: {e}")
+            return None
+
+    def _load_compiled_preprocessor(self):
+        if not self.config.compile_preprocessor or not os.path.exists(self.config.compiled_preprocessor_path):
+            return None
+        try:
+            compiled = load_object(self.config.compiled_preprocessor_path)
+            if getattr(compiled, "source_digest", None) != file_digest(self.config.preprocessor_path):
+                logging.warning(f"{self.config.compiled_preprocessor_path} was exported from another preprocessor, "
+                                f"compiling {self.config.preprocessor_path}")
+                return None
+            return compiled
+        except Exception as e:
+            logging.warning(f"Compiled transformer could not be loaded, compiling {self.config.preprocessor_path}: {e}")
+            return None
+
+    def _compile(self, preprocessor):
+        if not self.config.compile_preprocessor:
+            return None
+        try:
+            compiled = CompiledTransformer.compile(preprocessor)
+            compiled.self_check(preprocessor)
+            return compiled
+        except Exception as e:
+            logging.warning(f"Preprocessor could not be compiled, using sklearn transform: {e}")
+            return None
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_artifact_cache(config: ArtifactCacheConfig = None):
+    config = config or ArtifactCacheConfig()
+    key = (os.path.abspath(config.model_path), os.path.abspath(config.preprocessor_path), config.use_compiled_model)
+
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = ArtifactCache(config)
+            _caches[key] = cache
+        return cache
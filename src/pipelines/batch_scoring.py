@@ -0,0 +1,252 @@
+import sys
+import os
+import json
+import time
+import argparse
+from collections import deque
+from dataclasses import dataclass, replace
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src.exceptions import CustomException
+from src.logger import logging
+from src.pipelines.artifact_cache import ArtifactCacheConfig, get_artifact_cache
+from src.pipelines.predict_pipeline import PredictPipeline, PredictPipelineConfig, FEATURE_COLUMNS
+from src.pipelines.model_registry import ModelRegistry, production_cache_config
+
+
+@dataclass
+class BatchScoringConfig:
+    input_path: str
+    output_path: str
+    chunksize: int = 50000
+    workers: int = 1
+    id_column: str = None
+    resume: bool = True
+    # explicit files; when both are None the registry's production version is scored, like the API does
+    model_path: str = None
+    preprocessor_path: str = None
+    # registry version to score instead of production
+    model_version: str = None
+
+    @property
+    def checkpoint_path(self):
+        return self.output_path + ".checkpoint.json"
+
+
+_worker_pipeline = None
+
+
+def _init_worker(artifact_cache_config):
+    global _worker_pipeline
+    artifact_cache = get_artifact_cache(artifact_cache_config)
+    artifact_cache.load()
+    _worker_pipeline = PredictPipeline(artifact_cache=artifact_cache,
+                                       config=PredictPipelineConfig(max_batch_size=sys.maxsize))
+
+
+def score_chunk(chunk, id_column=None, pipeline=None):
+    """Predictions and class probabilities for one DataFrame chunk; ``pipeline`` defaults to the worker's."""
+    pipeline = pipeline or _worker_pipeline
+    preds, probabilities, classes = pipeline.predict_batch(chunk[FEATURE_COLUMNS], with_classes=True)
+
+    result = pd.DataFrame(index=chunk.index)
+    if id_column is not None:
+        result[id_column] = chunk[id_column].to_numpy()
+    result["prediction"] = preds
+    if probabilities is not None:
+        for i, label in enumerate(classes):
+            result[f"probability_{label}"] = probabilities[:, i]
+    return result
+
+
+def _read_chunks(config, skip_rows):
+    if config.input_path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("pyarrow is required to score Parquet files") from e
+        parquet_file = pq.ParquetFile(config.input_path)
+        columns = FEATURE_COLUMNS + ([config.id_column] if config.id_column else [])
+        seen = 0
+        for batch in parquet_file.iter_batches(batch_size=config.chunksize, columns=columns):
+            seen += batch.num_rows
+            if seen <= skip_rows:
+                continue
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(config.input_path, chunksize=config.chunksize,
+                               skiprows=(lambda i: 0 < i <= skip_rows) if skip_rows else None)
+
+
+class BatchScorer:
+    """Scores a CSV or Parquet file chunk by chunk and appends the results to a CSV.
+
+    After every written chunk a checkpoint next to the output records how many
+    chunks, rows and output bytes are complete, so a crashed run restarts from
+    the last finished chunk instead of from the top of the file. The checkpoint
+    records the input's size and mtime, so it is never resumed against a file
+    that has changed, and it is removed once the run completes. With
+    ``workers > 1`` chunks are scored on a process pool whose workers each load
+    the model once; at most ``2 * workers`` chunks are in memory at a time.
+    The registry version being scored is stored in the checkpoint as well, so a
+    resumed run finishes on the same model even if production moved meanwhile.
+    """
+
+    def __init__(self, config: BatchScoringConfig):
+        self.config = config
+
+    def _load_checkpoint(self):
+        if not (self.config.resume and os.path.exists(self.config.checkpoint_path)):
+            return {"chunks_done": 0, "rows_done": 0, "output_bytes": 0}
+
+        with open(self.config.checkpoint_path) as f:
+            checkpoint = json.load(f)
+        if checkpoint["input_path"] != self.config.input_path or checkpoint["chunksize"] != self.config.chunksize:
+            raise ValueError(f"Checkpoint {self.config.checkpoint_path} belongs to a different input or chunksize; "
+                             "delete it or disable resume")
+        if self.config.model_version is not None and checkpoint.get("model_version") != self.config.model_version:
+            raise ValueError(f"Checkpoint {self.config.checkpoint_path} was scored with model version "
+                             f"{checkpoint.get('model_version')}; delete it or disable resume")
+        if checkpoint.get("input_stat") != self._input_stat():
+            raise ValueError(f"{self.config.input_path} changed since checkpoint {self.config.checkpoint_path} "
+                             "was written; delete it or disable resume")
+        logging.info(f"Resuming batch scoring after chunk {checkpoint['chunks_done']} "
+                     f"({checkpoint['rows_done']} rows)")
+        return checkpoint
+
+    def _input_stat(self):
+        stat = os.stat(self.config.input_path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _artifact_cache_config(self, checkpoint):
+        # chunks are far larger than online requests, where sklearn's traversal beats the compiled export
+        base = ArtifactCacheConfig(use_compiled_model=False)
+        if self.config.model_path is not None or self.config.preprocessor_path is not None:
+            return ArtifactCacheConfig(model_path=self.config.model_path or base.model_path,
+                                       preprocessor_path=self.config.preprocessor_path or base.preprocessor_path,
+                                       use_compiled_model=False)
+        if self.config.model_version is not None:
+            version = self.config.model_version
+        elif "model_version" in checkpoint:
+            # a resumed run stays on the model it started with, artifacts/ included
+            version = checkpoint["model_version"]
+            if version is None:
+                return base
+        else:
+            return production_cache_config(base)
+        return replace(ModelRegistry().artifact_cache_config(version), use_compiled_model=False)
+
+    def _save_checkpoint(self, chunks_done, rows_done, output_bytes, model_version):
+        checkpoint = {
+            "input_path": self.config.input_path,
+            "model_version": model_version,
+            "input_stat": self._input_stat(),
+            "chunksize": self.config.chunksize,
+            "chunks_done": chunks_done,
+            "rows_done": rows_done,
+            "output_bytes": output_bytes,
+        }
+        tmp_path = self.config.checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.config.checkpoint_path)
+
+    def _scored_chunks(self, chunks, artifact_cache_config):
+        if self.config.workers <= 1:
+            _init_worker(artifact_cache_config)
+            for chunk in chunks:
+                yield len(chunk), score_chunk(chunk, self.config.id_column)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.config.workers, initializer=_init_worker,
+                                 initargs=(artifact_cache_config,)) as executor:
+            in_flight = deque()
+            for chunk in chunks:
+                in_flight.append((len(chunk), executor.submit(score_chunk, chunk, self.config.id_column)))
+                if len(in_flight) >= 2 * self.config.workers:
+                    n_rows, future = in_flight.popleft()
+                    yield n_rows, future.result()
+            while in_flight:
+                n_rows, future = in_flight.popleft()
+                yield n_rows, future.result()
+
+    def run(self, progress=None):
+        """Scores the whole input and returns a summary; ``progress(chunks_done, rows_done, rows_per_sec)`` is called per chunk."""
+        try:
+            checkpoint = self._load_checkpoint()
+            chunks_done = checkpoint["chunks_done"]
+            rows_done = checkpoint["rows_done"]
+            artifact_cache_config = self._artifact_cache_config(checkpoint)
+            model_version = artifact_cache_config.model_version
+            logging.info(f"Batch scoring with model version {model_version or artifact_cache_config.model_path}")
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.config.output_path)), exist_ok=True)
+            mode = "r+b" if chunks_done and os.path.exists(self.config.output_path) else "wb"
+            start = time.perf_counter()
+            rows_scored = 0
+
+            with open(self.config.output_path, mode) as output:
+                # drop anything written after the last checkpoint, e.g. a half-written chunk
+                output.truncate(checkpoint["output_bytes"] if mode == "r+b" else 0)
+                output.seek(0, os.SEEK_END)
+
+                chunks = _read_chunks(self.config, rows_done)
+                for n_rows, result in self._scored_chunks(chunks, artifact_cache_config):
+                    result.to_csv(output, index=False, header=output.tell() == 0)
+                    output.flush()
+                    os.fsync(output.fileno())
+
+                    chunks_done += 1
+                    rows_done += n_rows
+                    rows_scored += n_rows
+                    self._save_checkpoint(chunks_done, rows_done, output.tell(), model_version)
+
+                    rows_per_sec = rows_scored / max(time.perf_counter() - start, 1e-9)
+                    logging.info(f"Scored chunk {chunks_done}: {rows_done} rows total, {rows_per_sec:.0f} rows/sec")
+                    if progress is not None:
+                        progress(chunks_done, rows_done, rows_per_sec)
+
+            # the output is complete; a later run must not skip chunks of a new input at this path
+            if os.path.exists(self.config.checkpoint_path):
+                os.remove(self.config.checkpoint_path)
+
+            elapsed = time.perf_counter() - start
+            summary = {
+                "model_version": model_version,
+                "rows_scored": rows_scored,
+                "rows_total": rows_done,
+                "chunks": chunks_done,
+                "seconds": round(elapsed, 3),
+                "rows_per_sec": round(rows_scored / elapsed, 1) if elapsed > 0 else None,
+            }
+            logging.info(f"Batch scoring finished: {summary}")
+            return summary
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a large CSV or Parquet file with the trained model")
+    parser.add_argument("input_path")
+    parser.add_argument("output_path", help="CSV file the predictions are appended to")
+    parser.add_argument("--chunksize", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=1, help="score chunks on this many processes")
+    parser.add_argument("--id-column", default=None, help="input column copied to the output next to each prediction")
+    parser.add_argument("--no-resume", dest="resume", action="store_false", help="ignore an existing checkpoint")
+    parser.add_argument("--model-path", default=None,
+                        help="score this model.pkl instead of the registry's production version")
+    parser.add_argument("--preprocessor-path", default=None)
+    parser.add_argument("--model-version", default=None, help="registry version to score instead of production")
+    args = parser.parse_args(argv)
+
+    def progress(chunks_done, rows_done, rows_per_sec):
+        print(f"chunk {chunks_done}: {rows_done} rows, {rows_per_sec:,.0f} rows/sec", flush=True)
+
+    summary = BatchScorer(BatchScoringConfig(**vars(args))).run(progress)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
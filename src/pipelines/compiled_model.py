@@ -0,0 +1,316 @@
+import sys
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+from src.exceptions import CustomException
+from src.logger import logging
+from src.utils import save_object, load_object, file_digest
+
+_TREE_LEAF = -1
+# below this many (row, tree) pairs a plain Python walk beats a NumPy step per depth level
+_SCALAR_WALK_LIMIT = 16
+# first release whose GradientBoostingClassifier uses the shared loss module this export relies on
+_MIN_BOOSTING_SKLEARN = (1, 4)
+
+
+def _float32_at_most(values):
+    """float32 copies rounded towards -inf, so ``x32 <= t32`` gives the same answer as ``x32 <= t64``."""
+    rounded = values.astype(np.float32)
+    above = rounded > values
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+def _flatten(trees, dtype, value_fn):
+    """Concatenates fitted sklearn ``Tree`` objects into one set of node arrays with global child indices."""
+    features, thresholds, lefts, rights, missing_left, leaf_ids, values, roots = [], [], [], [], [], [], [], []
+    offset = n_leaves = 0
+    for tree in trees:
+        nodes = tree.__getstate__()["nodes"]
+        n_nodes = len(nodes)
+        is_leaf = nodes["left_child"] == _TREE_LEAF
+        own = np.arange(offset, offset + n_nodes)
+
+        # leaves point at themselves and always compare true, so every row can take max_depth steps
+        features.append(np.where(is_leaf, 0, nodes["feature"]).astype(np.int32))
+        thresholds.append(np.where(is_leaf, np.inf, nodes["threshold"]))
+        lefts.append(np.where(is_leaf, own, nodes["left_child"] + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, own, nodes["right_child"] + offset).astype(np.int32))
+        missing_left.append(is_leaf | nodes["missing_go_to_left"].astype(bool)
+                            if "missing_go_to_left" in nodes.dtype.names else is_leaf)
+
+        leaf_id = np.full(n_nodes, -1, dtype=np.int32)
+        leaf_id[is_leaf] = np.arange(n_leaves, n_leaves + int(is_leaf.sum()))
+        leaf_ids.append(leaf_id)
+        values.append(value_fn(tree)[is_leaf])
+
+        roots.append(offset)
+        offset += n_nodes
+        n_leaves += int(is_leaf.sum())
+
+    threshold = np.concatenate(thresholds)
+    leaf_values = np.concatenate(values)
+    if dtype == "float32":
+        threshold = _float32_at_most(threshold)
+        leaf_values = leaf_values.astype(np.float32)
+    return {
+        "feature": np.concatenate(features),
+        "threshold": threshold,
+        # interleaved (right, left) pairs: the child of node i is children[2 * i + went_left]
+        "children": np.column_stack([np.concatenate(rights), np.concatenate(lefts)]).ravel(),
+        "missing_left": np.concatenate(missing_left),
+        "leaf_id": np.concatenate(leaf_ids),
+        "leaf_values": leaf_values,
+        "roots": np.array(roots, dtype=np.int32),
+        "max_depth": max(tree.max_depth for tree in trees),
+    }
+
+
+class CompiledTreeEnsemble:
+    """Flat, array-backed replica of a fitted tree classifier from ``ModelTrainer``.
+
+    Every node of every tree lives in the same contiguous ``feature``,
+    ``threshold``, ``children`` and ``leaf_id`` arrays, and only leaves
+    keep values. Scoring walks all trees for all rows at once, one depth level
+    per NumPy step, with no per-call validation or per-tree Python dispatch.
+    Inputs are cast to float32 and thresholds compared in float64, exactly as
+    sklearn does, so predictions are identical. ``dtype='float32'`` also stores
+    thresholds (rounded down, which keeps every split decision) and leaf values
+    in float32; probabilities then agree to float32 precision.
+
+    Exposes ``classes_``, ``predict`` and ``predict_proba``, so it can stand in
+    for the sklearn model anywhere serving uses one. The NumPy walk wins on
+    the small batches of online serving; for bulk scoring sklearn's compiled
+    traversal is faster, so those callers load ``model.pkl`` instead
+    (``ArtifactCacheConfig.use_compiled_model``).
+    """
+
+    def __init__(self, kind, classes, n_features, arrays, n_outputs=1, learning_rate=None,
+                 init_raw=None, loss=None, dtype="float64", source_digest=None, source_type=None):
+        self.kind = kind
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+        self.n_outputs = n_outputs
+        self.learning_rate = learning_rate
+        self.init_raw = init_raw
+        self.loss = loss
+        self.dtype = dtype
+        self.source_digest = source_digest
+        self.source_type = source_type
+        for name, value in arrays.items():
+            setattr(self, name, value)
+
+    @classmethod
+    def compile(cls, model, dtype="float64"):
+        # sklearn's estimators are only needed to export; unpickling a compiled model for serving skips them
+        from sklearn.tree import DecisionTreeClassifier
+        from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier, GradientBoostingClassifier
+        try:
+            if dtype not in ("float64", "float32"):
+                raise ValueError(f"Unknown dtype {dtype!r}, expected 'float64' or 'float32'")
+            source_type = type(model).__name__
+
+            if isinstance(model, DecisionTreeClassifier):
+                trees, kind = [model.tree_], "tree"
+            elif isinstance(model, (RandomForestClassifier, ExtraTreesClassifier)):
+                trees, kind = [estimator.tree_ for estimator in model.estimators_], "forest"
+            elif isinstance(model, GradientBoostingClassifier):
+                return cls._compile_boosting(model, dtype, source_type)
+            else:
+                raise ValueError(f"{source_type} is not a supported tree model")
+
+            if getattr(model, "n_outputs_", 1) != 1:
+                raise ValueError("Only single-output tree classifiers can be compiled")
+            n_classes = len(model.classes_)
+            arrays = _flatten(trees, dtype, lambda tree: tree.value[:, 0, :n_classes])
+            return cls(kind, model.classes_, model.n_features_in_, arrays, dtype=dtype, source_type=source_type)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @classmethod
+    def _compile_boosting(cls, model, dtype, source_type):
+        import sklearn
+        from sklearn.dummy import DummyClassifier
+
+        # _raw_predict_init and _loss are private; only compile where their behaviour is known
+        sklearn_version = tuple(int(part) for part in sklearn.__version__.split(".")[:2] if part.isdigit())
+        if (sklearn_version < _MIN_BOOSTING_SKLEARN or not hasattr(model, "_raw_predict_init")
+                or not hasattr(getattr(model, "_loss", None), "predict_proba")):
+            raise ValueError(f"Gradient boosting export needs scikit-learn >= "
+                             f"{'.'.join(map(str, _MIN_BOOSTING_SKLEARN))}, found {sklearn.__version__}")
+        if not (isinstance(model.init_, str) and model.init_ == "zero"):
+            # the default prior gives every row the same starting score, anything else would need the estimator
+            if not isinstance(model.init_, DummyClassifier) or model.init_.strategy == "stratified":
+                raise ValueError("Only gradient boosting with a constant init estimator can be compiled")
+        init_raw = model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0]
+
+        n_stages, n_outputs = model.estimators_.shape
+        # stage-major order, so leaf values come back as (rows, stages, outputs)
+        trees = [model.estimators_[stage, k].tree_ for stage in range(n_stages) for k in range(n_outputs)]
+        arrays = _flatten(trees, dtype, lambda tree: tree.value[:, 0, :])
+        return cls("boosting", model.classes_, model.n_features_in_, arrays, n_outputs=n_outputs,
+                   learning_rate=model.learning_rate, init_raw=init_raw, loss=model._loss,
+                   dtype=dtype, source_type=source_type)
+
+    @property
+    def nbytes(self):
+        arrays = [self.feature, self.threshold, self.children, self.missing_left,
+                  self.leaf_id, self.leaf_values, self.roots]
+        return int(sum(a.nbytes for a in arrays))
+
+    def _chunk_rows(self):
+        # keeps the (rows, trees) index matrices around a few MiB
+        return max(1, (1 << 19) // len(self.roots))
+
+    def _walk(self, x, node):
+        leaf_id, feature, threshold, children = self.leaf_id, self.feature, self.threshold, self.children
+        while leaf_id[node] < 0:
+            value = x[feature[node]]
+            went_left = value <= threshold[node] or (value != value and self.missing_left[node])
+            node = children[2 * node + went_left]
+        return leaf_id[node]
+
+    def _leaf_values(self, X):
+        """Leaf values reached by every row in every tree, shape ``(rows, trees, values)``."""
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has shape {X.shape}, expected (n_samples, {self.n_features_in_})")
+
+        if X.shape[0] * len(self.roots) <= _SCALAR_WALK_LIMIT:
+            leaves = [self._walk(x, root) for x in X for root in self.roots]
+            return self.leaf_values[leaves].reshape(X.shape[0], len(self.roots), -1)
+
+        out = np.empty((X.shape[0], len(self.roots), self.leaf_values.shape[1]), dtype=self.leaf_values.dtype)
+        chunk = self._chunk_rows()
+        for start in range(0, X.shape[0], chunk):
+            X_chunk = np.ascontiguousarray(X[start:start + chunk])
+            flat = X_chunk.ravel()
+            row_offsets = (np.arange(X_chunk.shape[0]) * X_chunk.shape[1])[:, None]
+            has_missing = bool(np.isnan(X_chunk).any())
+            node = np.broadcast_to(self.roots, (X_chunk.shape[0], len(self.roots)))
+            for depth in range(self.max_depth):
+                x = flat[row_offsets + self.feature[node]]
+                go_left = x <= self.threshold[node]
+                if has_missing:
+                    go_left |= np.isnan(x) & self.missing_left[node]
+                node = self.children[2 * node + go_left]
+                # most paths are much shorter than the deepest one
+                if depth % 4 == 3 and (self.leaf_id[node] >= 0).all():
+                    break
+            out[start:start + chunk] = self.leaf_values[self.leaf_id[node]]
+        return out
+
+    def _forest_proba(self, values):
+        proba = np.zeros((values.shape[0], values.shape[2]), dtype=np.float64)
+        # per-tree normalisation and the tree-by-tree sum follow sklearn's arithmetic step for step
+        normalizer = values.sum(axis=2, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        values = values / normalizer
+        for t in range(values.shape[1]):
+            proba += values[:, t]
+        if self.kind == "forest":
+            proba /= values.shape[1]
+        return proba
+
+    def decision_function(self, X):
+        if self.kind != "boosting":
+            raise AttributeError("decision_function is only available for gradient boosting")
+        values = self._leaf_values(X).reshape(-1, len(self.roots) // self.n_outputs, self.n_outputs)
+        raw = np.tile(self.init_raw, (values.shape[0], 1))
+        for stage in range(values.shape[1]):
+            raw += self.learning_rate * values[:, stage]
+        return raw
+
+    def predict_proba(self, X):
+        try:
+            if self.kind == "boosting":
+                return self.loss.predict_proba(self.decision_function(X))
+            return self._forest_proba(self._leaf_values(X))
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def predict(self, X):
+        try:
+            if self.kind == "boosting":
+                raw = self.decision_function(X)
+                if raw.shape[1] == 1:
+                    return self.classes_[(raw[:, 0] >= 0).astype(int)]
+                return self.classes_[np.argmax(raw, axis=1)]
+            values = self._leaf_values(X)
+            if self.kind == "tree":
+                # a single tree predicts the argmax of its raw leaf value, forests that of the mean probability
+                return self.classes_.take(np.argmax(values[:, 0], axis=1), axis=0)
+            return self.classes_.take(np.argmax(self._forest_proba(values), axis=1), axis=0)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def check_equivalence(self, model, X, rtol=None, atol=None):
+        """Raises unless predicted classes equal the sklearn model's and probabilities agree within tolerance.
+
+        Forests fitted with ``n_jobs > 1`` sum their trees in a varying order,
+        so float64 probabilities are compared with a small tolerance rather
+        than bit for bit. Returns the max probability difference.
+        """
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        if not np.array_equal(model.predict(X), self.predict(X)):
+            raise ValueError("Compiled tree model predictions differ from sklearn")
+        if rtol is None:
+            rtol = 1e-9 if self.dtype == "float64" else 1e-5
+        if atol is None:
+            atol = 1e-12 if self.dtype == "float64" else 1e-5
+        expected, actual = model.predict_proba(X), self.predict_proba(X)
+        max_diff = float(np.max(np.abs(expected - actual))) if len(X) else 0.0
+        if not np.allclose(expected, actual, rtol=rtol, atol=atol):
+            raise ValueError(f"Compiled tree model probabilities differ from sklearn (max abs diff {max_diff})")
+        return max_diff
+
+
+def export_compiled_model(model, model_path, output_path, X_check, dtype="float64", backend="pickle"):
+    """Compiles ``model`` (saved at ``model_path``) and writes it to ``output_path`` if it matches sklearn on ``X_check``.
+
+    Returns the written path, or ``None`` when the model cannot be compiled; a
+    stale export at ``output_path`` is then removed. The export records the
+    digest of ``model_path`` so ``ArtifactCache`` never pairs it with another model.
+    """
+    try:
+        compiled = CompiledTreeEnsemble.compile(model, dtype=dtype)
+        max_diff = compiled.check_equivalence(model, X_check)
+    except Exception as e:
+        logging.info(f"{type(model).__name__} not exported as a compiled tree model: {e}")
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return None
+
+    compiled.source_digest = file_digest(model_path)
+    save_object(file_path=output_path, obj=compiled, backend=backend)
+    logging.info(f"Compiled {compiled.source_type} ({len(compiled.roots)} trees, {len(compiled.feature)} nodes, "
+                 f"{compiled.nbytes / 2**20:.2f} MiB of arrays) written to {output_path}; "
+                 f"{os.path.getsize(model_path) / 2**20:.2f} MiB -> {os.path.getsize(output_path) / 2**20:.2f} MiB "
+                 f"on disk, max probability diff {max_diff} on {X_check.shape[0]} check rows")
+    return output_path
+
+
+if __name__ == "__main__":
+    from src.pipelines.synthetic_data import make_synthetic_records
+
+    parser = argparse.ArgumentParser(description="Export a trained tree model as flat node arrays for serving")
+    parser.add_argument("--model-path", default=os.path.join("artifacts", "model.pkl"))
+    parser.add_argument("--preprocessor-path", default=os.path.join("artifacts", "x_transformer.pkl"))
+    parser.add_argument("--output", default=os.path.join("artifacts", "model_compiled.pkl"))
+    parser.add_argument("--dtype", choices=["float64", "float32"], default="float64")
+    parser.add_argument("--check-rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    # through the package import, so the pickle refers to src.pipelines.compiled_model and not __main__
+    from src.pipelines.compiled_model import export_compiled_model
+
+    model = load_object(args.model_path)
+    preprocessor = load_object(args.preprocessor_path)
+    X_check = preprocessor.transform(pd.DataFrame.from_records(make_synthetic_records(args.check_rows, seed=0)))
+    path = export_compiled_model(model, args.model_path, args.output, X_check, dtype=args.dtype)
+    print(path or f"{type(model).__name__} cannot be compiled")
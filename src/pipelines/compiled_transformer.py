@@ -0,0 +1,311 @@
+import sys
+import os
+import argparse
+import warnings
+import numpy as np
+import pandas as pd
+
+from src.exceptions import CustomException
+from src.logger import logging
+from src.utils import save_object, load_object, file_digest
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and value != value)
+
+
+class _NumericBlock:
+    """Median/mean/constant imputation followed by an optional StandardScaler on float columns."""
+
+    def __init__(self, columns, fill_values, mean, scale):
+        self.columns = columns
+        self.fill_values = fill_values
+        self.mean = mean
+        self.scale = scale
+        self.width = len(columns)
+
+    def prepare(self, values):
+        return np.asarray(values, dtype=np.float64)
+
+    def write(self, X, out):
+        if self.fill_values is not None:
+            missing = np.isnan(X)
+            if missing.any():
+                X = np.where(missing, self.fill_values, X)
+        if self.mean is not None:
+            X = X - self.mean
+        if self.scale is not None:
+            X = X / self.scale
+        out[:] = X
+
+
+class _OneHotBlock:
+    """Most-frequent imputation, one-hot encoding (unknown -> all zeros) and optional scaling."""
+
+    def __init__(self, columns, fill_values, categories, mean, scale):
+        self.columns = columns
+        self.fill_values = fill_values
+        self.lookups = [{category: i for i, category in enumerate(column_categories)}
+                        for column_categories in categories]
+        self.offsets = np.cumsum([0] + [len(c) for c in categories])[:-1]
+        self.mean = mean
+        self.scale = scale
+        self.width = int(sum(len(c) for c in categories))
+
+    def prepare(self, values):
+        return np.asarray(values, dtype=object)
+
+    def _codes(self, values, j):
+        lookup = self.lookups[j]
+        fill_code = -1
+        if self.fill_values is not None:
+            fill_code = lookup.get(self.fill_values[j], -1)
+        return np.fromiter(
+            (fill_code if _is_missing(v) else lookup.get(v, -1) for v in values),
+            dtype=np.int64, count=len(values)
+        )
+
+    def write(self, X, out):
+        out[:] = 0.0
+        rows = np.arange(X.shape[0])
+        for j in range(X.shape[1]):
+            codes = self._codes(X[:, j], j)
+            known = codes >= 0
+            out[rows[known], self.offsets[j] + codes[known]] = 1.0
+        if self.mean is not None:
+            out -= self.mean
+        if self.scale is not None:
+            out /= self.scale
+
+
+class _OrdinalBlock:
+    """Optional imputation followed by OrdinalEncoder codes as floats (unknown/missing -> their encoded values)."""
+
+    def __init__(self, columns, fill_values, categories, unknown_value, missing_value):
+        self.columns = columns
+        self.fill_values = fill_values
+        self.lookups = [{category: float(i) for i, category in enumerate(column_categories)
+                         if not _is_missing(category)}
+                        for column_categories in categories]
+        self.unknown_value = float(unknown_value)
+        self.missing_value = float(missing_value)
+        self.width = len(columns)
+
+    def prepare(self, values):
+        return np.asarray(values, dtype=object)
+
+    def write(self, X, out):
+        for j in range(X.shape[1]):
+            lookup = self.lookups[j]
+            fill = self.fill_values[j] if self.fill_values is not None else None
+            missing_code = self.missing_value if fill is None else lookup.get(fill, self.unknown_value)
+            out[:, j] = np.fromiter(
+                (missing_code if _is_missing(v) else lookup.get(v, self.unknown_value) for v in X[:, j]),
+                dtype=np.float64, count=X.shape[0]
+            )
+
+
+_CATEGORICAL_BLOCKS = (_OneHotBlock, _OrdinalBlock)
+
+
+def _scaler_params(scaler):
+    mean = scaler.mean_ if scaler.with_mean else None
+    scale = scaler.scale_ if scaler.with_std else None
+    return mean, scale
+
+
+# sklearn is imported by the compile-time helpers only, so serving an exported
+# CompiledTransformer never imports it
+
+
+def _is_identity(step):
+    from sklearn.preprocessing import FunctionTransformer
+    # a fitted ColumnTransformer stores 'passthrough' columns as an identity FunctionTransformer
+    return step is None or step == "passthrough" or (isinstance(step, FunctionTransformer) and step.func is None)
+
+
+def _steps(transformer):
+    from sklearn.pipeline import Pipeline
+    if isinstance(transformer, Pipeline):
+        return [step for _, step in transformer.steps if not _is_identity(step)]
+    return [] if _is_identity(transformer) else [transformer]
+
+
+def _compile_block(transformer, columns):
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import StandardScaler, OneHotEncoder, OrdinalEncoder
+    steps = _steps(transformer)
+    fill_values = None
+    if steps and isinstance(steps[0], SimpleImputer):
+        imputer = steps.pop(0)
+        if imputer.add_indicator or not (isinstance(imputer.missing_values, float) and np.isnan(imputer.missing_values)):
+            raise ValueError("Only NaN imputation without indicators can be compiled")
+        fill_values = imputer.statistics_
+
+    if steps and isinstance(steps[0], OneHotEncoder):
+        encoder = steps.pop(0)
+        if encoder.drop_idx_ is not None or encoder.handle_unknown != "ignore" or getattr(encoder, "_infrequent_enabled", False):
+            raise ValueError("Only one-hot encoders with handle_unknown='ignore' and no dropped or infrequent categories can be compiled")
+        mean = scale = None
+        if steps and isinstance(steps[0], StandardScaler):
+            mean, scale = _scaler_params(steps.pop(0))
+        if steps:
+            raise ValueError(f"Unsupported steps after one-hot encoding: {steps}")
+        categories = [list(c) for c in encoder.categories_]
+        return _OneHotBlock(columns, fill_values, categories, mean, scale)
+
+    if steps and isinstance(steps[0], OrdinalEncoder):
+        encoder = steps.pop(0)
+        if encoder.handle_unknown != "use_encoded_value" or getattr(encoder, "_infrequent_enabled", False):
+            raise ValueError("Only ordinal encoders with handle_unknown='use_encoded_value' and no infrequent categories can be compiled")
+        if steps:
+            raise ValueError(f"Unsupported steps after ordinal encoding: {steps}")
+        return _OrdinalBlock(columns, fill_values, encoder.categories_, encoder.unknown_value,
+                             encoder.encoded_missing_value)
+
+    mean = scale = None
+    if steps and isinstance(steps[0], StandardScaler):
+        mean, scale = _scaler_params(steps.pop(0))
+    if steps:
+        raise ValueError(f"Unsupported preprocessing steps: {steps}")
+    return _NumericBlock(columns, fill_values, mean, scale)
+
+
+class CompiledTransformer:
+    """Flat, array-backed replica of the fitted ``x_transformer.pkl`` ColumnTransformer.
+
+    The fitted medians, means, scales and category vocabularies are copied into
+    plain numpy arrays and dicts so records can be transformed without building a
+    DataFrame or going through sklearn's ColumnTransformer dispatch. Any
+    preprocessing step it does not understand makes ``compile`` raise, so callers
+    can fall back to the sklearn object.
+    """
+
+    def __init__(self, blocks, source_digest=None):
+        self.blocks = blocks
+        self.source_digest = source_digest
+        self.n_features_out = sum(block.width for block in blocks)
+        self.input_columns = [c for block in blocks for c in block.columns]
+
+    @classmethod
+    def compile(cls, preprocessor):
+        try:
+            blocks = []
+            for name, transformer, columns in preprocessor.transformers_:
+                if isinstance(transformer, str) and transformer == "drop" or len(columns) == 0:
+                    continue
+                if isinstance(columns[0], (int, np.integer)):
+                    raise ValueError("Column transformers selecting columns by position cannot be compiled")
+                if isinstance(transformer, str) and transformer == "passthrough":
+                    blocks.append(_NumericBlock(list(columns), None, None, None))
+                else:
+                    blocks.append(_compile_block(transformer, list(columns)))
+            return cls(blocks)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _transform(self, get_column_values, n_rows):
+        out = np.empty((n_rows, self.n_features_out), dtype=np.float64)
+        offset = 0
+        for block in self.blocks:
+            X = block.prepare(get_column_values(block.columns))
+            if X.ndim == 1:
+                X = X.reshape(n_rows, -1)
+            block.write(X, out[:, offset:offset + block.width])
+            offset += block.width
+        return out
+
+    def transform_records(self, records):
+        records = list(records)
+        return self._transform(
+            lambda columns: [[record[c] for c in columns] for record in records],
+            len(records)
+        )
+
+    def transform_columns(self, columns):
+        n_rows = len(next(iter(columns.values()))) if columns else 0
+        return self._transform(
+            lambda names: np.column_stack([np.asarray(columns[c]) for c in names]) if n_rows else np.empty((0, len(names))),
+            n_rows
+        )
+
+    def transform(self, data):
+        if isinstance(data, pd.DataFrame):
+            return self._transform(lambda names: data[names].to_numpy(), len(data))
+        if isinstance(data, dict):
+            return self.transform_columns(data)
+        return self.transform_records(data)
+
+    def check_equivalence(self, preprocessor, data, rtol=1e-9, atol=1e-12):
+        expected = preprocessor.transform(data)
+        if hasattr(expected, "toarray"):
+            expected = expected.toarray()
+        actual = self.transform(data)
+        if expected.shape != actual.shape:
+            raise ValueError(f"Compiled transformer produced shape {actual.shape}, sklearn produced {expected.shape}")
+        max_diff = float(np.max(np.abs(expected - actual))) if expected.size else 0.0
+        if not np.allclose(expected, actual, rtol=rtol, atol=atol, equal_nan=True):
+            raise ValueError(f"Compiled transformer differs from sklearn output (max abs diff {max_diff})")
+        return max_diff
+
+    def self_check(self, preprocessor):
+        """Compares against sklearn on synthetic rows covering every category, missing and unseen values."""
+        n_rows = 3 + max((len(lookup) for block in self.blocks if isinstance(block, _CATEGORICAL_BLOCKS)
+                          for lookup in block.lookups), default=0)
+        rows = []
+        for i in range(n_rows):
+            row = {}
+            for block in self.blocks:
+                for j, c in enumerate(block.columns):
+                    if isinstance(block, _CATEGORICAL_BLOCKS):
+                        categories = list(block.lookups[j])
+                        if i < n_rows - 2:
+                            row[c] = categories[i % len(categories)]
+                        else:
+                            row[c] = np.nan if i == n_rows - 2 else "__unseen__"
+                    else:
+                        base = 0.0 if block.fill_values is None else float(block.fill_values[j])
+                        row[c] = np.nan if i == 1 else base * (1 + 0.25 * i) + i
+            rows.append(row)
+
+        data = pd.DataFrame(rows, columns=self.input_columns)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            max_diff = self.check_equivalence(preprocessor, data)
+        logging.info(f"Compiled transformer matches sklearn on {len(data)} check rows (max abs diff {max_diff})")
+        return max_diff
+
+
+def export_compiled_transformer(preprocessor, preprocessor_path, output_path):
+    """Compiles ``preprocessor`` (saved at ``preprocessor_path``) and writes it to ``output_path`` if it passes ``self_check``.
+
+    Returns the written path, or ``None`` when it cannot be compiled; a stale
+    export at ``output_path`` is then removed. Like the compiled model, the
+    export records the digest of its source so ``ArtifactCache`` only serves it
+    next to that exact ``x_transformer.pkl``, and serving then never imports sklearn.
+    """
+    try:
+        compiled = CompiledTransformer.compile(preprocessor)
+        compiled.self_check(preprocessor)
+    except Exception as e:
+        logging.info(f"Preprocessor not exported as a compiled transformer: {e}")
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return None
+
+    compiled.source_digest = file_digest(preprocessor_path)
+    save_object(file_path=output_path, obj=compiled)
+    logging.info(f"Compiled transformer ({compiled.n_features_out} output features) written to {output_path}")
+    return output_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the fitted preprocessor as a compiled transformer for serving")
+    parser.add_argument("--preprocessor-path", default=os.path.join("artifacts", "x_transformer.pkl"))
+    parser.add_argument("--output", default=os.path.join("artifacts", "x_transformer_compiled.pkl"))
+    args = parser.parse_args()
+
+    # through the package import, so the pickle refers to src.pipelines.compiled_transformer and not __main__
+    from src.pipelines.compiled_transformer import export_compiled_transformer
+    path = export_compiled_transformer(load_object(args.preprocessor_path), args.preprocessor_path, args.output)
+    print(path or "The preprocessor cannot be compiled")
@@ -0,0 +1,98 @@
+import os
+import asyncio
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from src.logger import logging
+from src.pipelines.artifact_cache import get_artifact_cache
+from src.pipelines.model_registry import follow_production
+from src.pipelines.predict_pipeline import PredictPipeline
+from src.pipelines.metrics import REGISTRY, STAGE_LATENCY, ensure_multiprocess_dir
+
+
+@dataclass
+class InferenceExecutorConfig:
+    kind: str = os.getenv("INFERENCE_EXECUTOR", "thread")
+    max_workers: int = int(os.getenv("INFERENCE_WORKERS", os.cpu_count() or 1))
+    max_queue_depth: int = int(os.getenv("INFERENCE_QUEUE_DEPTH", 256))
+
+
+class InferenceQueueFullError(Exception):
+    pass
+
+
+def _init_worker():
+    # each pool process loads its own copy of the artifacts once, not per task, and follows
+    # the registry's production version on a background thread, since the server's swap
+    # happens in another process and new versions must not load inside a request
+    follow_production(get_artifact_cache())
+    get_artifact_cache().load()
+    # stage timings recorded here reach the server's /metrics through the shared metrics directory
+    REGISTRY.start_multiprocess_export()
+
+
+def predict_custom_data(custom_data):
+    with STAGE_LATENCY.time("dataframe"):
+        data = custom_data.to_df()
+    return PredictPipeline().predict(data)
+
+
+def predict_records(records, with_classes=False):
+    return PredictPipeline().predict_batch(records, with_classes=with_classes)
+
+
+class InferenceExecutor:
+    """Runs CPU-bound inference off the event loop on a thread or process pool.
+
+    Work submitted while ``max_queue_depth`` tasks are already pending is
+    rejected with ``InferenceQueueFullError`` instead of queueing without bound.
+    Only module-level functions (``predict_custom_data``, ``predict_records``)
+    can be sent to a process pool.
+    """
+
+    def __init__(self, config: InferenceExecutorConfig = None):
+        self.config = config or InferenceExecutorConfig()
+        self.executor = None
+        self._pending = 0
+
+    def start(self):
+        if self.config.kind == "process":
+            ensure_multiprocess_dir()
+            self.executor = ProcessPoolExecutor(max_workers=self.config.max_workers, initializer=_init_worker)
+        elif self.config.kind == "thread":
+            self.executor = ThreadPoolExecutor(max_workers=self.config.max_workers,
+                                               thread_name_prefix="inference")
+        else:
+            raise ValueError(f"Unknown inference executor kind: {self.config.kind}")
+        logging.info(f"Inference executor started: {self.config}")
+
+    def shutdown(self):
+        if self.executor is not None:
+            logging.info(f"Shutting down inference executor with {self._pending} pending tasks")
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def check_admission(self, queued=0):
+        """Raises ``InferenceQueueFullError`` if no more work can be accepted.
+
+        ``queued`` counts work the caller is holding back before submitting it,
+        such as records waiting in the micro-batcher.
+        """
+        if self.executor is None:
+            raise RuntimeError("Inference executor is not running")
+        if self._pending + queued >= self.config.max_queue_depth:
+            raise InferenceQueueFullError(f"Inference queue is full ({self._pending} pending tasks"
+                                          + (f", {queued} queued" if queued else "") + ")")
+
+    async def run(self, fn, *args):
+        self.check_admission()
+
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self._pending -= 1
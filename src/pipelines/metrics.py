@@ -0,0 +1,324 @@
+import os
+import json
+import time
+import atexit
+import bisect
+import shutil
+import tempfile
+import threading
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, labels, extra=None):
+    pairs = list(zip(labelnames, labels))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._values.items()]
+
+    def render(self, snapshots=()):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        merged = {}
+        for snapshot in (self.snapshot(), *snapshots):
+            for labels, value in snapshot:
+                merged[tuple(labels)] = merged.get(tuple(labels), 0) + value
+        for labels, value in sorted(merged.items(), key=lambda item: [str(label) for label in item[0]]):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Prometheus histogram; bucket counts are kept per bucket and summed when rendered."""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(labels), list(counts), total, count] for labels, (counts, total, count) in self._series.items()]
+
+    def render(self, snapshots=()):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        merged = {}
+        for snapshot in (self.snapshot(), *snapshots):
+            for labels, counts, total, count in snapshot:
+                series = merged.setdefault(tuple(labels), [[0] * (len(self.buckets) + 1), 0.0, 0])
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+                series[2] += count
+        for labels, (counts, total, count) in sorted(merged.items(), key=lambda item: [str(label) for label in item[0]]):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                label_text = _format_labels(self.labelnames, labels, ("le", _format_value(float(bound))))
+                lines.append(f"{self.name}_bucket{label_text} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+def render_gauges(prefix, values, documentation=""):
+    """Renders the numeric entries of a stats snapshot (e.g. ``MicroBatcherMetrics.snapshot()``) as gauges."""
+    lines = []
+    for key, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        name = f"{prefix}_{key}"
+        lines += [f"# HELP {name} {documentation or key.replace('_', ' ')}", f"# TYPE {name} gauge",
+                  f"{name} {_format_value(value)}"]
+    return lines
+
+
+class MetricsRegistry:
+    """The process's metrics; ``render`` also merges in what other processes exported.
+
+    Counters and histograms only live in the process that records them. When
+    ``METRICS_MULTIPROC_DIR`` is set, every process that calls
+    ``start_multiprocess_export`` writes its values to ``<dir>/<pid>.json``
+    every ``METRICS_FLUSH_SECONDS``, and ``render`` sums those files with its
+    own values, so one scrape covers all pre-fork workers and process-pool
+    workers. Files of exited processes are kept, as their counts still happened.
+    Gauges passed as ``extra_lines`` stay those of the process serving the scrape.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._export_pid = None
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def reset(self):
+        for metric in self._metrics:
+            metric.reset()
+
+    def snapshot(self):
+        return {metric.name: metric.snapshot() for metric in self._metrics}
+
+    def _export_path(self, directory):
+        return os.path.join(directory, f"{os.getpid()}.json")
+
+    def export(self):
+        directory = multiprocess_dir()
+        if directory is None:
+            return
+        path = self._export_path(directory)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def start_multiprocess_export(self, flush_seconds=None):
+        """Publishes this process's metrics to ``METRICS_MULTIPROC_DIR`` from a daemon thread; no-op when unset."""
+        if multiprocess_dir() is None or self._export_pid == os.getpid():
+            return
+        if self._export_pid is not None or _created_in_pid != os.getpid():
+            # a forked child starts with its parent's values, which the parent reports itself
+            self.reset()
+        self._export_pid = os.getpid()
+        flush_seconds = flush_seconds or float(os.getenv("METRICS_FLUSH_SECONDS", 1.0))
+
+        def flush():
+            while True:
+                time.sleep(flush_seconds)
+                try:
+                    self.export()
+                except OSError:
+                    pass
+
+        threading.Thread(target=flush, name="metrics-export", daemon=True).start()
+        atexit.register(self.export)
+
+    def _other_processes(self):
+        directory = multiprocess_dir()
+        if directory is None or self._export_pid != os.getpid():
+            return []
+        own = os.path.basename(self._export_path(directory))
+        snapshots = []
+        for name in os.listdir(directory):
+            if not name.endswith(".json") or name == own:
+                continue
+            try:
+                with open(os.path.join(directory, name)) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self, extra_lines=()):
+        others = self._other_processes()
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render([snapshot.get(metric.name, []) for snapshot in others])
+        lines += render_gauges("metrics", {"processes": 1 + len(others)}, "processes whose counters and histograms are included")
+        lines += extra_lines
+        return "\n".join(lines) + "\n"
+
+
+_created_in_pid = os.getpid()
+_MULTIPROC_DIR_ENV = "METRICS_MULTIPROC_DIR"
+
+
+def multiprocess_dir():
+    return os.environ.get(_MULTIPROC_DIR_ENV) or None
+
+
+def ensure_multiprocess_dir():
+    """Sets ``METRICS_MULTIPROC_DIR`` to a fresh temporary directory unless it is already set.
+
+    Call before forking workers or starting a process pool, so they inherit it.
+    A directory created here is removed when this process exits.
+    """
+    directory = multiprocess_dir()
+    if directory is not None:
+        return directory
+    directory = tempfile.mkdtemp(prefix="metrics_")
+    os.environ[_MULTIPROC_DIR_ENV] = directory
+    owner = os.getpid()
+    atexit.register(lambda: os.getpid() == owner and shutil.rmtree(directory, ignore_errors=True))
+    return directory
+
+
+REGISTRY = MetricsRegistry()
+
+REQUESTS = REGISTRY.counter("http_requests_total", "HTTP requests by route, method and status code",
+                            ("path", "method", "status"))
+REQUEST_ERRORS = REGISTRY.counter("http_request_errors_total", "HTTP requests that failed with a 5xx status",
+                                  ("path",))
+REQUEST_LATENCY = REGISTRY.histogram("http_request_duration_seconds", "Time from receiving a request to its response",
+                                     ("path",))
+STAGE_LATENCY = REGISTRY.histogram("prediction_stage_duration_seconds",
+                                   "Time spent in each prediction stage (validation, dataframe, parse, preprocess, predict)",
+                                   ("stage",))
+BATCH_SIZE = REGISTRY.histogram("prediction_batch_size", "Records scored per model call", ("endpoint",),
+                                buckets=BATCH_SIZE_BUCKETS)
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and timing them by route.
+
+    Stores the arrival time as ``request.state.received_at`` so handlers can
+    record how long body parsing and validation took. Paths that do not match
+    a route are reported as ``unmatched`` to keep label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._known_paths = None
+
+    def _path_label(self, scope):
+        if self._known_paths is None:
+            router = scope.get("router") or getattr(scope.get("app"), "router", None)
+            self._known_paths = {getattr(route, "path", None) for route in getattr(router, "routes", [])}
+        path = scope.get("path", "")
+        return path if path in self._known_paths else "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        scope.setdefault("state", {})["received_at"] = start
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            path = self._path_label(scope)
+            REQUEST_LATENCY.observe(time.perf_counter() - start, path)
+            REQUESTS.inc(path, scope.get("method", ""), status)
+            if status >= 500:
+                REQUEST_ERRORS.inc(path)
+
+
+def observe_validation(request):
+    """Records the time between the request arriving and the handler starting (body read + pydantic)."""
+    received_at = getattr(request.state, "received_at", None)
+    if received_at is not None:
+        STAGE_LATENCY.observe(time.perf_counter() - received_at, "validation")
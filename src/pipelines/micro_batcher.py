@@ -0,0 +1,169 @@
+import os
+import time
+import asyncio
+from dataclasses import dataclass
+
+from src.logger import logging
+from src.pipelines.inference_executor import InferenceQueueFullError
+
+
+@dataclass
+class MicroBatcherConfig:
+    enabled: bool = os.getenv("MICRO_BATCHING", "0") == "1"
+    max_batch_size: int = int(os.getenv("MICRO_BATCH_MAX_SIZE", 64))
+    max_wait_ms: float = float(os.getenv("MICRO_BATCH_WAIT_MS", 5))
+
+
+class MicroBatcherMetrics:
+    def __init__(self):
+        self.batches = 0
+        self.items = 0
+        self.max_batch_size = 0
+        self.batch_size_counts = {}
+        self.queue_wait_total_seconds = 0.0
+        self.queue_wait_max_seconds = 0.0
+
+    def record_batch(self, queue_waits):
+        size = len(queue_waits)
+        self.batches += 1
+        self.items += size
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.batch_size_counts[size] = self.batch_size_counts.get(size, 0) + 1
+        self.queue_wait_total_seconds += sum(queue_waits)
+        self.queue_wait_max_seconds = max(self.queue_wait_max_seconds, max(queue_waits))
+
+    def snapshot(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "batch_size_counts": dict(sorted(self.batch_size_counts.items())),
+            "mean_queue_wait_ms": 1000 * self.queue_wait_total_seconds / self.items if self.items else 0.0,
+            "max_queue_wait_ms": 1000 * self.queue_wait_max_seconds,
+        }
+
+
+class MicroBatcher:
+    """Collects concurrent single-record requests and scores them as one batch.
+
+    ``predict_fn`` takes a list of records and returns ``(predictions, probabilities)``
+    like ``PredictPipeline.predict_batch``; it runs through ``executor`` (an
+    ``InferenceExecutor``) so the event loop keeps accepting requests while a
+    batch is being scored, and so batches are subject to the executor's queue
+    depth limit. Records waiting here count against that limit as well. If a
+    batch fails, its records are scored one by one so only the bad record's
+    request fails. The collection window is only used once traffic actually
+    produces batches larger than one, so an idle service does not add
+    ``max_wait_ms`` to every request.
+    """
+
+    def __init__(self, predict_fn, config: MicroBatcherConfig = None, executor=None):
+        self.predict_fn = predict_fn
+        self.config = config or MicroBatcherConfig()
+        self.executor = executor
+        self.metrics = MicroBatcherMetrics()
+        self._queue = None
+        self._task = None
+        self._avg_batch_size = 1.0
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        logging.info(f"Micro-batcher started: {self.config}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher stopped"))
+
+    async def submit(self, record):
+        if self._task is None:
+            raise RuntimeError("Micro-batcher is not running")
+        if self.executor is not None:
+            self.executor.check_admission(queued=self._queue.qsize())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        max_size = self.config.max_batch_size
+
+        while len(batch) < max_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        if self._avg_batch_size > 1.5:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.config.max_wait_ms / 1000
+            while len(batch) < max_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+        self._avg_batch_size = 0.8 * self._avg_batch_size + 0.2 * len(batch)
+        return batch
+
+    async def _score(self, records):
+        if self.executor is None:
+            return await asyncio.get_running_loop().run_in_executor(None, self.predict_fn, records)
+        return await self.executor.run(self.predict_fn, records)
+
+    async def _score_each(self, batch):
+        # One record at a time: the batch already held one executor slot, so
+        # this does not put more work in front of other requests.
+        for record, future, _ in batch:
+            if future.done():
+                continue
+            try:
+                preds, probabilities = await self._score([record])
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result((preds[0], None if probabilities is None else probabilities[0]))
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            dispatched_at = time.perf_counter()
+            self.metrics.record_batch([dispatched_at - enqueued_at for _, _, enqueued_at in batch])
+
+            records = [record for record, _, _ in batch]
+            try:
+                try:
+                    preds, probabilities = await self._score(records)
+                except InferenceQueueFullError as e:
+                    for _, future, _ in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                except Exception as e:
+                    if len(batch) == 1:
+                        if not batch[0][1].done():
+                            batch[0][1].set_exception(e)
+                    else:
+                        logging.warning(f"Batch of {len(batch)} records failed ({e}); scoring them one by one")
+                        await self._score_each(batch)
+                    continue
+            except asyncio.CancelledError:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Micro-batcher stopped"))
+                raise
+
+            for i, (_, future, _) in enumerate(batch):
+                if not future.done():
+                    future.set_result((preds[i], None if probabilities is None else probabilities[i]))
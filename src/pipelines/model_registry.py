@@ -0,0 +1,359 @@
+import sys
+import os
+import json
+import fcntl
+import time
+import shutil
+import argparse
+import threading
+from datetime import datetime, timezone
+from dataclasses import dataclass, replace
+
+from src.exceptions import CustomException
+from src.logger import logging
+from src.utils import file_digest
+from src.pipelines.artifact_cache import ArtifactCacheConfig, get_artifact_cache
+
+# registry file name for every artifact a version can hold; model and preprocessor are required
+REGISTERED_FILES = {
+    "model": "model.pkl",
+    "preprocessor": "x_transformer.pkl",
+    "compiled_model": "model_compiled.pkl",
+    "compiled_preprocessor": "x_transformer_compiled.pkl",
+    "model_report": "model_report.json",
+}
+PRODUCTION = "production"
+SHADOW = "shadow"
+
+
+@dataclass
+class ModelRegistryConfig:
+    registry_dir: str = os.getenv("MODEL_REGISTRY_DIR", os.path.join("artifacts", "registry"))
+    enabled: bool = os.getenv("MODEL_REGISTRY", "1") == "1"
+    # newly trained versions go straight to production, as overwriting artifacts/model.pkl used to
+    auto_promote: bool = os.getenv("MODEL_REGISTRY_AUTO_PROMOTE", "1") == "1"
+    poll_seconds: float = float(os.getenv("MODEL_REGISTRY_POLL_SECONDS", 2))
+
+
+class ModelRegistry:
+    """Local, append-only store of trained model + preprocessor pairs.
+
+    Every version is a directory ``versions/vNNNN`` holding copies of the
+    artifacts and a ``metadata.json`` with their digests and training metrics.
+    It is assembled in a temporary directory and renamed into place, so a
+    version is either complete or absent. Aliases (``production``, ``shadow``)
+    live in ``aliases.json``, replaced atomically, and are how serving finds
+    the version to load. Registering the same model and preprocessor twice
+    returns the existing version.
+    """
+
+    def __init__(self, config: ModelRegistryConfig = None):
+        self.config = config or ModelRegistryConfig()
+        self.versions_dir = os.path.join(self.config.registry_dir, "versions")
+        self.aliases_path = os.path.join(self.config.registry_dir, "aliases.json")
+
+    def version_dir(self, version):
+        return os.path.join(self.versions_dir, version)
+
+    def list_versions(self):
+        if not os.path.isdir(self.versions_dir):
+            return []
+        versions = []
+        for name in sorted(os.listdir(self.versions_dir)):
+            metadata_path = os.path.join(self.versions_dir, name, "metadata.json")
+            if os.path.exists(metadata_path):
+                with open(metadata_path) as f:
+                    versions.append(json.load(f))
+        return versions
+
+    def get(self, version):
+        metadata_path = os.path.join(self.version_dir(version), "metadata.json")
+        if not os.path.exists(metadata_path):
+            raise ValueError(f"Unknown model version {version!r}")
+        with open(metadata_path) as f:
+            return json.load(f)
+
+    def _find(self, digests):
+        for metadata in self.list_versions():
+            if all(metadata["files"].get(name, {}).get("sha256") == digests[name] for name in ("model", "preprocessor")):
+                return metadata["version"]
+        return None
+
+    def register(self, files, metrics=None, source=None):
+        """Copies ``files`` (``{name: path}``, names from ``REGISTERED_FILES``) into a new version and returns its id."""
+        try:
+            missing = [name for name in ("model", "preprocessor") if not files.get(name)]
+            if missing:
+                raise ValueError(f"A model version needs {missing}")
+            files = {name: path for name, path in files.items() if path and os.path.exists(path)}
+            unknown = [name for name in files if name not in REGISTERED_FILES]
+            if unknown:
+                raise ValueError(f"Unknown registry files {unknown}, expected {list(REGISTERED_FILES)}")
+
+            digests = {name: file_digest(path) for name, path in files.items()}
+            existing = self._find(digests)
+            if existing is not None:
+                logging.info(f"Model already registered as {existing}")
+                return existing
+
+            os.makedirs(self.versions_dir, exist_ok=True)
+            tmp_dir = os.path.join(self.config.registry_dir, f".tmp-{os.getpid()}-{threading.get_ident()}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            try:
+                for name, path in files.items():
+                    shutil.copy2(path, os.path.join(tmp_dir, REGISTERED_FILES[name]))
+                metadata = {
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "source": source,
+                    "metrics": metrics or {},
+                    "files": {name: {"path": REGISTERED_FILES[name], "sha256": digests[name],
+                                     "size_bytes": os.path.getsize(path)} for name, path in files.items()},
+                }
+
+                # the rename fails if another process took the number first, then the next one is tried
+                while True:
+                    numbers = [int(name[1:]) for name in os.listdir(self.versions_dir) if name[1:].isdigit()]
+                    version = f"v{max(numbers, default=0) + 1:04d}"
+                    metadata["version"] = version
+                    with open(os.path.join(tmp_dir, "metadata.json"), "w") as f:
+                        json.dump(metadata, f, indent=2)
+                    try:
+                        os.rename(tmp_dir, self.version_dir(version))
+                        break
+                    except OSError:
+                        if not os.path.exists(self.version_dir(version)):
+                            raise
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+            logging.info(f"Registered model version {version}: {metrics}")
+            return version
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def aliases(self):
+        try:
+            with open(self.aliases_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def resolve(self, alias):
+        return self.aliases().get(alias)
+
+    def fingerprint(self, version):
+        """``(version, model sha256, preprocessor sha256)``; tells a rebuilt registry's ``v0001`` from the old one."""
+        files = self.get(version)["files"]
+        return version, files["model"]["sha256"], files["preprocessor"]["sha256"]
+
+    def set_alias(self, alias, version):
+        """Points ``alias`` at ``version`` (``None`` removes it); readers see either the old or the new file."""
+        try:
+            if version is not None:
+                self.get(version)
+            os.makedirs(self.config.registry_dir, exist_ok=True)
+            # writers are serialized so concurrent promote/shadow calls cannot drop each other's update
+            with open(f"{self.aliases_path}.lock", "w") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                aliases = self.aliases()
+                if version is None:
+                    aliases.pop(alias, None)
+                else:
+                    aliases[alias] = version
+                tmp_path = f"{self.aliases_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(aliases, f, indent=2)
+                os.replace(tmp_path, self.aliases_path)
+            logging.info(f"Model registry alias {alias} -> {version}")
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def promote(self, version):
+        self.set_alias(PRODUCTION, version)
+
+    def artifact_cache_config(self, version):
+        """``ArtifactCacheConfig`` serving ``version`` straight from its registry directory."""
+        version_dir = self.version_dir(version)
+        return ArtifactCacheConfig(
+            model_path=os.path.join(version_dir, REGISTERED_FILES["model"]),
+            preprocessor_path=os.path.join(version_dir, REGISTERED_FILES["preprocessor"]),
+            compiled_model_path=os.path.join(version_dir, REGISTERED_FILES["compiled_model"]),
+            compiled_preprocessor_path=os.path.join(version_dir, REGISTERED_FILES["compiled_preprocessor"]),
+            model_version=version,
+        )
+
+
+def _smoke_test(artifacts):
+    # a version that cannot score synthetic requests is never swapped in
+    from src.pipelines.synthetic_data import make_synthetic_records
+    artifacts.model.predict(artifacts.transform(make_synthetic_records(8, seed=0)))
+
+
+class RegistryFollower:
+    """Keeps an ``ArtifactCache`` on the version a registry alias points to.
+
+    ``sync`` loads and smoke-tests a newly promoted version next to the current
+    one and then swaps it in with ``ArtifactCache.swap``; requests already
+    scoring keep the artifacts they started with. A version that fails to load
+    or fails the smoke test is remembered and not retried until the alias
+    points elsewhere. ``start`` repeats ``sync`` every ``poll_seconds`` on a
+    daemon thread, for processes without an event loop to schedule it.
+    """
+
+    def __init__(self, artifact_cache, registry: ModelRegistry = None, alias=PRODUCTION):
+        self.artifact_cache = artifact_cache
+        self.registry = registry or ModelRegistry()
+        self.alias = alias
+        self.rejected = None
+
+    def sync(self):
+        version = self.registry.resolve(self.alias)
+        if version is None or version == self.artifact_cache.config.model_version:
+            return False
+        fingerprint = self.registry.fingerprint(version)
+        if fingerprint == self.rejected:
+            return False
+        previous = self.artifact_cache.config.model_version
+        # the cache keeps its own choice of engine, e.g. model.pkl rather than the compiled export for bulk scoring
+        config = replace(self.registry.artifact_cache_config(version),
+                         use_compiled_model=self.artifact_cache.config.use_compiled_model,
+                         compile_preprocessor=self.artifact_cache.config.compile_preprocessor)
+        try:
+            self.artifact_cache.swap(config, check=_smoke_test)
+        except Exception:
+            self.rejected = fingerprint
+            logging.error(f"Model version {version} rejected, still serving {previous or 'unversioned artifacts'}")
+            raise
+        logging.info(f"Serving model version {version} (was {previous or 'unversioned artifacts'})")
+        return True
+
+    def start(self):
+        thread = threading.Thread(target=self._follow, name=f"registry-{self.alias}", daemon=True)
+        thread.start()
+        return thread
+
+    def _follow(self):
+        while True:
+            time.sleep(self.registry.config.poll_seconds)
+            try:
+                self.sync()
+            except Exception as e:
+                logging.error(f"Could not switch to the {self.alias} model version: {e}")
+
+
+def follow_production(artifact_cache, registry: ModelRegistry = None):
+    """Moves ``artifact_cache`` to the production version now and keeps it there on a daemon thread.
+
+    Returns the ``RegistryFollower``, or ``None`` when the registry is disabled.
+    A production version that cannot be loaded is logged and the cache keeps
+    its current artifacts.
+    """
+    registry = registry or ModelRegistry()
+    if not registry.config.enabled:
+        return None
+    follower = RegistryFollower(artifact_cache, registry)
+    try:
+        follower.sync()
+    except Exception as e:
+        logging.error(f"Could not switch to the production model version: {e}")
+    follower.start()
+    return follower
+
+
+_followed_caches = {}
+_followed_caches_lock = threading.Lock()
+
+
+def get_followed_artifact_cache(config: ArtifactCacheConfig = None):
+    """``get_artifact_cache(config)``, kept on the production version by a ``follow_production`` thread.
+
+    The thread is started once per process (a forked child starts its own),
+    for caches other than the one the API's registry watcher already follows.
+    """
+    artifact_cache = get_artifact_cache(config)
+    with _followed_caches_lock:
+        if _followed_caches.get(id(artifact_cache)) != os.getpid():
+            follow_production(artifact_cache)
+            _followed_caches[id(artifact_cache)] = os.getpid()
+    return artifact_cache
+
+
+def production_cache_config(base: ArtifactCacheConfig = None, registry: ModelRegistry = None):
+    """``base`` pointed at the production version, or ``base`` itself while none is promoted."""
+    base = base or ArtifactCacheConfig()
+    registry = registry or ModelRegistry()
+    version = registry.resolve(PRODUCTION) if registry.config.enabled else None
+    if version is None:
+        return base
+    return replace(registry.artifact_cache_config(version), use_compiled_model=base.use_compiled_model,
+                   compile_preprocessor=base.compile_preprocessor)
+
+
+def register_artifacts(files, metrics, source, registry: ModelRegistry = None):
+    """Registers ``files`` (see ``ModelRegistry.register``) and, with ``auto_promote``, makes them production."""
+    registry = registry or ModelRegistry()
+    if not registry.config.enabled:
+        return None
+    version = registry.register(files, metrics=metrics, source=source)
+    if registry.config.auto_promote and registry.resolve(PRODUCTION) != version:
+        registry.promote(version)
+    return version
+
+
+def register_trained_model(model_trainer_config, metrics, source="ModelTrainer", registry: ModelRegistry = None):
+    """Registers the artifacts a ``ModelTrainer`` wrote and, with ``auto_promote``, makes them production."""
+    return register_artifacts({
+        "model": model_trainer_config.trainer_model_path,
+        "preprocessor": model_trainer_config.preprocessor_path,
+        "compiled_model": model_trainer_config.compiled_model_path,
+        "compiled_preprocessor": model_trainer_config.compiled_preprocessor_path,
+        "model_report": model_trainer_config.model_report_path,
+    }, metrics=metrics, source=source, registry=registry)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and manage the local model registry")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="every version with its metrics and aliases")
+    show = subparsers.add_parser("show", help="metadata of one version")
+    show.add_argument("version")
+    register = subparsers.add_parser("register", help="register the artifacts in artifacts/ as a new version")
+    register.add_argument("--artifacts-dir", default="artifacts")
+    register.add_argument("--promote", action="store_true")
+    promote = subparsers.add_parser("promote", help="serve a version in production (also used to roll back)")
+    promote.add_argument("version")
+    shadow = subparsers.add_parser("shadow", help="score a candidate version in shadow mode")
+    shadow.add_argument("version", nargs="?", help="omit to stop shadowing")
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry()
+    if args.command == "list":
+        aliases = registry.aliases()
+        for metadata in registry.list_versions():
+            names = [alias for alias, version in aliases.items() if version == metadata["version"]]
+            print(f"{metadata['version']}  {metadata['created_at']}  {json.dumps(metadata['metrics'])}"
+                  + (f"  [{', '.join(names)}]" if names else ""))
+    elif args.command == "show":
+        print(json.dumps(registry.get(args.version), indent=2))
+    elif args.command == "register":
+        metrics = {}
+        report_path = os.path.join(args.artifacts_dir, REGISTERED_FILES["model_report"])
+        if os.path.exists(report_path):
+            with open(report_path) as f:
+                report = json.load(f)
+            metrics = {"best_model": report["best_model"],
+                       "accuracy": report["models"][report["best_model"]]["accuracy"]}
+        version = registry.register({name: os.path.join(args.artifacts_dir, file_name)
+                                     for name, file_name in REGISTERED_FILES.items()}, metrics=metrics, source="cli")
+        if args.promote:
+            registry.promote(version)
+        print(version)
+    elif args.command == "promote":
+        registry.promote(args.version)
+    elif args.command == "shadow":
+        registry.set_alias(SHADOW, args.version)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,69 @@
 import sys
+import os
+import numpy as np
 import pandas as pd
+from dataclasses import dataclass
 from src.exceptions import CustomException
-from src.utils import load_object
-import os
+from src.logger import logging
+from src.pipelines.artifact_cache import ArtifactCache, get_artifact_cache
+from src.pipelines.metrics import STAGE_LATENCY, BATCH_SIZE
+
+FEATURE_COLUMNS = [
+    "Delay_from_due_date", "Num_of_Delayed_Payment", "Num_Credit_Inquiries",
+    "Credit_Utilization_Ratio", "Credit_History_Age", "Payment_of_Min_Amount",
+    "Amount_invested_monthly", "Monthly_Balance", "Credit_Mix", "Payment_Behaviour",
+    "Age", "Annual_Income", "Num_Bank_Accounts", "Num_Credit_Card", "Interest_Rate",
+    "Num_of_Loan", "Monthly_Inhand_Salary", "Changed_Credit_Limit", "Outstanding_Debt",
+    "Total_EMI_per_month"
+]
+CATEGORICAL_COLUMNS = ["Payment_of_Min_Amount", "Credit_Mix", "Payment_Behaviour"]
+_FEATURE_SET = frozenset(FEATURE_COLUMNS)
+
+
+@dataclass
+class PredictPipelineConfig:
+    max_batch_size:int = int(os.getenv("MAX_BATCH_SIZE", 10000))
+
+
+def check_records(records):
+    """Raises if a feature column is missing; returns ``records`` with ``CustomData`` items turned into dicts.
+
+    Accepts the same inputs as ``records_to_df`` and is what the compiled
+    transformer gets instead of a DataFrame.
+    """
+    if isinstance(records, (pd.DataFrame, dict)):
+        present = records.columns if isinstance(records, pd.DataFrame) else records
+        missing = {c for c in FEATURE_COLUMNS if c not in present}
+    else:
+        records = [r.__dict__ if isinstance(r, CustomData) else r for r in records]
+        missing = set()
+        for record in records:
+            if isinstance(record, dict) and not record.keys() >= _FEATURE_SET:
+                missing |= _FEATURE_SET - record.keys()
+    if missing:
+        raise ValueError(f"Missing feature columns: {[c for c in FEATURE_COLUMNS if c in missing]}")
+    return records
+
+
+def records_to_df(records):
+    """Builds one DataFrame from a DataFrame, a columnar dict of lists or a list of records."""
+    records = check_records(records)
+    if isinstance(records, pd.DataFrame):
+        data = records
+    elif isinstance(records, dict):
+        data = pd.DataFrame(records)
+    else:
+        data = pd.DataFrame.from_records(records, columns=FEATURE_COLUMNS)
+    return data[FEATURE_COLUMNS]
+
+
+def _count_rows(records):
+    if isinstance(records, dict):
+        lengths = {len(values) for values in records.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length")
+        return lengths.pop() if lengths else 0
+    return len(records)
 
 class CustomData:
     def __init__(self,
@@ -81,32 +142,75 @@ class CustomData:
             raise CustomException(e,sys) 
 
 class PredictPipeline:
-    def __init__(self):
-        pass
+    def __init__(self,artifact_cache:ArtifactCache = None,config:PredictPipelineConfig = None):
+        self.artifact_cache = artifact_cache or get_artifact_cache()
+        self.config = config or PredictPipelineConfig()
+
     def predict(self,data):
         try:
 
-            model_path = os.path.join("artifacts","model.pkl")
-            preprocessor_path = os.path.join("artifacts","x_transformer.pkl")
-            print("Before Loading the model")
-            model = load_object(model_path)
-            preprocessor = load_object(preprocessor_path)
-            print("After Loading the model")
+            artifacts = self.artifact_cache.get()
+            model = artifacts.model
 
-            print(f"feature Columns : {data.columns}")
-            print(f"Data Types : {data.dtypes}")
-            print(f"Data Head : {data.head()}")
+            debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+            if debug:
+                # rendering the frame is expensive, only do it when someone asked for DEBUG logs
+                logging.debug(f"feature Columns : {list(data.columns)} Data Types : {data.dtypes.to_dict()}")
+                logging.debug(f"Data Head : {data.head().to_dict(orient='records')}")
 
-            data_scaled = preprocessor.transform(data)
+            with STAGE_LATENCY.time("preprocess"):
+                data_scaled = artifacts.transform(data)
 
-            print(f"scaled Data shape : {data_scaled.shape}")
-            preds = model.predict(data_scaled)
-            
-            print(f"prediction : {preds}")
+            with STAGE_LATENCY.time("predict"):
+                preds = model.predict(data_scaled)
+            BATCH_SIZE.observe(len(preds), "predict")
+
+            if debug:
+                logging.debug(f"scaled Data shape : {data_scaled.shape} prediction : {preds}")
             return preds
         except Exception as e:
             raise CustomException(e,sys)
 
+    def predict_batch(self,records,with_classes=False):
+        """Scores many records with one transform and one model call.
+
+        Returns ``(predictions, probabilities)`` in input order; ``probabilities``
+        is ``None`` when the model has no ``predict_proba``. With ``with_classes``
+        the model's ``classes_`` are appended, taken from the same artifacts
+        that scored the batch so a hot swap cannot pair them with another model.
+        """
+        try:
+            artifacts = self.artifact_cache.get()
+            if artifacts.compiled_preprocessor is None:
+                # the compiled transformer reads records and columns directly, sklearn needs a DataFrame
+                with STAGE_LATENCY.time("dataframe"):
+                    records = records_to_df(records)
+            else:
+                records = check_records(records)
+            n_rows = _count_rows(records)
+            if n_rows > self.config.max_batch_size:
+                raise ValueError(f"Batch of {n_rows} records exceeds max_batch_size={self.config.max_batch_size}")
+            model = artifacts.model
+            if n_rows == 0:
+                result = np.empty(0), None
+            else:
+                with STAGE_LATENCY.time("preprocess"):
+                    data_scaled = artifacts.transform(records)
+                BATCH_SIZE.observe(n_rows, "predict_batch")
+
+                with STAGE_LATENCY.time("predict"):
+                    if not hasattr(model, "predict_proba"):
+                        result = model.predict(data_scaled), None
+                    else:
+                        # predict() is argmax over predict_proba for every candidate model, so one pass gives both
+                        probabilities = model.predict_proba(data_scaled)
+                        result = model.classes_.take(np.argmax(probabilities, axis=1)), probabilities
+            if with_classes:
+                return (*result, getattr(model, "classes_", None))
+            return result
+        except Exception as e:
+            raise CustomException(e,sys)
+
 
 
 
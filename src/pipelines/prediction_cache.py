@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from src.logger import logging
+from src.pipelines.predict_pipeline import FEATURE_COLUMNS
+
+
+@dataclass
+class PredictionCacheConfig:
+    enabled: bool = os.getenv("PREDICTION_CACHE", "0") == "1"
+    max_entries: int = int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", 100000))
+    max_bytes: int = int(os.getenv("PREDICTION_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    ttl_seconds: float = float(os.getenv("PREDICTION_CACHE_TTL", 300))
+    version_check_seconds: float = 1.0
+
+
+def canonical_key(record):
+    """Hash of the 20 input features; ints in float fields were already coerced by pydantic."""
+    payload = json.dumps([record[c] for c in FEATURE_COLUMNS], separators=(",", ":"))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def _entry_size(key, value):
+    size = sys.getsizeof(key) + sys.getsizeof(value) + 120  # OrderedDict node and tuple overhead
+    if isinstance(value, (tuple, list)):
+        size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+
+def _retrieve_exception(task):
+    # marks a failure as retrieved when every caller waiting on it was cancelled
+    if not task.cancelled():
+        task.exception()
+
+
+class PredictionCacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def snapshot(self):
+        return dict(vars(self))
+
+
+class PredictionCache:
+    """LRU + TTL cache of predictions keyed by the canonical hash of a record.
+
+    Concurrent requests for a key that is already being computed wait on the
+    same task instead of running the pipeline again ("singleflight"). The task
+    belongs to the cache, not to the first request, so that request being
+    cancelled does not fail the others waiting on it. ``version_fn`` is polled at most every
+    ``version_check_seconds`` and the cache is cleared whenever its value
+    changes, e.g. when ``model.pkl`` is replaced. Must be used from a single
+    event loop.
+    """
+
+    def __init__(self, config: PredictionCacheConfig = None, version_fn=None):
+        self.config = config or PredictionCacheConfig()
+        self.version_fn = version_fn
+        self.stats = PredictionCacheStats()
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._bytes = 0
+        self._version = version_fn() if version_fn else None
+        self._version_checked_at = time.monotonic()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _check_version(self, now):
+        if self.version_fn is None or now - self._version_checked_at < self.config.version_check_seconds:
+            return
+        self._version_checked_at = now
+        version = self.version_fn()
+        if version != self._version:
+            logging.info(f"Model artifacts changed, clearing {len(self._entries)} cached predictions")
+            self._version = version
+            self.clear()
+            self.stats.invalidations += 1
+
+    def _lookup(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, size = entry
+        if expires_at <= now:
+            del self._entries[key]
+            self._bytes -= size
+            self.stats.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key, value, version):
+        if version != self._version:
+            return  # computed against artifacts that have since been replaced
+        size = _entry_size(key, value)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[2]
+        self._entries[key] = (value, time.monotonic() + self.config.ttl_seconds, size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.config.max_entries or self._bytes > self.config.max_bytes):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.stats.evictions += 1
+
+    async def get_or_compute(self, record, compute):
+        now = time.monotonic()
+        self._check_version(now)
+        key = canonical_key(record)
+
+        entry = self._lookup(key, now)
+        if entry is not None:
+            self.stats.hits += 1
+            return entry[0]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats.coalesced += 1
+        else:
+            self.stats.misses += 1
+            task = asyncio.ensure_future(self._compute(key, compute, self._version))
+            task.add_done_callback(_retrieve_exception)
+            self._inflight[key] = task
+        # a caller that is cancelled (e.g. its client disconnected) stops waiting, the computation does not
+        return await asyncio.shield(task)
+
+    async def _compute(self, key, compute, version):
+        try:
+            value = await compute()
+        finally:
+            del self._inflight[key]
+        self._store(key, value, version)
+        return value
+
+    def snapshot(self):
+        return {
+            **self.stats.snapshot(),
+            "entries": len(self._entries),
+            "approx_bytes": self._bytes,
+            "inflight": len(self._inflight),
+            "max_entries": self.config.max_entries,
+            "max_bytes": self.config.max_bytes,
+            "ttl_seconds": self.config.ttl_seconds,
+        }
@@ -0,0 +1,139 @@
+import os
+import gc
+import sys
+import time
+import signal
+import socket
+from dataclasses import dataclass
+
+import uvicorn
+
+from src.logger import logging
+from src.pipelines.metrics import ensure_multiprocess_dir
+
+
+@dataclass
+class ServerConfig:
+    host: str = os.getenv("HOST", "127.0.0.1")
+    port: int = int(os.getenv("PORT", 8000))
+    workers: int = int(os.getenv("WEB_WORKERS", 1))
+    warmup_requests: int = int(os.getenv("WARMUP_REQUESTS", 8))
+    log_level: str = os.getenv("LOG_LEVEL", "info")
+    # a worker that exits sooner than this after its start counts as a failed start
+    worker_min_uptime_seconds: float = float(os.getenv("WORKER_MIN_UPTIME", 10))
+    # restarts after failed starts wait this long, doubling up to the maximum
+    worker_restart_backoff_seconds: float = float(os.getenv("WORKER_RESTART_BACKOFF", 0.5))
+    worker_max_restart_backoff_seconds: float = float(os.getenv("WORKER_MAX_RESTART_BACKOFF", 30))
+    # the server gives up after this many failed starts in a row
+    worker_max_failed_starts: int = int(os.getenv("WORKER_MAX_FAILED_STARTS", 5))
+
+
+def _bind_socket(config: ServerConfig):
+    sock = socket.socket(socket.AF_INET6 if ":" in config.host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((config.host, config.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock, config: ServerConfig):
+    server = uvicorn.Server(uvicorn.Config(app, log_level=config.log_level, lifespan="on"))
+    server.run(sockets=[sock])
+
+
+def serve(app, warm_up, config: ServerConfig = None):
+    """Warms the app in this process, then forks ``config.workers`` uvicorn workers.
+
+    ``warm_up`` loads the artifacts and runs a few synthetic predictions before
+    the fork, so every worker starts with the model already in (copy-on-write
+    shared) memory and the lazy first-call costs already paid. ``gc.freeze``
+    keeps the collector from touching, and so un-sharing, those inherited
+    objects. Workers that die are restarted until SIGINT/SIGTERM. A worker
+    that exits within ``worker_min_uptime_seconds`` counts as a failed start:
+    its restart is delayed with exponential backoff, and after
+    ``worker_max_failed_starts`` of them in a row the server stops every
+    worker and exits with status 1 rather than fork in a loop.
+    """
+    config = config or ServerConfig()
+
+    start = time.perf_counter()
+    warm_up(config.warmup_requests)
+    logging.info(f"Parent warm-up finished in {time.perf_counter() - start:.3f}s")
+
+    sock = _bind_socket(config)
+    logging.info(f"Listening on {config.host}:{config.port} with {config.workers} workers")
+    if config.workers <= 1:
+        _run_worker(app, sock, config)
+        return
+
+    # each worker exports its metrics there, so any worker's /metrics covers all of them
+    ensure_multiprocess_dir()
+    gc.collect()
+    gc.freeze()
+
+    children = {}
+    stopping = False
+    failed_starts = 0
+    exit_status = 0
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                _run_worker(app, sock, config)
+            finally:
+                os._exit(0)
+        children[pid] = time.monotonic()
+        logging.info(f"Started worker {pid}")
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for _ in range(config.workers):
+        spawn()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        uptime = time.monotonic() - children.pop(pid)
+        if stopping:
+            continue
+
+        failed_starts = failed_starts + 1 if uptime < config.worker_min_uptime_seconds else 0
+        if failed_starts >= config.worker_max_failed_starts:
+            logging.error(f"Worker {pid} exited with status {status} after {uptime:.1f}s; "
+                          f"{failed_starts} failed starts in a row, stopping the server")
+            exit_status = 1
+            stop(None, None)
+            continue
+
+        delay = 0.0
+        if failed_starts:
+            delay = min(config.worker_restart_backoff_seconds * 2 ** (failed_starts - 1),
+                        config.worker_max_restart_backoff_seconds)
+        logging.warning(f"Worker {pid} exited with status {status} after {uptime:.1f}s, restarting in {delay:.1f}s")
+        deadline = time.monotonic() + delay
+        while not stopping and time.monotonic() < deadline:
+            time.sleep(max(0.0, min(0.1, deadline - time.monotonic())))
+        if not stopping:
+            spawn()
+
+    sock.close()
+    logging.info("All workers stopped")
+    sys.exit(exit_status)
@@ -0,0 +1,139 @@
+import os
+import time
+import random
+import threading
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.logger import logging
+from src.pipelines.artifact_cache import ArtifactCache
+from src.pipelines.model_registry import ModelRegistry, SHADOW
+
+
+@dataclass
+class ShadowConfig:
+    enabled: bool = os.getenv("SHADOW_MODE", "0") == "1"
+    sample_rate: float = float(os.getenv("SHADOW_SAMPLE_RATE", 0.05))
+    # sampled requests waiting for the shadow thread; more are dropped rather than queued
+    max_pending: int = int(os.getenv("SHADOW_MAX_PENDING", 32))
+
+
+class ShadowStats:
+    def __init__(self, version=None):
+        self.version = version
+        self.sampled_requests = 0
+        self.compared_rows = 0
+        self.agreed_rows = 0
+        self.dropped = 0
+        self.errors = 0
+        self.shadow_seconds = 0.0
+        # "production->shadow" class pairs for the rows where the two versions disagree
+        self.disagreements = {}
+
+    def snapshot(self):
+        return {
+            "shadow_version": self.version,
+            "sampled_requests": self.sampled_requests,
+            "compared_rows": self.compared_rows,
+            "agreed_rows": self.agreed_rows,
+            "agreement_rate": self.agreed_rows / self.compared_rows if self.compared_rows else None,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "avg_shadow_seconds": self.shadow_seconds / self.sampled_requests if self.sampled_requests else 0.0,
+            "disagreements": dict(self.disagreements),
+        }
+
+
+class ShadowScorer:
+    """Scores a sample of production traffic with the registry's ``shadow`` version.
+
+    ``observe`` is called with a request's records and the predictions already
+    returned for them. It only draws the sample and hands the work to one
+    background thread, so the response never waits for the candidate model;
+    when that thread falls ``max_pending`` requests behind, samples are dropped
+    and counted. The candidate is scored straight from its artifacts, outside
+    ``PredictPipeline``, to keep its timings out of the production metrics.
+    Statistics restart whenever the shadow alias moves to another version.
+    """
+
+    def __init__(self, config: ShadowConfig = None, registry: ModelRegistry = None):
+        self.config = config or ShadowConfig()
+        self.registry = registry or ModelRegistry()
+        self.artifact_cache = None
+        self.stats = ShadowStats()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+
+    def sync(self):
+        """Loads the version the shadow alias points to; call off the event loop."""
+        version = self.registry.resolve(SHADOW)
+        current = self.artifact_cache.config.model_version if self.artifact_cache is not None else None
+        if version == current:
+            return False
+        artifact_cache = None
+        if version is not None:
+            fingerprint = self.registry.fingerprint(version)
+            if fingerprint == self.rejected:
+                return False
+            artifact_cache = ArtifactCache(self.registry.artifact_cache_config(version))
+            try:
+                artifact_cache.load()
+            except Exception:
+                # not retried every poll; a new shadow alias is tried again
+                self.rejected = fingerprint
+                raise
+        with self._lock:
+            self.artifact_cache = artifact_cache
+            self.stats = ShadowStats(version)
+        logging.info(f"Shadow scoring {'version ' + version if version else 'stopped'}")
+        return True
+
+    def observe(self, records, production_predictions):
+        if self.artifact_cache is None or random.random() >= self.config.sample_rate:
+            return
+        with self._lock:
+            # read together, so a concurrent sync cannot pair one version's model with another's stats
+            artifact_cache, stats = self.artifact_cache, self.stats
+            if artifact_cache is None:
+                return
+            if self._pending >= self.config.max_pending:
+                stats.dropped += 1
+                return
+            self._pending += 1
+        self._executor.submit(self._compare, artifact_cache, stats, records, production_predictions)
+
+    def _compare(self, artifact_cache, stats, records, production_predictions):
+        try:
+            start = time.perf_counter()
+            artifacts = artifact_cache.get()
+            shadow = np.asarray(artifacts.model.predict(artifacts.transform(records)), dtype=np.float64)
+            production = np.asarray(production_predictions, dtype=np.float64).reshape(-1)
+            agree = shadow == production
+            seconds = time.perf_counter() - start
+
+            with self._lock:
+                stats.sampled_requests += 1
+                stats.compared_rows += len(agree)
+                stats.agreed_rows += int(agree.sum())
+                stats.shadow_seconds += seconds
+                for prod, cand in zip(production[~agree], shadow[~agree]):
+                    pair = f"{prod:g}->{cand:g}"
+                    stats.disagreements[pair] = stats.disagreements.get(pair, 0) + 1
+        except Exception as e:
+            with self._lock:
+                stats.errors += 1
+            logging.error(f"Shadow scoring with version {stats.version} failed: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def snapshot(self):
+        with self._lock:
+            return {"pending": self._pending, "sample_rate": self.config.sample_rate, **self.stats.snapshot()}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,132 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import importlib
+import subprocess
+from collections import defaultdict
+
+PHASES = ["import", "artifact_load", "warm_up"]
+_PHASE_MARKER = "startup_profile phase: "
+_RESULT_MARKER = "startup_profile result: "
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def _top_level_packages():
+    return {name.split(".")[0] for name in list(sys.modules)}
+
+
+def _run_phases(app, warmup_requests):
+    """Runs in the profiled child process: times each startup phase and records the packages it imported."""
+    phases = {}
+    packages = _top_level_packages()
+
+    def phase(name, fn):
+        nonlocal packages
+        # written to stderr so the parent can split the -X importtime lines by phase
+        print(_PHASE_MARKER + name, file=sys.stderr, flush=True)
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+        loaded = _top_level_packages()
+        phases[name] = {"seconds": seconds, "new_packages": sorted(p for p in loaded - packages if not p.startswith("_"))}
+        packages = loaded
+        return result
+
+    module = phase("import", lambda: importlib.import_module(app))
+
+    from src.pipelines.artifact_cache import get_artifact_cache
+    artifacts = phase("artifact_load", lambda: get_artifact_cache().load())
+
+    def warm_up():
+        if hasattr(module, "warm_up"):
+            return module.warm_up(warmup_requests)
+        from src.pipelines.predict_pipeline import PredictPipeline
+        from src.pipelines.synthetic_data import make_synthetic_records
+        return PredictPipeline().predict_batch(make_synthetic_records(max(warmup_requests, 1)))
+    phase("warm_up", warm_up)
+
+    print(_RESULT_MARKER + json.dumps({"phases": phases, "artifacts": artifacts.info()}), flush=True)
+
+
+def _import_costs(stderr):
+    """Self import time per top-level package for each phase, from ``-X importtime`` output."""
+    costs = {name: defaultdict(int) for name in PHASES}
+    current = None
+    for line in stderr.splitlines():
+        if line.startswith(_PHASE_MARKER):
+            current = line[len(_PHASE_MARKER):]
+            continue
+        match = _IMPORTTIME_LINE.match(line)
+        if match and current in costs:
+            costs[current][match.group(4).split(".")[0]] += int(match.group(1))
+    return costs
+
+
+def profile_startup(app="fast_api", warmup_requests=8):
+    """Starts a fresh interpreter that imports ``app``, loads the artifacts and warms up, and times each phase.
+
+    The child runs with ``-X importtime``, so every phase also reports which
+    top-level packages it imported and how long their module bodies took.
+    ``interpreter`` is the rest of the child's wall time: Python start-up and exit.
+    """
+    command = [sys.executable, "-X", "importtime", "-m", "src.pipelines.startup_profile",
+               "--child", "--app", app, "--warmup-requests", str(warmup_requests)]
+    start = time.perf_counter()
+    completed = subprocess.run(command, capture_output=True, text=True, env=os.environ.copy())
+    wall_seconds = time.perf_counter() - start
+
+    results = [line[len(_RESULT_MARKER):] for line in completed.stdout.splitlines() if line.startswith(_RESULT_MARKER)]
+    if completed.returncode != 0 or not results:
+        errors = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"Profiled process failed with exit code {completed.returncode}:\n" + "\n".join(errors[-20:]))
+
+    report = json.loads(results[-1])
+    costs = _import_costs(completed.stderr)
+    for name, phase in report["phases"].items():
+        phase["import_seconds_by_package"] = {package: round(micros / 1e6, 4) for package, micros
+                                              in sorted(costs[name].items(), key=lambda item: -item[1])}
+    report["wall_seconds"] = wall_seconds
+    report["interpreter_seconds"] = wall_seconds - sum(phase["seconds"] for phase in report["phases"].values())
+    report["app"] = app
+    return report
+
+
+def format_report(report, top=8):
+    lines = [f"Startup profile of {report['app']} (wall {report['wall_seconds']:.3f}s, timed with -X importtime)",
+             f"{'phase':<15}{'seconds':>9}  heaviest imports"]
+    lines.append(f"{'interpreter':<15}{report['interpreter_seconds']:>9.3f}")
+    for name in PHASES:
+        phase = report["phases"][name]
+        heaviest = ", ".join(f"{package} {seconds:.3f}s" for package, seconds
+                             in list(phase["import_seconds_by_package"].items())[:top])
+        lines.append(f"{name:<15}{phase['seconds']:>9.3f}  {heaviest or '-'}")
+    loaded = {name: report["phases"][name]["new_packages"] for name in PHASES}
+    for heavy in ("sklearn", "scipy", "joblib", "pyarrow"):
+        phase = next((name for name in PHASES if heavy in loaded[name]), None)
+        lines.append(f"{heavy} imported during: {phase or 'never'}")
+    lines.append(f"artifacts: {report['artifacts']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Break down cold-start time into import, artifact load and warm-up")
+    parser.add_argument("--app", default="fast_api", help="module to import, e.g. fast_api or frontend_common")
+    parser.add_argument("--warmup-requests", type=int, default=8)
+    parser.add_argument("--top", type=int, default=8, help="packages listed per phase")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _run_phases(args.app, args.warmup_requests)
+        return
+
+    report = profile_startup(args.app, args.warmup_requests)
+    print(json.dumps(report, indent=2) if args.json else format_report(report, args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import io
+import os
+import sys
+import json
+import struct
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.pipelines.metrics import STAGE_LATENCY
+from src.pipelines.artifact_cache import ArtifactCacheConfig
+from src.pipelines.model_registry import get_followed_artifact_cache
+from src.pipelines.predict_pipeline import (PredictPipeline, PredictPipelineConfig,
+                                            FEATURE_COLUMNS, CATEGORICAL_COLUMNS)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+_CONTINUATION_MARKER = 0xFFFFFFFF
+_MESSAGE_BODY_LENGTH_FIELD = 3
+
+
+@dataclass
+class StreamingConfig:
+    chunk_bytes:int = int(os.getenv("STREAM_CHUNK_BYTES", 1 << 20))
+    chunk_rows:int = int(os.getenv("STREAM_CHUNK_ROWS", 8192))
+    max_in_flight:int = int(os.getenv("STREAM_MAX_IN_FLIGHT", 2))
+    max_line_bytes:int = int(os.getenv("STREAM_MAX_LINE_BYTES", 1 << 20))
+
+
+def _pyarrow(required=False):
+    # imported on first use so the API starts without paying for pyarrow when nobody streams
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.json
+    except ImportError as e:
+        if required:
+            raise ImportError("pyarrow is required for Arrow IPC streams") from e
+        return None
+    return pyarrow
+
+
+def _arrow_schema(pa):
+    return pa.schema([(name, pa.string() if name in CATEGORICAL_COLUMNS else pa.float64())
+                      for name in FEATURE_COLUMNS])
+
+
+def arrow_to_columns(batch):
+    """``{feature: ndarray}`` for an Arrow record batch or table; numbers become float64, categories strings."""
+    pa = _pyarrow(required=True)
+    missing = [c for c in FEATURE_COLUMNS if c not in batch.schema.names]
+    if missing:
+        raise ValueError(f"Missing feature columns: {missing}")
+    columns = {}
+    for name in FEATURE_COLUMNS:
+        target = pa.string() if name in CATEGORICAL_COLUMNS else pa.float64()
+        columns[name] = batch.column(name).cast(target).to_numpy(zero_copy_only=False)
+    return columns
+
+
+def parse_ndjson(data):
+    """``{feature: ndarray}`` for a block of complete NDJSON lines.
+
+    pyarrow's JSON reader parses the block straight into typed columns; without
+    pyarrow pandas' line reader is used. Absent keys become missing values and
+    are imputed like any other missing value; unknown keys are ignored.
+    """
+    pa = _pyarrow()
+    if pa is None:
+        frame = pd.read_json(io.BytesIO(data), lines=True, dtype=False)
+        return {name: frame[name].to_numpy() if name in frame else np.full(len(frame), np.nan)
+                for name in FEATURE_COLUMNS}
+
+    parse_options = pa.json.ParseOptions(explicit_schema=_arrow_schema(pa), unexpected_field_behavior="ignore")
+    return arrow_to_columns(pa.json.read_json(pa.BufferReader(data), parse_options=parse_options))
+
+
+def score_columns(columns):
+    """Scores one chunk; returns a DataFrame with ``prediction`` and one ``probability_<class>`` column per class."""
+    # chunks are bounded by STREAM_CHUNK_BYTES / STREAM_CHUNK_ROWS rather than by MAX_BATCH_SIZE, and are
+    # large enough that model.pkl beats the compiled export, as in bulk scoring
+    artifact_cache = get_followed_artifact_cache(ArtifactCacheConfig(use_compiled_model=False))
+    pipeline = PredictPipeline(artifact_cache=artifact_cache, config=PredictPipelineConfig(max_batch_size=sys.maxsize))
+    preds, probabilities, classes = pipeline.predict_batch(columns, with_classes=True)
+    result = pd.DataFrame({"prediction": np.asarray(preds, dtype=np.float64)})
+    if probabilities is not None:
+        for i, label in enumerate(classes):
+            result[f"probability_{label}"] = probabilities[:, i]
+    return result
+
+
+def score_ndjson(data):
+    """Parses, scores and serializes one NDJSON block; returns ``(n_rows, ndjson_bytes)``."""
+    with STAGE_LATENCY.time("parse"):
+        columns = parse_ndjson(data)
+    result = score_columns(columns)
+    if result.empty:
+        return 0, b""
+    return len(result), result.to_json(orient="records", lines=True).encode()
+
+
+def score_record_batch(batch):
+    """Scores one Arrow record batch; returns the results as a DataFrame."""
+    with STAGE_LATENCY.time("parse"):
+        columns = arrow_to_columns(batch)
+    return score_columns(columns)
+
+
+async def ndjson_blocks(byte_stream, chunk_bytes, max_line_bytes):
+    """Regroups an async byte stream into blocks of whole lines of at least ``chunk_bytes``."""
+    buffer = bytearray()
+    async for data in byte_stream:
+        buffer += data
+        if len(buffer) < chunk_bytes:
+            continue
+        end = buffer.rfind(b"\n") + 1
+        if end == 0:
+            if len(buffer) > max_line_bytes:
+                raise ValueError(f"NDJSON line longer than {max_line_bytes} bytes")
+            continue
+        yield bytes(buffer[:end])
+        del buffer[:end]
+    if buffer.strip():
+        yield bytes(buffer)
+
+
+def _message_body_length(metadata):
+    # bodyLength of the flatbuffer ``Message`` table (Arrow format/Message.fbs), 0 when left at its default
+    table = struct.unpack_from("<I", metadata, 0)[0]
+    vtable = table - struct.unpack_from("<i", metadata, table)[0]
+    vtable_size = struct.unpack_from("<H", metadata, vtable)[0]
+    slot = 4 + 2 * _MESSAGE_BODY_LENGTH_FIELD
+    offset = struct.unpack_from("<H", metadata, vtable + slot)[0] if vtable_size > slot else 0
+    return struct.unpack_from("<q", metadata, table + offset)[0] if offset else 0
+
+
+class ArrowStreamDecoder:
+    """Push-style reader for the Arrow IPC streaming format.
+
+    ``feed`` takes bytes as they arrive and returns the record batches they
+    complete; ``schema`` is set once the first message has been read. Each
+    message is handed to pyarrow only when all of its bytes are buffered, so
+    a large record batch is decoded once instead of being retried per network read.
+    """
+
+    def __init__(self):
+        self.pa = _pyarrow(required=True)
+        self.schema = None
+        self.finished = False
+        self._buffer = bytearray()
+
+    def _next_message(self):
+        if len(self._buffer) < 8:
+            return None
+        marker, metadata_length = struct.unpack_from("<Ii", self._buffer, 0)
+        if marker != _CONTINUATION_MARKER:
+            raise ValueError("Request body is not an Arrow IPC stream")
+        if metadata_length == 0:
+            self.finished = True
+            del self._buffer[:8]
+            return None
+        if len(self._buffer) < 8 + metadata_length:
+            return None
+        total = 8 + metadata_length + _message_body_length(bytes(self._buffer[8:8 + metadata_length]))
+        if len(self._buffer) < total:
+            return None
+
+        message = self.pa.ipc.read_message(self.pa.py_buffer(bytes(self._buffer[:total])))
+        del self._buffer[:total]
+        return message
+
+    def feed(self, data):
+        self._buffer += data
+        batches = []
+        while not self.finished:
+            message = self._next_message()
+            if message is None:
+                break
+            if self.schema is None:
+                self.schema = self.pa.ipc.read_schema(message)
+            elif message.type == "record batch":
+                batches.append(self.pa.ipc.read_record_batch(message, self.schema))
+            else:
+                raise ValueError(f"Unsupported Arrow IPC message '{message.type}'; send dictionary columns as plain strings")
+        return batches
+
+    def close(self):
+        if self._buffer or self.schema is None:
+            raise ValueError("Arrow IPC stream ended in the middle of a message")
+
+
+class ArrowStreamEncoder:
+    """Serializes result DataFrames as one Arrow IPC stream, returning the bytes produced by each call."""
+
+    def __init__(self):
+        self.pa = _pyarrow(required=True)
+        self._sink = io.BytesIO()
+        self._writer = None
+
+    def _drain(self):
+        data = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+        return data
+
+    def encode(self, result):
+        batch = self.pa.RecordBatch.from_pandas(result, preserve_index=False)
+        if self._writer is None:
+            self._writer = self.pa.ipc.new_stream(self._sink, batch.schema)
+        self._writer.write_batch(batch)
+        return self._drain()
+
+    def close(self):
+        if self._writer is None:
+            self._writer = self.pa.ipc.new_stream(self._sink, self.pa.schema([("prediction", self.pa.float64())]))
+        self._writer.close()
+        return self._drain()
+
+
+async def scored_in_order(chunks, run, score_fn, max_in_flight):
+    """Yields ``score_fn`` results for an async iterable of chunks, in order.
+
+    Up to ``max_in_flight`` chunks are scored on ``run`` (e.g. the inference
+    executor) while the next ones are still arriving, so reading the request
+    body and scoring overlap; leftover tasks are cancelled if the stream stops early.
+    """
+    in_flight = deque()
+    try:
+        async for chunk in chunks:
+            in_flight.append(asyncio.ensure_future(run(score_fn, chunk)))
+            while in_flight and (in_flight[0].done() or len(in_flight) >= max_in_flight):
+                yield await in_flight.popleft()
+        while in_flight:
+            yield await in_flight.popleft()
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+
+def ndjson_error(error, rows_scored):
+    """Trailing NDJSON line reporting a failure after the response has already started."""
+    return json.dumps({"error": str(error), "rows_scored": rows_scored}).encode() + b"\n"
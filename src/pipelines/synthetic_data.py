@@ -0,0 +1,57 @@
+import numpy as np
+
+CATEGORY_VALUES = {
+    "Payment_of_Min_Amount": ["Yes", "No", "NM"],
+    "Credit_Mix": ["Poor", "Standard", "Good"],
+    "Payment_Behaviour": [
+        "High_spent_Small_value_payments",
+        "Low_spent_Large_value_payments",
+        "High_spent_Medium_value_payments",
+        "High_spent_Large_value_payments",
+        "Low_spent_Medium_value_payments",
+        "Low_spent_Small_value_payments",
+    ],
+}
+
+# (low, high, is_integer) ranges roughly covering the training data
+NUMERIC_RANGES = {
+    "Delay_from_due_date": (0, 60, True),
+    "Num_of_Delayed_Payment": (0, 25, True),
+    "Num_Credit_Inquiries": (0, 15, True),
+    "Credit_Utilization_Ratio": (20.0, 45.0, False),
+    "Credit_History_Age": (10, 400, True),
+    "Amount_invested_monthly": (0.0, 600.0, False),
+    "Monthly_Balance": (0.0, 1200.0, False),
+    "Age": (18, 60, True),
+    "Annual_Income": (7000.0, 180000.0, False),
+    "Num_Bank_Accounts": (0, 11, True),
+    "Num_Credit_Card": (0, 11, True),
+    "Interest_Rate": (1.0, 34.0, False),
+    "Num_of_Loan": (0, 9, True),
+    "Monthly_Inhand_Salary": (300.0, 15000.0, False),
+    "Changed_Credit_Limit": (0.0, 30.0, False),
+    "Outstanding_Debt": (0.0, 5000.0, False),
+    "Total_EMI_per_month": (0.0, 400.0, False),
+}
+
+
+def make_synthetic_columns(n, seed=0):
+    """Random columns matching the ``InputData`` schema, as ``{feature: numpy array}``."""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, (low, high, is_integer) in NUMERIC_RANGES.items():
+        if is_integer:
+            columns[name] = rng.integers(low, high + 1, n)
+        else:
+            columns[name] = np.round(rng.uniform(low, high, n), 3)
+    for name, values in CATEGORY_VALUES.items():
+        columns[name] = rng.choice(values, n)
+    return columns
+
+
+def make_synthetic_records(n, seed=0):
+    """Random records matching the ``InputData`` schema, as plain Python dicts."""
+    columns = make_synthetic_columns(n, seed)
+    names = list(columns)
+    values = [columns[name].tolist() for name in names]
+    return [dict(zip(names, row)) for row in zip(*values)]
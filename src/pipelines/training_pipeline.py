@@ -0,0 +1,215 @@
+import sys
+import os
+import json
+import shutil
+import hashlib
+import argparse
+from dataclasses import dataclass, asdict
+
+from src.exceptions import CustomException
+from src.logger import logging
+from src.utils import save_matrix, load_matrix, track_peak_memory, file_digest
+from src.components.data_ingestion import DataIngestion, DataIngestionConfig
+from src.components.data_transformation import DataTransformation, DataTransformationConfig
+from src.components.model_trainer import ModelTrainer, ModelTrainerConfig
+from src.pipelines.model_registry import register_trained_model
+
+
+@dataclass
+class TrainingPipelineConfig:
+    cache_dir: str = os.path.join('artifacts', 'cache')
+    force: bool = False
+    track_memory: bool = os.getenv('TRACK_MEMORY', '0') == '1'
+
+
+# config fields that only change how a stage runs, not what it produces; a different core count
+# or timeout must still hit the cache
+EXECUTION_ONLY_FIELDS = {'n_jobs', 'model_timeout_seconds'}
+
+
+def stage_key(stage_name, config, upstream):
+    config = {name: value for name, value in asdict(config).items() if name not in EXECUTION_ONLY_FIELDS}
+    payload = json.dumps({"stage": stage_name, "config": config, "upstream": upstream},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class TrainingPipeline:
+    """Runs ingestion -> transformation -> training as a DAG of cached stages.
+
+    Every stage is keyed by a hash of its config and the key of the stage it
+    depends on (ingestion hashes the source CSV contents instead), and its
+    outputs are copied into ``cache_dir/<stage>/<key>/``. A stage whose key is
+    already in the cache is skipped and its files are restored to their usual
+    ``artifacts/`` locations, so changing only the candidate model list re-runs
+    training alone.
+    """
+
+    def __init__(self,
+                 data_ingestion_config: DataIngestionConfig = None,
+                 data_transformation_config: DataTransformationConfig = None,
+                 model_trainer_config: ModelTrainerConfig = None,
+                 training_pipeline_config: TrainingPipelineConfig = None):
+        self.data_ingestion_config = data_ingestion_config or DataIngestionConfig()
+        self.data_transformation_config = data_transformation_config or DataTransformationConfig()
+        self.model_trainer_config = model_trainer_config or ModelTrainerConfig()
+        self.training_pipeline_config = training_pipeline_config or TrainingPipelineConfig()
+        self.stage_status = {}
+        self.stage_peak_memory = {}
+
+    def _entry_dir(self, stage_name, key):
+        return os.path.join(self.training_pipeline_config.cache_dir, stage_name, key)
+
+    def _restore(self, stage_name, key):
+        entry_dir = self._entry_dir(stage_name, key)
+        manifest_path = os.path.join(entry_dir, 'manifest.json')
+        if self.training_pipeline_config.force or not os.path.exists(manifest_path):
+            return None
+
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        for cached_name, artifact_path in manifest["files"].items():
+            cached_path = os.path.join(entry_dir, cached_name)
+            if not os.path.exists(cached_path):
+                return None
+            cached_stat = os.stat(cached_path)
+            if os.path.exists(artifact_path):
+                artifact_stat = os.stat(artifact_path)
+                if (artifact_stat.st_size, artifact_stat.st_mtime_ns) == (cached_stat.st_size, cached_stat.st_mtime_ns):
+                    continue
+            os.makedirs(os.path.dirname(artifact_path) or '.', exist_ok=True)
+            shutil.copy2(cached_path, artifact_path)
+        return manifest["result"]
+
+    def _store(self, stage_name, key, files, result):
+        entry_dir = self._entry_dir(stage_name, key)
+        os.makedirs(entry_dir, exist_ok=True)
+        manifest_files = {}
+        for artifact_path in files:
+            cached_name = os.path.basename(artifact_path)
+            if os.path.abspath(artifact_path) != os.path.abspath(os.path.join(entry_dir, cached_name)):
+                shutil.copy2(artifact_path, os.path.join(entry_dir, cached_name))
+            manifest_files[cached_name] = artifact_path
+
+        # the manifest is written last, so an interrupted stage never looks cached
+        tmp_path = os.path.join(entry_dir, 'manifest.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({"stage": stage_name, "key": key, "files": manifest_files, "result": result}, f, indent=2)
+        os.replace(tmp_path, os.path.join(entry_dir, 'manifest.json'))
+
+    def _run_stage(self, stage_name, key, run_fn):
+        result = self._restore(stage_name, key)
+        if result is not None:
+            logging.info(f"Stage {stage_name} [{key}] unchanged, reusing cached outputs")
+            self.stage_status[stage_name] = "cached"
+            return result
+
+        logging.info(f"Stage {stage_name} [{key}] running")
+        with track_peak_memory(stage_name, self.training_pipeline_config.track_memory) as memory:
+            files, result = run_fn(self._entry_dir(stage_name, key))
+        if memory.peak_bytes is not None:
+            self.stage_peak_memory[stage_name] = memory
+        self._store(stage_name, key, files, result)
+        self.stage_status[stage_name] = "ran"
+        return result
+
+    def _data_ingestion(self, entry_dir):
+        train_path, test_path = DataIngestion(self.data_ingestion_config).initiate_data_ingestion()
+        files = [self.data_ingestion_config.raw_data_path, train_path, test_path]
+        return files, {"train_path": train_path, "test_path": test_path}
+
+    def _data_transformation(self, entry_dir, train_path, test_path):
+        data_transformation = DataTransformation(self.data_transformation_config)
+        train_set, test_set, x_path, y_path = data_transformation.initiate_data_transformation(train_path, test_path)
+
+        if self.data_transformation_config.array_format == 'npy':
+            result = data_transformation.array_paths
+        else:
+            os.makedirs(entry_dir, exist_ok=True)
+            result = {
+                "X_train": save_matrix(os.path.join(entry_dir, 'X_train.npy'), train_set[0]),
+                "y_train": save_matrix(os.path.join(entry_dir, 'y_train.npy'), train_set[1]),
+                "X_test": save_matrix(os.path.join(entry_dir, 'X_test.npy'), test_set[0]),
+                "y_test": save_matrix(os.path.join(entry_dir, 'y_test.npy'), test_set[1]),
+            }
+            if data_transformation.native_sets is not None:
+                native_train_set, native_test_set = data_transformation.native_sets
+                result["X_train_native"] = save_matrix(os.path.join(entry_dir, 'X_train_native.npy'), native_train_set[0])
+                result["X_test_native"] = save_matrix(os.path.join(entry_dir, 'X_test_native.npy'), native_test_set[0])
+
+        files = [x_path, y_path, *result.values()]
+        if data_transformation.native_sets is not None:
+            files.append(self.data_transformation_config.X_native_transformation_path)
+        return files, result
+
+    def _model_training(self, entry_dir, arrays):
+        train_set = (load_matrix(arrays["X_train"]), load_matrix(arrays["y_train"]))
+        test_set = (load_matrix(arrays["X_test"]), load_matrix(arrays["y_test"]))
+        native_train_set = native_test_set = None
+        if "X_train_native" in arrays:
+            native_train_set = (load_matrix(arrays["X_train_native"]), train_set[1])
+            native_test_set = (load_matrix(arrays["X_test_native"]), test_set[1])
+        model_trainer = ModelTrainer(self.model_trainer_config)
+        accuracy = model_trainer.initiate_model_trainer(train_set, test_set, native_train_set, native_test_set)
+
+        # x_transformer.pkl is part of this stage's output too: a native-categorical winner replaces it
+        files = [self.model_trainer_config.trainer_model_path, self.model_trainer_config.preprocessor_path,
+                 self.model_trainer_config.model_report_path]
+        files += [path for path in (self.model_trainer_config.compiled_model_path,
+                                    self.model_trainer_config.compiled_preprocessor_path) if os.path.exists(path)]
+        if self.model_trainer_config.hyperparameter_search:
+            files += [path for path in (self.model_trainer_config.search_results_path,
+                                        self.model_trainer_config.native_search_results_path) if os.path.exists(path)]
+        return files, {"accuracy": accuracy, "best_model": model_trainer.model_report["best_model"]}
+
+    def run(self):
+        try:
+            source_digest = file_digest(self.data_ingestion_config.source_data_path)
+            ingestion_key = stage_key("data_ingestion", self.data_ingestion_config, source_digest)
+            ingestion = self._run_stage("data_ingestion", ingestion_key, self._data_ingestion)
+
+            transformation_key = stage_key("data_transformation", self.data_transformation_config, ingestion_key)
+            transformation = self._run_stage(
+                "data_transformation", transformation_key,
+                lambda entry_dir: self._data_transformation(entry_dir, ingestion["train_path"], ingestion["test_path"])
+            )
+
+            training_key = stage_key("model_training", self.model_trainer_config, transformation_key)
+            training = self._run_stage(
+                "model_training", training_key,
+                lambda entry_dir: self._model_training(entry_dir, transformation)
+            )
+
+            if self.stage_status["model_training"] == "cached":
+                # the restored model may not be the registry's production version any more
+                register_trained_model(self.model_trainer_config, metrics={"best_model": training["best_model"],
+                                                                           "accuracy": training["accuracy"]},
+                                       source="TrainingPipeline cache")
+            logging.info(f"Training pipeline finished: {self.stage_status}, accuracy {training['accuracy']}")
+            if self.stage_peak_memory:
+                logging.info("Peak memory per stage: " + "; ".join(
+                    f"{stage} {memory.describe()}" for stage, memory in self.stage_peak_memory.items()))
+            return training["accuracy"]
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the cached ingestion -> transformation -> training pipeline")
+    parser.add_argument("--force", action="store_true", help="ignore cached stage outputs and re-run everything")
+    parser.add_argument("--models", nargs="+", default=None, help="subset of candidate models to train")
+    parser.add_argument("--track-memory", action="store_true", help="report the peak memory of every stage that runs")
+    args = parser.parse_args()
+
+    model_trainer_config = ModelTrainerConfig()
+    if args.models:
+        model_trainer_config.candidate_models = args.models
+
+    pipeline = TrainingPipeline(model_trainer_config=model_trainer_config,
+                                training_pipeline_config=TrainingPipelineConfig(
+                                    force=args.force, track_memory=args.track_memory or TrainingPipelineConfig.track_memory))
+    accuracy = pipeline.run()
+    print(pipeline.stage_status)
+    if pipeline.stage_peak_memory:
+        print({stage: memory.describe() for stage, memory in pipeline.stage_peak_memory.items()})
+    print(accuracy)
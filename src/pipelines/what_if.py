@@ -0,0 +1,58 @@
+import sys
+import time
+import numpy as np
+from dataclasses import dataclass
+
+from src.exceptions import CustomException
+from src.pipelines.predict_pipeline import FEATURE_COLUMNS
+
+
+@dataclass
+class SweepResult:
+    axes: dict
+    predictions: np.ndarray
+    probabilities: np.ndarray
+    classes: np.ndarray
+    seconds: float
+
+    @property
+    def n_points(self):
+        return int(self.predictions.size)
+
+
+def build_grid(base_record, axes):
+    """Columnar batch holding every combination of the ``axes`` values, other features fixed at ``base_record``.
+
+    ``axes`` maps one or two feature names to the values to try; rows are in
+    ``np.meshgrid(..., indexing='ij')`` order, so results reshape to the grid.
+    """
+    unknown = [name for name in axes if name not in FEATURE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown features to sweep: {unknown}")
+    mesh = np.meshgrid(*[np.asarray(values) for values in axes.values()], indexing='ij')
+    n_points = mesh[0].size
+
+    columns = {}
+    for name in FEATURE_COLUMNS:
+        value = base_record[name]
+        columns[name] = np.full(n_points, value, dtype=object if isinstance(value, str) else np.float64)
+    for name, values in zip(axes, mesh):
+        columns[name] = values.ravel()
+    return columns
+
+
+def score_sweep(pipeline, base_record, axes):
+    """Scores the whole grid with one ``predict_batch`` call; results come back shaped like the grid."""
+    try:
+        start = time.perf_counter()
+        columns = build_grid(base_record, axes)
+        preds, probabilities, classes = pipeline.predict_batch(columns, with_classes=True)
+        seconds = time.perf_counter() - start
+
+        shape = tuple(len(values) for values in axes.values())
+        if probabilities is not None:
+            probabilities = probabilities.reshape(*shape, -1)
+        return SweepResult(axes=axes, predictions=np.asarray(preds).reshape(shape),
+                           probabilities=probabilities, classes=classes, seconds=seconds)
+    except Exception as e:
+        raise CustomException(e, sys)
@@ -1,50 +1,369 @@
 from src.logger import logging
 import os
-import joblib
 import numpy as np
 import pandas as pd
 from src.exceptions import CustomException
 import pickle
 import sys
-from sklearn.metrics import accuracy_score,precision_score,recall_score,f1_score
+import time
+import shutil
+import hashlib
+import tempfile
+import multiprocessing
+# joblib and sklearn.metrics are imported inside the functions that use them so serving,
+# which only unpickles artifacts, does not pay for them at startup
 
 
-def save_object(file_path,obj):
+def file_digest(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_table(file_path):
+    try:
+        if file_path.endswith('.parquet'):
+            # pyarrow maps the file instead of reading it through a Python buffer
+            return pd.read_parquet(file_path,memory_map=True)
+        return pd.read_csv(file_path)
+    except Exception as e:
+        raise CustomException(e,sys)
+
+
+def read_table_chunks(file_path,chunksize,columns=None):
+    """Yields DataFrames of at most ``chunksize`` rows from a CSV or Parquet file."""
+    try:
+        if file_path.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(file_path,memory_map=True).iter_batches(batch_size=chunksize,columns=columns):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(file_path,chunksize=chunksize,usecols=columns)
+    except Exception as e:
+        raise CustomException(e,sys)
+
+
+def write_table(df,file_path):
+    try:
+        if file_path.endswith('.parquet'):
+            df.to_parquet(file_path,index=False)
+        else:
+            df.to_csv(file_path,index=False,header=True)
+    except Exception as e:
+        raise CustomException(e,sys)
+
+
+def save_matrix(file_path,matrix):
+    """Saves a dense array as ``.npy`` or a scipy sparse matrix as ``.npz``; returns the path written."""
+    try:
+        from scipy import sparse
+
+        root,_ = os.path.splitext(file_path)
+        os.makedirs(os.path.dirname(file_path) or '.',exist_ok=True)
+        if sparse.issparse(matrix):
+            file_path = root + '.npz'
+            sparse.save_npz(file_path,matrix,compressed=False)
+        else:
+            file_path = root + '.npy'
+            np.save(file_path,matrix)
+        return file_path
+    except Exception as e:
+        raise CustomException(e,sys)
+
+
+def load_matrix(file_path):
+    """Loads a ``save_matrix`` file; dense arrays come back memory-mapped read-only."""
+    try:
+        if file_path.endswith('.npz'):
+            from scipy import sparse
+            return sparse.load_npz(file_path)
+        return np.load(file_path,mmap_mode='r')
+    except Exception as e:
+        raise CustomException(e,sys)
+
+
+def _children_max_rss():
+    """Largest resident set size of any child process waited for so far, in bytes (``None`` off Unix)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+class track_peak_memory:
+    """Context manager measuring the peak memory used inside the block.
+
+    Two figures are reported, because the training stage fits its models in
+    child processes (``TRAINING_N_JOBS``) that ``tracemalloc`` cannot see:
+
+    - ``peak_bytes``: this process's Python-heap high-water mark above what was
+      allocated on entry, from ``tracemalloc`` (which also sees NumPy buffers).
+    - ``child_peak_rss_bytes``: the peak RSS of the largest child process that
+      finished inside the block, from ``getrusage(RUSAGE_CHILDREN)``. The OS
+      only keeps the maximum over all children ever waited for, so this is
+      ``None`` when no child of this block exceeded an earlier one.
+
+    Tracing slows allocation-heavy Python code, so it is only switched on when ``enabled``.
+    """
+
+    def __init__(self,stage,enabled=True):
+        self.stage = stage
+        self.enabled = enabled
+        self.peak_bytes = None
+        self.child_peak_rss_bytes = None
+
+    def __enter__(self):
+        if self.enabled:
+            import tracemalloc
+            self._started = not tracemalloc.is_tracing()
+            if self._started:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._baseline = tracemalloc.get_traced_memory()[0]
+            self._children_baseline = _children_max_rss()
+        return self
+
+    def __exit__(self,exc_type,exc,tb):
+        if self.enabled:
+            import tracemalloc
+            self.peak_bytes = tracemalloc.get_traced_memory()[1] - self._baseline
+            if self._started:
+                tracemalloc.stop()
+            children_max_rss = _children_max_rss()
+            if children_max_rss is not None and children_max_rss > (self._children_baseline or 0):
+                self.child_peak_rss_bytes = children_max_rss
+            logging.info(f"Stage {self.stage} peak memory: {self.describe()}")
+        return False
+
+    def describe(self):
+        text = f"python heap {self.peak_bytes / 2**20:.1f} MiB"
+        if self.child_peak_rss_bytes is not None:
+            text += f", child process RSS {self.child_peak_rss_bytes / 2**20:.1f} MiB"
+        return text
+
+
+# appended to every file save_object writes; pickle and joblib both stop reading before it,
+# and load_object reads it back to pick the loader instead of guessing from the contents
+_BACKEND_TRAILER = b'#save_object:'
+_BACKENDS = ('pickle','mmap')
+
+
+def save_object(file_path,obj,backend='pickle'):
     try:
         dir_path = os.path.dirname(file_path)
         os.makedirs(dir_path,exist_ok=True)
 
-        with open (file_path,'wb') as file_obj:
-            pickle.dump(obj,file_obj)
+        if backend not in _BACKENDS:
+            raise ValueError(f"Unknown serialization backend {backend!r}, expected 'pickle' or 'mmap'")
+        # written next to the target and renamed over it, so a reader never sees a half-written file
+        tmp_path = f"{file_path}.{os.getpid()}.tmp"
+        if backend == 'mmap':
+            import joblib
+            # uncompressed joblib stores numpy arrays as raw aligned buffers that can be memory-mapped
+            joblib.dump(obj,tmp_path)
+        else:
+            with open (tmp_path,'wb') as file_obj:
+                pickle.dump(obj,file_obj)
+        with open(tmp_path,'ab') as file_obj:
+            file_obj.write(_BACKEND_TRAILER + backend.encode())
+        os.replace(tmp_path,file_path)
     except Exception as e:
         raise CustomException(e,sys)
 
 
-def load_object(file_path):
+def copy_file(src_path,file_path):
+    """Copies ``src_path`` over ``file_path`` through a temporary file, like ``save_object`` writes."""
     try:
-        with open(file_path,'rb') as file_obj:
-            return pickle.load(file_obj)
+        os.makedirs(os.path.dirname(file_path) or '.',exist_ok=True)
+        tmp_path = f"{file_path}.{os.getpid()}.tmp"
+        shutil.copy2(src_path,tmp_path)
+        os.replace(tmp_path,file_path)
     except Exception as e:
         raise CustomException(e,sys)
 
-def evaluate_models(X_train,y_train,X_test,y_test,models):
+
+def saved_backend(file_path):
+    """Backend ``save_object`` wrote ``file_path`` with, or ``None`` for files saved before it was recorded."""
+    size = os.path.getsize(file_path)
+    tail_size = len(_BACKEND_TRAILER) + max(len(name) for name in _BACKENDS)
+    with open(file_path,'rb') as file_obj:
+        file_obj.seek(max(0,size - tail_size))
+        tail = file_obj.read()
+    for name in _BACKENDS:
+        if tail.endswith(_BACKEND_TRAILER + name.encode()):
+            return name
+    return None
+
+
+def load_object(file_path,mmap_mode='r'):
+    """Loads a file written by ``save_object`` with the backend it was saved with.
+
+    Arrays in ``mmap`` files are memory-mapped read-only (``mmap_mode``), so every
+    process loading the same file shares one copy through the page cache.
+    """
     try:
-        report = {}
+        backend = saved_backend(file_path)
+        if backend == 'mmap':
+            import joblib
+            return joblib.load(file_path,mmap_mode=mmap_mode)
+        if backend == 'pickle':
+            with open(file_path,'rb') as file_obj:
+                return pickle.load(file_obj)
 
-        for i in range(len(list(models))):
-            model = list(models.values())[i]
+        # written before the backend was recorded: a plain pickle, or else an uncompressed joblib file
+        try:
+            with open(file_path,'rb') as file_obj:
+                return pickle.load(file_obj)
+        except Exception as pickle_error:
+            import joblib
+            try:
+                return joblib.load(file_path,mmap_mode=mmap_mode)
+            except Exception:
+                raise pickle_error
+    except Exception as e:
+        raise CustomException(e,sys)
+
+def _fit_and_score(name,model,data_dir,result_path,n_threads=None):
+    import joblib
+    from sklearn.metrics import accuracy_score
+    try:
+        X_train = joblib.load(os.path.join(data_dir,'X_train.joblib'),mmap_mode='r')
+        y_train = joblib.load(os.path.join(data_dir,'y_train.joblib'),mmap_mode='r')
+        X_test = joblib.load(os.path.join(data_dir,'X_test.joblib'),mmap_mode='r')
+        y_test = joblib.load(os.path.join(data_dir,'y_test.joblib'),mmap_mode='r')
+
+        start = time.perf_counter()
+        if n_threads is None:
             model.fit(X_train,y_train)
+        else:
+            # OpenMP estimators (HistGradientBoostingClassifier) have no n_jobs, cap their threads instead
+            from threadpoolctl import threadpool_limits
+            with threadpool_limits(limits=n_threads,user_api='openmp'):
+                model.fit(X_train,y_train)
+        fit_time = time.perf_counter() - start
+
+        test_model_score = accuracy_score(y_test,model.predict(X_test))
+        joblib.dump({"model":model,"score":test_model_score,"fit_time":fit_time},result_path)
+    except Exception as e:
+        joblib.dump({"error":f"{type(e).__name__}: {e}"},result_path)
 
-            y_train_pred = model.predict(X_train)
-            y_test_pred = model.predict(X_test)
 
-            train_model_score = accuracy_score(y_train,y_train_pred)
-            test_model_score = accuracy_score(y_test,y_test_pred)
+def _evaluate_models_parallel(groups,n_jobs,timeout,fit_times):
+    import joblib
+    report = {}
+    concurrency = min(n_jobs,sum(len(models) for models,_,_ in groups))
+    threads_per_model = max(1,n_jobs // concurrency)
+
+    data_dir = tempfile.mkdtemp(prefix='evaluate_models_')
+    try:
+        # every worker memory-maps the same files instead of receiving its own copy of the arrays
+        pending = []
+        for i,(models,(X_train,y_train),(X_test,y_test)) in enumerate(groups):
+            group_dir = os.path.join(data_dir,f'group_{i}')
+            os.makedirs(group_dir)
+            for file_name,arr in [('X_train',X_train),('y_train',y_train),('X_test',X_test),('y_test',y_test)]:
+                joblib.dump(arr,os.path.join(group_dir,f'{file_name}.joblib'))
+            pending += [(name,model,models,group_dir) for name,model in models.items()]
 
-            report[list(models.keys())[i]] = test_model_score
-            
-        return report 
+        running = {}
+        started_count = 0
+        while pending or running:
+            while pending and len(running) < concurrency:
+                name,model,models,group_dir = pending.pop(0)
+                n_threads = None
+                if 'n_jobs' in model.get_params():
+                    if threads_per_model > 1:
+                        model.set_params(n_jobs=threads_per_model)
+                else:
+                    n_threads = threads_per_model
+                started_count += 1
+                result_path = os.path.join(data_dir,f'result_{started_count}.joblib')
+                process = multiprocessing.Process(target=_fit_and_score,args=(name,model,group_dir,result_path,n_threads),daemon=True)
+                process.start()
+                running[name] = (process,time.perf_counter(),result_path,models)
+
+            for name,(process,started,result_path,models) in list(running.items()):
+                if not process.is_alive():
+                    process.join()
+                    del running[name]
+                    if not os.path.exists(result_path):
+                        raise RuntimeError(f"{name} worker exited with code {process.exitcode} without a result")
+                    result = joblib.load(result_path)
+                    if "error" in result:
+                        raise RuntimeError(f"{name} failed: {result['error']}")
+                    models[name] = result["model"]
+                    report[name] = result["score"]
+                    fit_times[name] = result["fit_time"]
+                    logging.info(f"{name} fitted in {result['fit_time']:.2f}s with test accuracy {result['score']:.4f}")
+                elif timeout is not None and time.perf_counter() - started > timeout:
+                    process.terminate()
+                    process.join()
+                    del running[name]
+                    logging.warning(f"{name} exceeded the {timeout}s timeout and was skipped")
+
+            time.sleep(0.05)
+        return report
+    finally:
+        for process,_,_,_ in running.values():
+            process.terminate()
+        shutil.rmtree(data_dir,ignore_errors=True)
+
+
+def evaluate_models(X_train,y_train,X_test,y_test,models,n_jobs=1,timeout=None,fit_times=None):
+    """Fits every model and returns ``{name: test accuracy}``.
+
+    With ``n_jobs > 1`` the candidates are fitted concurrently in separate
+    processes that memory-map the train/test arrays; ``n_jobs`` is the total
+    CPU budget, shared between concurrent fits and any estimator-level
+    ``n_jobs``. A model still fitting after ``timeout`` seconds is killed and
+    left out of the report. Fitted estimators replace the entries in ``models``
+    and, when ``fit_times`` is given, each model's fit seconds are stored in it.
+    """
+    return evaluate_model_groups([(models,(X_train,y_train),(X_test,y_test))],
+                                 n_jobs=n_jobs,timeout=timeout,fit_times=fit_times)
+
+
+def evaluate_model_groups(groups,n_jobs=1,timeout=None,fit_times=None):
+    """``evaluate_models`` for models fitted on different features.
+
+    ``groups`` is ``[(models, (X_train, y_train), (X_test, y_test))]``; all
+    models of all groups share the one ``n_jobs`` budget, so a group does not
+    wait for the previous one to finish. Model names must be unique across groups.
+    """
+    try:
+        from sklearn.metrics import accuracy_score
+
+        if fit_times is None:
+            fit_times = {}
+        if n_jobs is not None and n_jobs > 1 and sum(len(models) for models,_,_ in groups) > 1:
+            return _evaluate_models_parallel(groups,n_jobs,timeout,fit_times)
+        if timeout is not None:
+            # A fit running in this process cannot be interrupted, only a worker can be killed.
+            logging.warning(f"timeout of {timeout}s is not enforced when models are fitted sequentially "
+                            "(n_jobs <= 1 or a single model); every model runs to completion")
+
+        report = {}
+
+        for models,(X_train,y_train),(X_test,y_test) in groups:
+            for name,model in models.items():
+                start = time.perf_counter()
+                model.fit(X_train,y_train)
+                fit_time = time.perf_counter() - start
+
+                y_test_pred = model.predict(X_test)
+
+                test_model_score = accuracy_score(y_test,y_test_pred)
+
+                report[name] = test_model_score
+                fit_times[name] = fit_time
+                logging.info(f"{name} fitted in {fit_time:.2f}s with test accuracy {test_model_score:.4f}")
+
+        return report
 
     except Exception as e:
         raise CustomException(e,sys)
-
@@ -0,0 +1,24 @@
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+
+from src.components.data_transformation import DataTransformation
+from src.pipelines.synthetic_data import make_synthetic_records
+from src.utils import save_object
+
+
+def write_artifacts(directory, seed, n_features=None):
+    """Fits a preprocessor and a small tree on synthetic data; ``n_features`` makes a model that cannot score it."""
+    os.makedirs(directory, exist_ok=True)
+    data = pd.DataFrame.from_records(make_synthetic_records(200, seed=seed))
+    preprocessor, _ = DataTransformation().get_data_transformer_object()
+    X = preprocessor.fit_transform(data)
+    if n_features is not None:
+        X = X[:, :n_features]
+    y = np.random.default_rng(seed).integers(0, 3, X.shape[0]).astype(np.float64)
+    files = {"model": os.path.join(directory, "model.pkl"), "preprocessor": os.path.join(directory, "x_transformer.pkl")}
+    save_object(file_path=files["model"], obj=DecisionTreeClassifier(max_depth=4, random_state=seed).fit(X, y))
+    save_object(file_path=files["preprocessor"], obj=preprocessor)
+    return files
@@ -0,0 +1,82 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from src.exceptions import CustomException
+from src.pipelines.batch_scoring import BatchScorer, BatchScoringConfig
+from src.pipelines.synthetic_data import make_synthetic_records
+from tests.helpers import write_artifacts
+
+
+class Interrupted(Exception):
+    pass
+
+
+def _interrupt_after(n_chunks):
+    def progress(chunks_done, rows_done, rows_per_sec):
+        if chunks_done == n_chunks:
+            raise Interrupted()
+    return progress
+
+
+@pytest.fixture(scope="module")
+def artifacts(tmp_path_factory):
+    return write_artifacts(str(tmp_path_factory.mktemp("artifacts")), seed=0)
+
+
+@pytest.fixture(params=["csv", "parquet"])
+def input_path(request, tmp_path):
+    frame = pd.DataFrame.from_records(make_synthetic_records(250, seed=3))
+    frame.insert(0, "Customer_ID", [f"C{i:04d}" for i in range(len(frame))])
+    path = str(tmp_path / f"input.{request.param}")
+    if request.param == "parquet":
+        pytest.importorskip("pyarrow")
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_csv(path, index=False)
+    return path
+
+
+def _scorer(artifacts, input_path, output_path, **kwargs):
+    return BatchScorer(BatchScoringConfig(input_path=input_path, output_path=output_path, chunksize=100,
+                                          id_column="Customer_ID", model_path=artifacts["model"],
+                                          preprocessor_path=artifacts["preprocessor"], **kwargs))
+
+
+def test_resumed_run_matches_an_uninterrupted_run(artifacts, input_path, tmp_path):
+    expected_path, output_path = str(tmp_path / "expected.csv"), str(tmp_path / "output.csv")
+    _scorer(artifacts, input_path, expected_path).run()
+
+    scorer = _scorer(artifacts, input_path, output_path)
+    with pytest.raises(CustomException):
+        scorer.run(_interrupt_after(1))
+    with open(scorer.config.checkpoint_path) as f:
+        checkpoint = json.load(f)
+    assert (checkpoint["chunks_done"], checkpoint["rows_done"]) == (1, 100)
+    # a crash while writing the next chunk leaves a partial one behind the checkpoint
+    with open(output_path, "a") as f:
+        f.write("C9999,half a chunk")
+
+    summary = _scorer(artifacts, input_path, output_path).run()
+    assert (summary["rows_scored"], summary["rows_total"], summary["chunks"]) == (150, 250, 3)
+    with open(expected_path) as expected, open(output_path) as output:
+        assert output.read() == expected.read()
+    assert not os.path.exists(scorer.config.checkpoint_path)
+
+
+def test_changed_input_is_not_resumed(artifacts, input_path, tmp_path):
+    output_path = str(tmp_path / "output.csv")
+    scorer = _scorer(artifacts, input_path, output_path)
+    with pytest.raises(CustomException):
+        scorer.run(_interrupt_after(1))
+
+    stat = os.stat(input_path)
+    os.utime(input_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    with pytest.raises(CustomException, match="changed since checkpoint"):
+        _scorer(artifacts, input_path, output_path).run()
+
+    summary = _scorer(artifacts, input_path, output_path, resume=False).run()
+    assert summary["rows_scored"] == 250
+    assert len(pd.read_csv(output_path)) == 250
@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import ExtraTreesClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from src.exceptions import CustomException
+from src.pipelines.compiled_model import CompiledTreeEnsemble, export_compiled_model
+from src.utils import save_object, load_object, file_digest
+
+
+def _data(n_classes):
+    X, y = make_classification(n_samples=600, n_features=12, n_informative=6, n_classes=n_classes, random_state=0)
+    return X[:400], y[:400].astype(np.float64), X[400:]
+
+
+MODELS = {
+    "tree": lambda: DecisionTreeClassifier(max_depth=8, random_state=0),
+    "forest": lambda: RandomForestClassifier(n_estimators=20, n_jobs=2, random_state=0),
+    "extra_trees": lambda: ExtraTreesClassifier(n_estimators=20, random_state=0),
+    "boosting": lambda: GradientBoostingClassifier(n_estimators=20, random_state=0),
+}
+
+
+@pytest.mark.parametrize("n_classes", [2, 3])
+@pytest.mark.parametrize("name", list(MODELS))
+def test_float64_matches_sklearn(name, n_classes):
+    X_train, y_train, X_test = _data(n_classes)
+    model = MODELS[name]().fit(X_train, y_train)
+    compiled = CompiledTreeEnsemble.compile(model)
+
+    np.testing.assert_array_equal(compiled.predict(X_test), model.predict(X_test))
+    np.testing.assert_allclose(compiled.predict_proba(X_test), model.predict_proba(X_test), rtol=1e-9, atol=1e-12)
+    assert compiled.check_equivalence(model, X_test) < 1e-9
+
+
+@pytest.mark.parametrize("name", list(MODELS))
+def test_float32_within_tolerance(name):
+    X_train, y_train, X_test = _data(3)
+    model = MODELS[name]().fit(X_train, y_train)
+    compiled = CompiledTreeEnsemble.compile(model, dtype="float32")
+
+    assert compiled.check_equivalence(model, X_test) < 1e-4
+
+
+def test_unsupported_model_is_rejected():
+    X_train, y_train, _ = _data(2)
+    with pytest.raises(CustomException):
+        CompiledTreeEnsemble.compile(LogisticRegression().fit(X_train, y_train))
+
+
+def test_export_round_trip(tmp_path):
+    X_train, y_train, X_test = _data(3)
+    model = MODELS["forest"]().fit(X_train, y_train)
+    model_path, output_path = str(tmp_path / "model.pkl"), str(tmp_path / "model_compiled.pkl")
+    save_object(file_path=model_path, obj=model)
+
+    assert export_compiled_model(model, model_path, output_path, X_test) == output_path
+    compiled = load_object(output_path)
+    assert compiled.source_digest == file_digest(model_path)
+    np.testing.assert_array_equal(compiled.predict(X_test), model.predict(X_test))
+
+
+def test_export_removes_stale_file_for_unsupported_model(tmp_path):
+    X_train, y_train, X_test = _data(2)
+    model = LogisticRegression().fit(X_train, y_train)
+    model_path, output_path = str(tmp_path / "model.pkl"), str(tmp_path / "model_compiled.pkl")
+    save_object(file_path=model_path, obj=model)
+    save_object(file_path=output_path, obj="stale export")
+
+    assert export_compiled_model(model, model_path, output_path, X_test) is None
+    assert not os.path.exists(output_path)
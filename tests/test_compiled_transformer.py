@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.components.data_transformation import DataTransformation
+from src.pipelines.compiled_transformer import CompiledTransformer
+from src.pipelines.synthetic_data import make_synthetic_records, make_synthetic_columns
+
+
+@pytest.fixture(scope="module")
+def preprocessor():
+    X_preprocessor, _ = DataTransformation().get_data_transformer_object()
+    return X_preprocessor.fit(pd.DataFrame.from_records(make_synthetic_records(500, seed=1)))
+
+
+def _dense(X):
+    return X.toarray() if hasattr(X, "toarray") else X
+
+
+def test_records_columns_and_dataframe_match_sklearn(preprocessor):
+    compiled = CompiledTransformer.compile(preprocessor)
+    records = make_synthetic_records(200, seed=2)
+    expected = _dense(preprocessor.transform(pd.DataFrame.from_records(records)))
+
+    np.testing.assert_allclose(compiled.transform(records), expected, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(compiled.transform(make_synthetic_columns(200, seed=2)), expected, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(compiled.transform(pd.DataFrame.from_records(records)), expected, rtol=1e-9, atol=1e-12)
+
+
+def test_missing_and_unseen_values_match_sklearn(preprocessor):
+    compiled = CompiledTransformer.compile(preprocessor)
+    records = make_synthetic_records(6, seed=3)
+    records[0]["Delay_from_due_date"] = np.nan
+    records[1]["Credit_Mix"] = np.nan
+    records[2]["Payment_Behaviour"] = "__unseen__"
+
+    assert compiled.check_equivalence(preprocessor, pd.DataFrame.from_records(records)) < 1e-9
+    assert compiled.self_check(preprocessor) < 1e-9
+
+
+def test_check_equivalence_rejects_a_different_preprocessor(preprocessor):
+    compiled = CompiledTransformer.compile(preprocessor)
+    other, _ = DataTransformation().get_data_transformer_object()
+    other.fit(pd.DataFrame.from_records(make_synthetic_records(50, seed=4)))
+
+    with pytest.raises(ValueError):
+        compiled.check_equivalence(other, pd.DataFrame.from_records(make_synthetic_records(50, seed=5)))
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.pipelines.inference_executor import InferenceExecutor, InferenceExecutorConfig, InferenceQueueFullError
+from src.pipelines.micro_batcher import MicroBatcher, MicroBatcherConfig
+
+
+class FakeModel:
+    """``predict_fn`` returning each record's ``i``; fails any batch holding a record marked ``bad``."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, records):
+        time.sleep(self.delay)
+        with self.lock:
+            self.batches.append([record["i"] for record in records])
+        if any(record.get("bad") for record in records):
+            raise ValueError("bad record")
+        return [record["i"] for record in records], None
+
+
+def _run(scenario, max_queue_depth=64, **batcher_config):
+    async def main():
+        executor = InferenceExecutor(InferenceExecutorConfig(kind="thread", max_workers=2,
+                                                             max_queue_depth=max_queue_depth))
+        executor.start()
+        model = FakeModel(batcher_config.pop("delay", 0.0))
+        batcher = MicroBatcher(model, MicroBatcherConfig(enabled=True, **batcher_config), executor=executor)
+        await batcher.start()
+        try:
+            return await scenario(batcher, model)
+        finally:
+            await batcher.stop()
+            executor.shutdown()
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_are_scored_together():
+    async def scenario(batcher, model):
+        results = await asyncio.gather(*(batcher.submit({"i": i}) for i in range(10)))
+        assert results == [(i, None) for i in range(10)]
+        assert model.batches == [list(range(10))]
+        assert batcher.metrics.snapshot()["max_batch_size"] == 10
+
+    _run(scenario, max_batch_size=64)
+
+
+def test_batches_are_capped_at_max_batch_size():
+    async def scenario(batcher, model):
+        await asyncio.gather(*(batcher.submit({"i": i}) for i in range(10)))
+        assert [len(batch) for batch in model.batches] == [4, 4, 2]
+
+    _run(scenario, max_batch_size=4)
+
+
+def test_collection_window_only_after_bursty_traffic():
+    async def scenario(batcher, model):
+        start = time.perf_counter()
+        await batcher.submit({"i": 0})
+        # an idle service does not wait for more requests
+        assert time.perf_counter() - start < 0.15
+
+        for _ in range(5):
+            await asyncio.gather(*(batcher.submit({"i": i}) for i in range(8)))
+        model.batches.clear()
+
+        async def late():
+            await asyncio.sleep(0.05)
+            return await batcher.submit({"i": 2})
+        await asyncio.gather(batcher.submit({"i": 1}), late())
+        # once traffic is bursty the first request waits up to max_wait_ms for company
+        assert model.batches == [[1, 2]]
+
+    _run(scenario, max_batch_size=64, max_wait_ms=300)
+
+
+def test_one_bad_record_fails_only_its_own_request():
+    async def scenario(batcher, model):
+        results = await asyncio.gather(*(batcher.submit({"i": i, "bad": i == 3}) for i in range(6)),
+                                       return_exceptions=True)
+        assert isinstance(results[3], ValueError)
+        assert [r for i, r in enumerate(results) if i != 3] == [(i, None) for i in (0, 1, 2, 4, 5)]
+        assert model.batches[0] == list(range(6))
+        assert sorted(model.batches[1:]) == [[i] for i in range(6)]
+
+    _run(scenario, max_batch_size=64)
+
+
+def test_full_queue_rejects_requests():
+    async def scenario(batcher, model):
+        results = await asyncio.gather(*(batcher.submit({"i": i}) for i in range(10)), return_exceptions=True)
+        rejected = [r for r in results if isinstance(r, InferenceQueueFullError)]
+        assert len(rejected) == 6
+        assert [r for r in results if not isinstance(r, Exception)] == [(i, None) for i in range(4)]
+
+    _run(scenario, max_queue_depth=4, max_batch_size=64)
+
+
+def test_stop_fails_waiting_requests():
+    async def scenario(batcher, model):
+        first = asyncio.ensure_future(batcher.submit({"i": 0}))
+        await asyncio.sleep(0.05)
+        waiting = asyncio.ensure_future(batcher.submit({"i": 1}))
+        await asyncio.sleep(0)
+        await batcher.stop()
+        for future in (first, waiting):
+            with pytest.raises(RuntimeError, match="stopped"):
+                await future
+
+    _run(scenario, max_batch_size=1, delay=0.3)
@@ -0,0 +1,101 @@
+import os
+import threading
+
+import pytest
+
+from src.exceptions import CustomException
+from src.pipelines.artifact_cache import ArtifactCache, ArtifactCacheConfig
+from src.pipelines.model_registry import (ModelRegistry, ModelRegistryConfig, RegistryFollower,
+                                          PRODUCTION, SHADOW)
+from src.pipelines.synthetic_data import make_synthetic_records
+from tests.helpers import write_artifacts
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(ModelRegistryConfig(registry_dir=str(tmp_path / "registry"), poll_seconds=0.05))
+
+
+def test_register_copies_artifacts_and_deduplicates(registry, tmp_path):
+    files = write_artifacts(str(tmp_path / "a"), seed=0)
+    version = registry.register(files, metrics={"accuracy": 0.5}, source="test")
+
+    assert version == "v0001"
+    metadata = registry.get(version)
+    assert metadata["metrics"] == {"accuracy": 0.5}
+    assert set(metadata["files"]) == {"model", "preprocessor"}
+    assert os.path.exists(os.path.join(registry.version_dir(version), "model.pkl"))
+    assert registry.register(files) == version
+    assert registry.register(write_artifacts(str(tmp_path / "b"), seed=1)) == "v0002"
+    assert [m["version"] for m in registry.list_versions()] == ["v0001", "v0002"]
+
+
+def test_register_requires_model_and_preprocessor(registry, tmp_path):
+    files = write_artifacts(str(tmp_path / "a"), seed=0)
+    with pytest.raises(CustomException):
+        registry.register({"model": files["model"]})
+
+
+def test_promote_and_aliases(registry, tmp_path):
+    v1 = registry.register(write_artifacts(str(tmp_path / "a"), seed=0))
+    v2 = registry.register(write_artifacts(str(tmp_path / "b"), seed=1))
+
+    registry.promote(v1)
+    registry.set_alias(SHADOW, v2)
+    assert registry.aliases() == {PRODUCTION: v1, SHADOW: v2}
+    registry.set_alias(SHADOW, None)
+    assert registry.resolve(SHADOW) is None
+    with pytest.raises(CustomException):
+        registry.promote("v9999")
+    assert registry.resolve(PRODUCTION) == v1
+
+
+def test_concurrent_alias_updates_are_not_lost(registry, tmp_path):
+    version = registry.register(write_artifacts(str(tmp_path / "a"), seed=0))
+    threads = [threading.Thread(target=registry.set_alias, args=(f"alias-{i}", version)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(registry.aliases()) == 20
+
+
+def test_follower_swaps_to_the_promoted_version(registry, tmp_path):
+    v1 = registry.register(write_artifacts(str(tmp_path / "a"), seed=0))
+    v2 = registry.register(write_artifacts(str(tmp_path / "b"), seed=1))
+    registry.promote(v1)
+    cache = ArtifactCache(ArtifactCacheConfig())
+    follower = RegistryFollower(cache, registry)
+
+    assert follower.sync() is True
+    before = cache.get()
+    assert before.model_version == v1
+    assert follower.sync() is False
+
+    registry.promote(v2)
+    assert follower.sync() is True
+    after = cache.get()
+    assert after.model_version == v2 and cache.config.model_version == v2
+    # a request that started before the swap keeps scoring with the artifacts it holds
+    records = make_synthetic_records(4)
+    assert len(before.model.predict(before.transform(records))) == 4
+    assert len(after.model.predict(after.transform(records))) == 4
+
+
+def test_follower_rejects_a_version_that_fails_the_smoke_test(registry, tmp_path):
+    good = registry.register(write_artifacts(str(tmp_path / "a"), seed=0))
+    broken = registry.register(write_artifacts(str(tmp_path / "b"), seed=1, n_features=3))
+    registry.promote(good)
+    cache = ArtifactCache(ArtifactCacheConfig())
+    follower = RegistryFollower(cache, registry)
+    follower.sync()
+
+    registry.promote(broken)
+    with pytest.raises(Exception):
+        follower.sync()
+    assert cache.get().model_version == good
+    assert follower.rejected == registry.fingerprint(broken)
+    # the rejected version is not loaded again on every poll
+    assert follower.sync() is False
+    assert cache.get().model_version == good
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.exceptions import CustomException
+from src.pipelines.artifact_cache import ArtifactCache, ArtifactCacheConfig
+from src.pipelines.predict_pipeline import CustomData, PredictPipeline, PredictPipelineConfig
+from src.pipelines.synthetic_data import make_synthetic_columns, make_synthetic_records
+from tests.helpers import write_artifacts
+
+
+@pytest.fixture(scope="module", params=[True, False], ids=["compiled", "sklearn"])
+def pipeline(request, tmp_path_factory):
+    files = write_artifacts(str(tmp_path_factory.mktemp("artifacts")), seed=0)
+    config = ArtifactCacheConfig(model_path=files["model"], preprocessor_path=files["preprocessor"],
+                                 compile_preprocessor=request.param)
+    pipeline = PredictPipeline(artifact_cache=ArtifactCache(config), config=PredictPipelineConfig(max_batch_size=100))
+    assert (pipeline.artifact_cache.get().compiled_preprocessor is not None) == request.param
+    return pipeline
+
+
+def test_every_input_form_gives_the_same_predictions(pipeline):
+    records = make_synthetic_records(20, seed=1)
+    expected, probabilities, classes = pipeline.predict_batch(records, with_classes=True)
+
+    assert probabilities.shape == (20, len(classes))
+    np.testing.assert_array_equal(classes.take(np.argmax(probabilities, axis=1)), expected)
+    np.testing.assert_array_equal(pipeline.predict_batch([CustomData(**r) for r in records])[0], expected)
+    np.testing.assert_array_equal(pipeline.predict_batch(pd.DataFrame.from_records(records))[0], expected)
+    np.testing.assert_array_equal(pipeline.predict_batch(make_synthetic_columns(20, seed=1))[0], expected)
+
+
+@pytest.mark.parametrize("form", ["records", "columns", "dataframe"])
+def test_missing_feature_column_is_reported(pipeline, form):
+    columns = make_synthetic_columns(3)
+    del columns["Age"]
+    data = {"records": [dict(zip(columns, row)) for row in zip(*columns.values())],
+            "columns": columns,
+            "dataframe": pd.DataFrame(columns)}[form]
+
+    with pytest.raises(CustomException, match=r"Missing feature columns: \['Age'\]"):
+        pipeline.predict_batch(data)
+
+
+def test_batch_size_limit_and_empty_batch(pipeline):
+    with pytest.raises(CustomException, match="exceeds max_batch_size"):
+        pipeline.predict_batch(make_synthetic_records(101))
+    preds, probabilities, _ = pipeline.predict_batch([], with_classes=True)
+    assert len(preds) == 0 and probabilities is None
@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from src.pipelines.prediction_cache import PredictionCache, PredictionCacheConfig
+from src.pipelines.synthetic_data import make_synthetic_records
+
+
+class SlowModel:
+    """Counts calls; every call waits until ``release`` is set."""
+
+    def __init__(self, result=1.0):
+        self.calls = 0
+        self.result = result
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def _cache(**kwargs):
+    return PredictionCache(PredictionCacheConfig(enabled=True, **kwargs))
+
+
+def test_concurrent_requests_are_coalesced():
+    async def scenario():
+        cache, model = _cache(), SlowModel()
+        record = make_synthetic_records(1)[0]
+        waiters = [asyncio.create_task(cache.get_or_compute(dict(record), model)) for _ in range(5)]
+        await asyncio.sleep(0)
+        model.release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert results == [1.0] * 5
+        assert model.calls == 1
+        assert cache.stats.misses == 1 and cache.stats.coalesced == 4
+        assert await cache.get_or_compute(record, model) == 1.0
+        assert model.calls == 1 and cache.stats.hits == 1
+        assert cache.snapshot()["inflight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelling_the_first_caller_does_not_fail_the_others():
+    async def scenario():
+        cache, model = _cache(), SlowModel()
+        record = make_synthetic_records(1)[0]
+        first = asyncio.create_task(cache.get_or_compute(record, model))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_compute(record, model))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        model.release.set()
+
+        assert await second == 1.0
+        assert model.calls == 1
+        assert len(cache) == 1
+
+    asyncio.run(scenario())
+
+
+def test_computation_finishes_when_every_caller_is_cancelled():
+    async def scenario():
+        cache, model = _cache(), SlowModel()
+        record = make_synthetic_records(1)[0]
+        caller = asyncio.create_task(cache.get_or_compute(record, model))
+        await asyncio.sleep(0)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+
+        model.release.set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert len(cache) == 1
+        assert await cache.get_or_compute(record, model) == 1.0
+        assert model.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    async def scenario():
+        cache, model = _cache(), SlowModel(ValueError("model failed"))
+        record = make_synthetic_records(1)[0]
+        waiters = [asyncio.create_task(cache.get_or_compute(record, model)) for _ in range(3)]
+        await asyncio.sleep(0)
+        model.release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert model.calls == 1
+        assert len(cache) == 0 and cache.snapshot()["inflight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_least_recently_used_entry_is_evicted():
+    async def scenario():
+        cache = _cache(max_entries=2)
+        records = make_synthetic_records(3)
+
+        async def compute():
+            return 0.0
+
+        for record in records[:2]:
+            await cache.get_or_compute(record, compute)
+        await cache.get_or_compute(records[0], compute)
+        await cache.get_or_compute(records[2], compute)
+
+        assert len(cache) == 2 and cache.stats.evictions == 1
+        await cache.get_or_compute(records[0], compute)
+        assert cache.stats.hits == 2
+
+    asyncio.run(scenario())
+
+
+def test_cache_is_cleared_when_the_model_version_changes():
+    async def scenario():
+        version = ["v1"]
+        cache = PredictionCache(PredictionCacheConfig(enabled=True, version_check_seconds=0),
+                                version_fn=lambda: version[0])
+        record = make_synthetic_records(1)[0]
+
+        async def compute():
+            return version[0]
+
+        assert await cache.get_or_compute(record, compute) == "v1"
+        version[0] = "v2"
+        assert await cache.get_or_compute(record, compute) == "v2"
+        assert cache.stats.invalidations == 1
+
+    asyncio.run(scenario())
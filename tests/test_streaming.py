@@ -0,0 +1,141 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from src.pipelines.streaming import ArrowStreamDecoder, StreamingConfig, ndjson_blocks, ndjson_error
+from src.pipelines.synthetic_data import make_synthetic_columns, make_synthetic_records
+from tests.helpers import write_artifacts
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.ipc  # noqa: E402
+
+
+async def _aiter(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def _blocks(chunks, chunk_bytes=64, max_line_bytes=1 << 20):
+    async def collect():
+        return [block async for block in ndjson_blocks(_aiter(chunks), chunk_bytes, max_line_bytes)]
+    return asyncio.run(collect())
+
+
+def _ndjson(n_rows):
+    return b"".join(json.dumps(record).encode() + b"\n" for record in make_synthetic_records(n_rows))
+
+
+def _arrow_stream(table):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=16)
+    return sink.getvalue().to_pybytes()
+
+
+def _feature_table(n_rows):
+    return pa.table({name: values for name, values in make_synthetic_columns(n_rows).items()})
+
+
+def test_ndjson_blocks_regroup_split_reads_into_whole_lines():
+    body = _ndjson(20)
+    blocks = _blocks([body[i:i + 1] for i in range(len(body))])
+
+    assert b"".join(blocks) == body
+    assert len(blocks) > 1
+    assert all(block.endswith(b"\n") for block in blocks)
+
+
+def test_ndjson_blocks_yield_a_last_line_without_newline():
+    blocks = _blocks([b'{"a": 1}\n{"a": 2}'], chunk_bytes=1)
+    assert blocks == [b'{"a": 1}\n', b'{"a": 2}']
+
+
+def test_ndjson_blocks_reject_an_oversized_line():
+    with pytest.raises(ValueError, match="longer than 100 bytes"):
+        _blocks([b"x" * 60, b"x" * 60, b"\n"], chunk_bytes=50, max_line_bytes=100)
+
+
+def test_arrow_decoder_handles_byte_by_byte_reads():
+    table = _feature_table(50)
+    stream = _arrow_stream(table)
+    decoder = ArrowStreamDecoder()
+    batches = []
+    for i in range(len(stream)):
+        batches += decoder.feed(stream[i:i + 1])
+    decoder.close()
+
+    assert decoder.finished and decoder.schema.equals(table.schema)
+    assert [batch.num_rows for batch in batches] == [16, 16, 16, 2]
+    assert pa.Table.from_batches(batches).equals(table)
+
+
+def test_arrow_decoder_rejects_a_truncated_stream():
+    stream = _arrow_stream(_feature_table(50))
+    decoder = ArrowStreamDecoder()
+    decoder.feed(stream[:len(stream) - 100])
+    with pytest.raises(ValueError, match="ended in the middle of a message"):
+        decoder.close()
+
+
+def test_arrow_decoder_rejects_dictionary_batches_and_other_payloads():
+    table = _feature_table(10)
+    table = table.set_column(table.schema.get_field_index("Credit_Mix"), "Credit_Mix",
+                             table["Credit_Mix"].dictionary_encode())
+    with pytest.raises(ValueError, match="dictionary"):
+        ArrowStreamDecoder().feed(_arrow_stream(table))
+    with pytest.raises(ValueError, match="not an Arrow IPC stream"):
+        ArrowStreamDecoder().feed(b'{"Age": 1}\n')
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    from fastapi.testclient import TestClient
+    import fast_api
+
+    directory = str(tmp_path_factory.mktemp("serving"))
+    write_artifacts(os.path.join(directory, "artifacts"), seed=0)
+    cwd = os.getcwd()
+    os.chdir(directory)
+    fast_api.StreamingConfig = lambda: StreamingConfig(chunk_bytes=256, chunk_rows=16, max_in_flight=2,
+                                                       max_line_bytes=4096)
+    try:
+        with TestClient(fast_api.app) as client:
+            yield client
+    finally:
+        fast_api.StreamingConfig = StreamingConfig
+        os.chdir(cwd)
+
+
+def test_stream_scores_every_line_in_order(client):
+    response = client.post("/predict/stream", content=_ndjson(40))
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == 200
+    assert len(lines) == 40
+    expected = client.post("/predict/batch", json={"records": make_synthetic_records(40)}).json()["predictions"]
+    assert [line["prediction"] for line in lines] == expected
+
+
+def test_stream_failure_is_reported_as_a_trailing_error_line(client):
+    body = _ndjson(40) + b"not json\n"
+    lines = client.post("/predict/stream", content=body).text.splitlines()
+    error = json.loads(lines[-1])
+
+    assert set(error) == {"error", "rows_scored"}
+    assert error["rows_scored"] == len(lines) - 1 < 41
+    assert json.loads(ndjson_error(ValueError("boom"), 3)) == {"error": "boom", "rows_scored": 3}
+
+
+def test_arrow_endpoint_round_trip_and_dictionary_columns(client):
+    table = _feature_table(40)
+    response = client.post("/predict/arrow", content=_arrow_stream(table))
+    result = pa.ipc.open_stream(response.content).read_all()
+    assert response.status_code == 200 and result.num_rows == 40
+
+    encoded = table.set_column(table.schema.get_field_index("Credit_Mix"), "Credit_Mix",
+                               table["Credit_Mix"].dictionary_encode())
+    response = client.post("/predict/arrow", content=_arrow_stream(encoded))
+    assert response.status_code == 422
+    assert client.post("/predict/arrow", content=_arrow_stream(table.drop(["Age"]))).status_code == 422
@@ -0,0 +1,13 @@
+from dataclasses import replace
+
+from src.components.model_trainer import ModelTrainerConfig
+from src.pipelines.training_pipeline import stage_key
+
+
+def test_execution_only_fields_do_not_change_the_stage_key():
+    config = ModelTrainerConfig(n_jobs=1, model_timeout_seconds=None)
+    key = stage_key("model_trainer", config, "upstream")
+
+    assert stage_key("model_trainer", replace(config, n_jobs=64, model_timeout_seconds=30.0), "upstream") == key
+    assert stage_key("model_trainer", replace(config, candidate_models=["LogisticRegression"]), "upstream") != key
+    assert stage_key("model_trainer", config, "other upstream") != key